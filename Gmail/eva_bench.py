@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Banc de performance EVA : générateur de logs synthétiques + mesure par étape.
+
+Génère des logs MF4/CSV réalistes (durée, nombre de canaux, cadences, nombre
+de groupes de données et compression paramétrables) puis chronomètre chaque
+étape du détecteur aux échelles demandées (1MB, 100MB, 10GB...). Les résultats
+sont écrits en JSON pour pouvoir suivre l'évolution dans le temps.
+
+Avec ``--baseline``, les mesures sont comparées à un JSON de référence
+(étape par étape, temps et pic mémoire) : un tableau des écarts est affiché et
+le code de sortie vaut 1 si une étape régresse au-delà des seuils.
+
+Exemples :
+    python eva_bench.py --scales 1MB,100MB --formats mf4,csv --out bench.json
+    python eva_bench.py --scales 1MB --baseline bench.json --max_slowdown 0.15
+    python eva_bench.py --current new.json --baseline bench.json
+"""
+from __future__ import annotations
+import argparse, contextlib, datetime as dt, io, json, platform, re, sys, tempfile, time, tracemalloc, zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+try:
+    from asammdf import MDF, Signal  # type: ignore
+    _ASAMMDF_AVAILABLE = True
+except Exception:
+    MDF = Signal = None  # type: ignore
+    _ASAMMDF_AVAILABLE = False
+
+import eva_detecteur as det
+from eva_chunks import CSV_SUFFIXES
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_RATES = (0.01, 0.1, 1.0)   # 10 ms, 100 ms, 1 s
+GEN_CHUNK_S = 600.0                # durée écrite par appel à MDF.extend / to_csv
+SCALES = {"1MB": 1024**2, "100MB": 100 * 1024**2, "10GB": 10 * 1024**3}
+DEFAULT_MAX_SLOWDOWN = 0.15        # +15 % de temps toléré par étape
+DEFAULT_MAX_MEMORY_GROWTH = 0.15   # +15 % de pic mémoire toléré par étape
+MIN_WALL_S = 0.02                  # en dessous, les écarts de temps sont du bruit
+MIN_PEAK_BYTES = 1024**2           # idem pour les pics mémoire
+
+
+def parse_size(text: str) -> int:
+    """``"100MB"`` -> octets (suffixes KB / MB / GB)."""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?B)\s*", text.upper())
+    if not m:
+        raise ValueError(f"Taille invalide: {text}")
+    return int(float(m.group(1)) * {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}[m.group(2)])
+
+
+def _group_layout(channel_names: Sequence[str], rates: Sequence[float], groups: int) -> List[Tuple[float, List[str]]]:
+    """Répartit les canaux en ``groups`` groupes de données, cadences prises en boucle dans ``rates``."""
+    groups = max(1, min(groups, len(channel_names)))
+    return [(rates[g % len(rates)], list(channel_names[g::groups])) for g in range(groups)]
+
+
+def duration_for_size(target_bytes: int, channels: int, rates: Sequence[float] = DEFAULT_RATES,
+                      groups: int = 3, fmt: str = "mf4") -> float:
+    """Durée de log (s) qui donne à peu près ``target_bytes`` de données."""
+    names = [f"c{i}" for i in range(channels)]
+    if fmt == "csv":
+        # Une ligne par pas de la cadence la plus rapide, ~9 caractères par valeur ("%.6g,")
+        return max(1.0, target_bytes / ((channels + 1) * 9.0) * min(rates))
+    per_s = sum((8 + 8 * len(chs)) / rate for rate, chs in _group_layout(names, rates, groups))
+    return max(1.0, target_bytes / per_s)
+
+
+def default_channel_names(channels: int, extra_names: Sequence[str] = ()) -> List[str]:
+    """Signaux du catalogue d'exigences + noms fournis (p.ex. mapping SWEET) + canaux génériques."""
+    names = list(dict.fromkeys([*det._catalog_signals(), *extra_names]))[:channels]
+    names += [f"Sig_{i:05d}" for i in range(channels - len(names))]
+    return names
+
+
+def _samples(name: str, t: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    base = {"SOC_BMS": 80.0, "SOC_Affiche": 80.5, "Temperature_Battery": 25.0, "Battery_Voltage": 360.0}.get(name, 0.0)
+    freq = 0.01 + (zlib.crc32(name.encode()) % 97) / 1000.0
+    return base + 5.0 * np.sin(t * freq) + rng.normal(0.0, 0.2, len(t))
+
+
+def _chunk_times(start: float, stop: float, rate: float) -> np.ndarray:
+    """Instants ``k * rate`` de ``[start, stop[`` ; indices entiers : pas de doublon ni de trou entre deux morceaux."""
+    first, end = (int(np.ceil(x / rate - 1e-9)) for x in (start, stop))
+    return np.arange(first, end) * rate
+
+
+def generate_log(path: Path, duration_s: float, channel_names: Sequence[str],
+                 rates: Sequence[float] = DEFAULT_RATES, groups: int = 3,
+                 compression: int = 0, seed: int = 0) -> Path:
+    """Écrit un log synthétique MF4 (ou CSV selon l'extension) par morceaux de ``GEN_CHUNK_S``.
+
+    ``compression`` suit asammdf (0 = DT bruts, 1 = deflate, 2 = deflate transposé).
+    Pour un CSV, tous les canaux partagent la cadence la plus rapide.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    if path.suffix.lower() in CSV_SUFFIXES:
+        rate = min(rates)
+        start = 0.0
+        with path.open("w", newline="") as fh:
+            while start < duration_s:
+                t = _chunk_times(start, min(start + GEN_CHUNK_S, duration_s), rate)
+                # Temps formaté à part : en "%.6g", 10000.01 s deviendrait 10000 s
+                df = pd.DataFrame({"Time": np.char.mod("%.10g", t), **{n: _samples(n, t, rng) for n in channel_names}})
+                df.to_csv(fh, index=False, header=start == 0.0, float_format="%.6g")
+                start += GEN_CHUNK_S
+        return path
+
+    if not _ASAMMDF_AVAILABLE:
+        raise RuntimeError("asammdf est requis pour générer des fichiers MF4")
+    mdf = MDF(version="4.10")
+    layout = _group_layout(channel_names, rates, groups)
+    start = 0.0
+    while start < duration_s:
+        stop = min(start + GEN_CHUNK_S, duration_s)
+        for g, (rate, names) in enumerate(layout):
+            t = _chunk_times(start, stop, rate)
+            if len(t) == 0:
+                continue
+            values = [_samples(n, t, rng) for n in names]
+            if start == 0.0:
+                mdf.append([Signal(v, t, name=n) for n, v in zip(names, values)], comment=f"rate {rate}s")
+            else:
+                mdf.extend(g, [(t, None)] + [(v, None) for v in values])
+        start = stop
+    mdf.save(str(path), overwrite=True, compression=compression)
+    mdf.close()
+    return path
+
+
+def _measure(fn: Callable[[], Any], repeat: int) -> Tuple[Any, Dict[str, float]]:
+    """Meilleur temps sur ``repeat`` exécutions + pic mémoire Python (tracemalloc) sur une exécution."""
+    times = []
+    result = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {"wall_s": min(times), "mean_s": sum(times) / len(times), "peak_bytes": peak}
+
+
+def _load_config() -> Dict[str, Any]:
+    cfg = {k: (HERE / v if isinstance(v, Path) and not v.is_absolute() else v) for k, v in det.CONFIG.items()}
+    f3 = det.read_feuil3(cfg["labels_xlsx"]) if cfg["labels_xlsx"].exists() else pd.DataFrame()
+    df_map = det.read_flux_mapping(cfg["flux_xlsx"], "sweet400") if cfg["flux_xlsx"].exists() else pd.DataFrame()
+    doors = det.read_pval_requirements(cfg["pval_xlsm"]) if cfg["pval_xlsm"].exists() else set()
+    return {"uc_map": det.uc_signals_from_feuil3(f3), "df_map": df_map, "doors": doors, "paths": cfg}
+
+
+def bench_engine(log: Path, config: Dict[str, Any], repeat: int = 1) -> Dict[str, Dict[str, float]]:
+    """Étapes de ``EVACompleteEngine.analyze_mdf_file`` (mesures de son ``StageRecorder``)."""
+    sys.path.insert(0, str(HERE.parent))
+    try:
+        from eva_complete_engine import EVACompleteEngine
+    except ImportError:
+        return {}
+    finally:
+        sys.path.remove(str(HERE.parent))
+    engine = EVACompleteEngine()
+    engine.labels_file = config["paths"]["labels_xlsx"]
+    engine.flux_file = config["paths"]["flux_xlsx"]
+    engine.pval_file = config["paths"]["pval_xlsm"]
+    runs = []
+    for i in range(max(1, repeat) + 1):
+        with contextlib.redirect_stdout(io.StringIO()):
+            # dernier passage avec tracemalloc pour le pic mémoire, hors mesure de temps
+            runs.append(engine.analyze_mdf_file(str(log), trace_memory=i == max(1, repeat))["performance"])
+    results: Dict[str, Dict[str, float]] = {}
+    for stage in runs[-1]:
+        times = [r["wall_s"] for run in runs[:-1] for r in run if r["name"] == stage["name"]]
+        results[f"engine.{stage['name']}"] = {"wall_s": min(times), "mean_s": sum(times) / len(times),
+                                               "peak_bytes": stage.get("tracemalloc_peak_bytes") or 0}
+    return results
+
+
+def bench_file(log: Path, config: Dict[str, Any], work_dir: Path, repeat: int = 1,
+               stages: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, float]]:
+    """Chronomètre chaque étape du détecteur sur un log."""
+    results: Dict[str, Dict[str, float]] = {}
+    wanted = set(stages) if stages else None
+
+    def run(name: str, fn: Callable[[], Any]) -> Any:
+        if wanted is not None and name not in wanted:
+            return fn()
+        value, metrics = _measure(fn, repeat)
+        results[name] = metrics
+        return value
+
+    signals = det._catalog_signals()
+    channels = run("list_mdf_channels", lambda: det.list_mdf_channels(log))
+    signal_data = run("read_signal_data", lambda: {k: np.asarray(v) for k, v in det.read_signal_data(log, signals).items()})
+    uc_table = run("detect_from_presence", lambda: det.detect_from_presence(config["uc_map"], channels))
+    df_map = config["df_map"]
+    df_pval = det.filter_mapping_by_pval(df_map, config["doors"]) if config["doors"] and not df_map.empty else df_map
+    df_sweet = run("compute_sweet_status", lambda: det.compute_sweet_status(df_pval, channels))
+    req_table = run("verify_requirements", lambda: det.verify_all_requirements(log))
+    run("verify_requirements_chunked", lambda: det.verify_all_requirements(log, chunked=True))
+    run("render", lambda: det.render(work_dir / "bench_report.html", {"Fichier MDF": log.name},
+                                     uc_table, df_sweet, config["uc_map"], req_table))
+    try:
+        import eva_graphics
+        run("generate_all_plots", lambda: eva_graphics.generate_all_plots(
+            dict(list(signal_data.items())[:10]), req_table, uc_table, output_dir=work_dir / "plots"))
+    except ImportError:
+        pass
+    # Étapes du moteur complet : ``--stages engine`` les sélectionne toutes
+    if wanted is None or "engine" in wanted or any(w.startswith("engine.") for w in wanted):
+        for name, metrics in bench_engine(log, config, repeat).items():
+            if wanted is None or "engine" in wanted or name in wanted:
+                results[name] = metrics
+    return results
+
+
+def run_benchmarks(scales: Sequence[str], formats: Sequence[str], channels: int, rates: Sequence[float],
+                   groups: int, compression: int, data_dir: Path, repeat: int = 1,
+                   stages: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    config = _load_config()
+    extra = config["df_map"]["Signal MDF trouvé"].dropna().astype(str).tolist()[::2] if not config["df_map"].empty else []
+    names = default_channel_names(channels, extra)
+    runs = []
+    for scale in scales:
+        target = SCALES.get(scale.upper()) or parse_size(scale)
+        for fmt in formats:
+            duration = duration_for_size(target, len(names), rates, groups, fmt)
+            log = data_dir / f"bench_{scale}_{len(names)}ch_{groups}g_c{compression}.{fmt}"
+            if not log.exists():
+                t0 = time.perf_counter()
+                generate_log(log, duration, names, rates, groups, compression)
+                print(f"Log généré: {log.name} ({log.stat().st_size / 1024**2:.1f} MB, {time.perf_counter() - t0:.1f} s)")
+            print(f"Mesure: {log.name}")
+            runs.append({
+                "scale": scale, "format": fmt, "file": log.name, "file_bytes": log.stat().st_size,
+                "duration_s": duration, "channels": len(names), "groups": groups, "rates": list(rates),
+                "compression": compression,
+                "stages": bench_file(log, config, data_dir, repeat, stages),
+            })
+    return {
+        "timestamp": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "platform": platform.platform(),
+        "pandas": pd.__version__, "numpy": np.__version__,
+        "runs": runs,
+    }
+
+
+def print_table(report: Dict[str, Any]) -> None:
+    for run in report["runs"]:
+        print(f"\n{run['file']} ({run['file_bytes'] / 1024**2:.1f} MB)")
+        for stage, m in run["stages"].items():
+            print(f"  {stage:<30} {m['wall_s'] * 1000:>10.1f} ms  {m['peak_bytes'] / 1024**2:>8.1f} MB")
+
+
+def _run_key(run: Dict[str, Any]) -> Tuple:
+    return (run["scale"], run["format"], run["channels"], run["groups"], run["compression"])
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any],
+                    max_slowdown: float = DEFAULT_MAX_SLOWDOWN,
+                    max_memory_growth: float = DEFAULT_MAX_MEMORY_GROWTH,
+                    min_wall_s: float = MIN_WALL_S,
+                    min_peak_bytes: int = MIN_PEAK_BYTES) -> List[Dict[str, Any]]:
+    """Compare deux rapports étape par étape ; une ligne par (log, étape) présente des deux côtés.
+
+    ``status`` vaut ``"REGRESSION"`` si le temps (au-dessus de ``min_wall_s``)
+    ou le pic mémoire (au-dessus de ``min_peak_bytes``) dépasse la référence de
+    plus du seuil, ``"OK"`` sinon.
+    Les étapes absentes de la référence sont signalées ``"NEW"``.
+    """
+    base_runs = {_run_key(r): r for r in baseline.get("runs", [])}
+    rows = []
+    for run in current.get("runs", []):
+        base = base_runs.get(_run_key(run))
+        for stage, m in run["stages"].items():
+            b = base["stages"].get(stage) if base else None
+            row = {"file": run["file"], "stage": stage, "wall_s": m["wall_s"], "peak_bytes": m["peak_bytes"],
+                   "base_wall_s": None, "base_peak_bytes": None, "wall_delta": None, "peak_delta": None,
+                   "status": "NEW"}
+            if b is not None:
+                wall_delta = m["wall_s"] / b["wall_s"] - 1 if b["wall_s"] > 0 else 0.0
+                peak_delta = m["peak_bytes"] / b["peak_bytes"] - 1 if b["peak_bytes"] > 0 else 0.0
+                slow = wall_delta > max_slowdown and max(m["wall_s"], b["wall_s"]) >= min_wall_s
+                fat = peak_delta > max_memory_growth and max(m["peak_bytes"], b["peak_bytes"]) >= min_peak_bytes
+                row.update(base_wall_s=b["wall_s"], base_peak_bytes=b["peak_bytes"], wall_delta=wall_delta,
+                           peak_delta=peak_delta, status="REGRESSION" if slow or fat else "OK")
+            rows.append(row)
+    return rows
+
+
+def print_diff_table(rows: List[Dict[str, Any]]) -> None:
+    def pct(v):
+        return f"{v * 100:+.1f}%" if v is not None else "—"
+
+    def ms(v):
+        return f"{v * 1000:.1f}" if v is not None else "—"
+
+    def mb(v):
+        return f"{v / 1024**2:.1f}" if v is not None else "—"
+
+    current_file = None
+    for r in rows:
+        if r["file"] != current_file:
+            current_file = r["file"]
+            print(f"\n{current_file}")
+            print(f"  {'étape':<34} {'réf ms':>9} {'ms':>9} {'Δ temps':>9} {'réf MB':>8} {'MB':>8} {'Δ mém':>8}  statut")
+        print(f"  {r['stage']:<34} {ms(r['base_wall_s']):>9} {ms(r['wall_s']):>9} {pct(r['wall_delta']):>9} "
+              f"{mb(r['base_peak_bytes']):>8} {mb(r['peak_bytes']):>8} {pct(r['peak_delta']):>8}  {r['status']}")
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Banc de performance EVA (logs synthétiques)")
+    ap.add_argument("--scales", default="1MB", help="Tailles de log, p.ex. 1MB,100MB,10GB")
+    ap.add_argument("--formats", default="mf4,csv")
+    ap.add_argument("--channels", type=int, default=60)
+    ap.add_argument("--rates", default=",".join(map(str, DEFAULT_RATES)), help="Cadences (s), une par groupe en boucle")
+    ap.add_argument("--groups", type=int, default=3, help="Nombre de groupes de données (MF4)")
+    ap.add_argument("--compression", type=int, default=0, choices=[0, 1, 2])
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--stages", default=None, help="Limiter aux étapes listées (séparées par des virgules)")
+    ap.add_argument("--data_dir", type=Path, default=Path(tempfile.gettempdir()) / "eva_bench")
+    ap.add_argument("--out", type=Path, default=None, help="Fichier JSON de résultats")
+    ap.add_argument("--baseline", type=Path, default=None, help="JSON de référence pour la détection de régressions")
+    ap.add_argument("--current", type=Path, default=None, help="Comparer ce JSON existant au lieu de relancer le banc")
+    ap.add_argument("--max_slowdown", type=float, default=DEFAULT_MAX_SLOWDOWN, help="Ralentissement toléré (0.15 = 15 %%)")
+    ap.add_argument("--max_memory_growth", type=float, default=DEFAULT_MAX_MEMORY_GROWTH)
+    ap.add_argument("--min_wall_s", type=float, default=MIN_WALL_S, help="Durée sous laquelle le temps n'est pas comparé")
+    ap.add_argument("--min_peak_mb", type=float, default=MIN_PEAK_BYTES / 1024**2,
+                    help="Pic mémoire sous lequel la mémoire n'est pas comparée")
+    args = ap.parse_args(argv)
+
+    if args.current:
+        if not args.baseline:
+            ap.error("--current nécessite --baseline")
+        report = json.loads(args.current.read_text(encoding="utf-8"))
+    else:
+        report = run_benchmarks(
+            [s for s in args.scales.split(",") if s], [f for f in args.formats.split(",") if f],
+            args.channels, [float(r) for r in args.rates.split(",")], args.groups, args.compression,
+            args.data_dir, args.repeat, args.stages.split(",") if args.stages else None)
+        print_table(report)
+    if args.out and not args.current:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nRésultats écrits: {args.out}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        rows = compare_reports(report, baseline, args.max_slowdown, args.max_memory_growth,
+                               args.min_wall_s, int(args.min_peak_mb * 1024**2))
+        print_diff_table(rows)
+        regressions = [r for r in rows if r["status"] == "REGRESSION"]
+        if regressions:
+            ap.exit(1, f"\n{len(regressions)} régression(s) au-delà des seuils "
+                       f"(temps +{args.max_slowdown:.0%}, mémoire +{args.max_memory_growth:.0%})\n")
+        print("\nAucune régression.")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Mode de traitement par fenêtres temporelles (out-of-core) pour EVA.
+
+Les signaux sont lus bloc par bloc (``MDF.iter_get`` pour les MDF,
+``pandas.read_csv(chunksize=...)`` pour les CSV), redécoupés en fenêtres de
+``window_s`` secondes puis consommés par des accumulateurs qui conservent leur
+état d'une fenêtre à l'autre. La mémoire utilisée dépend de la taille d'une
+fenêtre, pas de la durée du log.
+
+Les fonctions de parcours acceptent un ``progress`` (``eva_progress.StageProgress``) :
+l'avancement est rapporté à chaque fenêtre et l'annulation est vérifiée à
+chaque tranche lue.
+"""
+from __future__ import annotations
+import heapq
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+
+try:
+    from asammdf import MDF  # type: ignore
+    _ASAMMDF_AVAILABLE = True
+except Exception:
+    MDF = None  # type: ignore
+    _ASAMMDF_AVAILABLE = False
+
+from eva_mmap import MdfMapper
+
+MDF_SUFFIXES = {".mf4", ".mf3", ".mdf"}
+CSV_SUFFIXES = {".csv", ".txt"}
+TIME_COLUMNS = ("Time", "time", "timestamps", "t")
+
+DEFAULT_WINDOW_S = 60.0          # durée d'une fenêtre de traitement
+MDF_FRAGMENT_BYTES = 8 * 1024**2  # taille max d'un fragment décodé par asammdf
+CSV_CHUNK_ROWS = 200_000
+CSV_SAMPLE_PERIOD_S = 0.01        # base de temps implicite des CSV sans colonne temps
+
+Chunk = Tuple[np.ndarray, np.ndarray]  # (timestamps, samples)
+
+
+def resolve_signal_name(signal: str, channels: Set[str]) -> Optional[str]:
+    """Retrouve le nom réel d'un signal dans le fichier (variantes de casse / séparateurs)."""
+    variants = [signal, signal.lower(), signal.upper(),
+                signal.replace("_", ""), signal.replace(" ", "_")]
+    return next((v for v in variants if v in channels), None)
+
+
+def open_mdf(mdf_path: Path):
+    """Ouvre un MDF en ne chargeant que les métadonnées, avec des fragments bornés."""
+    mdf = MDF(str(mdf_path))
+    mdf.configure(read_fragment_size=MDF_FRAGMENT_BYTES)
+    return mdf
+
+
+def _csv_time_column(columns: Iterable[str]) -> Optional[str]:
+    cols = set(columns)
+    return next((c for c in TIME_COLUMNS if c in cols), None)
+
+
+class _Meter:
+    """Avancement d'un flux de tranches (enregistrements ou octets lus sur le total)."""
+    __slots__ = ("done", "total", "progress")
+
+    def __init__(self, total: int, progress=None):
+        self.done = 0
+        self.total = max(int(total), 1)
+        self.progress = progress
+
+    def advance(self, done: int) -> None:
+        self.done = done
+        if self.progress is not None:
+            self.progress.check()
+
+    @property
+    def fraction(self) -> float:
+        return min(self.done / self.total, 1.0)
+
+
+def _iter_mdf_chunks(mdf, mapper: MdfMapper, name: str, meter: Optional[_Meter] = None) -> Iterator[Chunk]:
+    mapped = mapper.channel(name)
+    if mapped is not None:
+        # Bloc DT non compressé : tranches de vues sur le fichier mappé, sans décodage
+        chunks = mapped.iter_chunks(MDF_FRAGMENT_BYTES // 8)
+    else:
+        chunks = ((sig.timestamps, sig.samples) for sig in mdf.iter_get(name))
+    for t, x in chunks:
+        if meter is not None:
+            meter.advance(meter.done + len(t))
+        yield t, x
+
+
+def _iter_csv_chunks(csv_path: Path, columns: List[str], time_col: Optional[str],
+                     meter: Optional[_Meter] = None) -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """Tranches ``(t, {colonne: valeurs})`` : toutes les colonnes en un seul passage sur le fichier."""
+    usecols = list(dict.fromkeys(columns + ([time_col] if time_col else [])))
+    offset = 0
+    with open(csv_path, "rb") as fh:
+        for df in pd.read_csv(fh, usecols=usecols, chunksize=CSV_CHUNK_ROWS):
+            if meter is not None:
+                meter.advance(fh.tell())
+            if time_col:
+                t = df[time_col].to_numpy(dtype=float)
+            else:
+                t = (np.arange(len(df)) + offset) * CSV_SAMPLE_PERIOD_S
+            offset += len(df)
+            yield t, {c: df[c].to_numpy() for c in columns}
+
+
+def _slice(x, s: int, e: int):
+    return {c: v[s:e] for c, v in x.items()} if isinstance(x, dict) else x[s:e]
+
+
+def _concat(parts: List):
+    if isinstance(parts[0], dict):
+        return {c: np.concatenate([p[c] for p in parts]) for c in parts[0]}
+    return np.concatenate(parts)
+
+
+def _window_signal(chunks: Iterable[Chunk], window_s: float) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """Redécoupe un flux de chunks en fenêtres d'index ``floor(t / window_s)``.
+
+    La fin d'un chunk qui déborde sur la fenêtre suivante est conservée jusqu'au
+    chunk suivant : les fenêtres émises sont toujours complètes. Les valeurs
+    peuvent être un dict ``{colonne: valeurs}`` partageant la base de temps.
+    """
+    current_k: Optional[int] = None
+    pending: List[Chunk] = []
+    for t, x in chunks:
+        if len(t) == 0:
+            continue
+        k = np.floor(t / window_s).astype(np.int64)
+        cuts = np.flatnonzero(np.diff(k)) + 1
+        for s, e in zip(np.r_[0, cuts], np.r_[cuts, len(k)]):
+            kk = int(k[s])
+            if current_k is not None and kk != current_k and pending:
+                yield current_k, np.concatenate([p[0] for p in pending]), _concat([p[1] for p in pending])
+                pending = []
+            current_k = kk
+            pending.append((t[s:e], _slice(x, s, e)))
+    if pending:
+        yield current_k, np.concatenate([p[0] for p in pending]), _concat([p[1] for p in pending])
+
+
+def _merge_streams(streams: Dict[str, Iterator[Tuple[int, np.ndarray, np.ndarray]]]) -> Iterator[Tuple[int, Dict[str, Chunk]]]:
+    """Fusion des flux par index de fenêtre : une seule fenêtre par signal en mémoire."""
+    heap: List[Tuple[int, str, np.ndarray, np.ndarray]] = []
+    for signal, stream in streams.items():
+        head = next(stream, None)
+        if head is not None:
+            heapq.heappush(heap, (head[0], signal, head[1], head[2]))
+    while heap:
+        k = heap[0][0]
+        window: Dict[str, Chunk] = {}
+        while heap and heap[0][0] == k:
+            _, signal, t, x = heapq.heappop(heap)
+            window[signal] = (t, x)
+            head = next(streams[signal], None)
+            if head is not None:
+                heapq.heappush(heap, (head[0], signal, head[1], head[2]))
+        yield k, window
+
+
+def iter_windows(mdf_path: Path, signal_names: List[str], window_s: float = DEFAULT_WINDOW_S,
+                 progress=None) -> Iterator[Tuple[float, float, Dict[str, Chunk]]]:
+    """Itère sur les fenêtres temporelles d'un log.
+
+    Produit ``(t_debut, t_fin, {signal: (timestamps, samples)})`` ; un signal
+    absent d'une fenêtre (ou du fichier) n'apparaît simplement pas dans le dict.
+    Les clés sont les noms demandés, pas les noms résolus dans le fichier.
+    ``mdf_path`` peut aussi être un log segmenté (``eva_session.Session``).
+    """
+    if hasattr(mdf_path, "iter_windows"):
+        yield from mdf_path.iter_windows(signal_names, window_s, progress)
+        return
+    meters: Dict[str, _Meter] = {}
+    suffix = mdf_path.suffix.lower()
+    if not mdf_path.exists():
+        return
+    mdf = None
+    try:
+        if _ASAMMDF_AVAILABLE and suffix in MDF_SUFFIXES:
+            mdf = open_mdf(mdf_path)
+            mapper = MdfMapper(mdf_path, mdf)
+            channels = set(mdf.channels_db.keys())
+            streams: Dict[str, Iterator[Tuple[int, np.ndarray, np.ndarray]]] = {}
+            for signal in signal_names:
+                found = resolve_signal_name(signal, channels)
+                if found:
+                    group = mdf.channels_db[found][0][0]
+                    meters[signal] = _Meter(mdf.groups[group].channel_group.cycles_nr, progress)
+                    streams[signal] = _window_signal(_iter_mdf_chunks(mdf, mapper, found, meters[signal]), window_s)
+            windows = _merge_streams(streams)
+        elif suffix in CSV_SUFFIXES:
+            columns = list(map(str, pd.read_csv(mdf_path, nrows=0).columns))
+            wanted = list(dict.fromkeys(s for s in signal_names if s in columns))
+            if not wanted:
+                return
+            # Toutes les colonnes partagent la base de temps : un seul passage sur le fichier
+            meters["csv"] = _Meter(mdf_path.stat().st_size, progress)
+            chunks = _iter_csv_chunks(mdf_path, wanted, _csv_time_column(columns), meters["csv"])
+            windows = ((k, {s: (t, x[s]) for s in wanted}) for k, t, x in _window_signal(chunks, window_s))
+        else:
+            return
+
+        for k, window in windows:
+            if progress is not None:
+                progress.update(sum(m.fraction for m in meters.values()) / len(meters), f"{(k + 1) * window_s:.0f} s")
+                progress.check()
+            yield k * window_s, (k + 1) * window_s, window
+    finally:
+        if mdf is not None:
+            mdf.close()
+
+
+class RunningStats:
+    """Statistiques cumulées (Welford / Chan) fusionnables fenêtre par fenêtre."""
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=float)  # vue directe si les données sont déjà en float64 (memmap)
+        finite = np.isfinite(x)
+        if not finite.all():
+            x = x[finite]
+        n = len(x)
+        if n == 0:
+            return
+        mean = float(x.mean())
+        m2 = float(((x - mean) ** 2).sum())
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / self.count)) if self.count else 0.0
+
+
+class IntervalTracker:
+    """Détecte les intervalles où une condition est vraie, même à cheval sur deux fenêtres."""
+    __slots__ = ("_start", "_last_t", "intervals")
+
+    def __init__(self):
+        self._start: Optional[float] = None
+        self._last_t: Optional[float] = None
+        self.intervals: List[Tuple[float, float]] = []
+
+    def feed(self, t: np.ndarray, mask: np.ndarray) -> None:
+        if len(t) == 0:
+            return
+        mask = np.asarray(mask, dtype=bool)
+        prev = self._start is not None
+        edges = np.diff(np.r_[prev, mask].astype(np.int8))
+        rises = np.flatnonzero(edges == 1)
+        falls = np.flatnonzero(edges == -1)
+        starts = ([self._start] if prev else []) + t[rises].astype(float).tolist()
+        # Un front descendant en i ferme l'intervalle au dernier échantillon vrai
+        ends = [float(t[i - 1]) if i > 0 else self._last_t for i in falls]
+        self.intervals.extend(zip(starts, ends))
+        self._start = starts[len(ends)] if len(starts) > len(ends) else None
+        self._last_t = float(t[-1])
+
+    def close(self) -> List[Tuple[float, float]]:
+        if self._start is not None:
+            self.intervals.append((self._start, self._last_t))
+            self._start = None
+        return self.intervals
+
+
+class MinMaxDecimator:
+    """Enveloppe min/max d'un signal en nombre de points borné, alimentée par fenêtres."""
+    __slots__ = ("max_points", "step", "_t", "_x", "_rest_t", "_rest_x")
+
+    def __init__(self, max_points: int = 2000):
+        self.max_points = max(4, max_points)
+        self.step = 1
+        self._t = np.empty((0, 2))
+        self._x = np.empty((0, 2))
+        self._rest_t = np.empty(0)
+        self._rest_x = np.empty(0)
+
+    @staticmethod
+    def _reduce(t: np.ndarray, x: np.ndarray, step: int) -> Tuple[np.ndarray, np.ndarray]:
+        n = (len(x) // step) * step
+        tb, xb = t[:n].reshape(-1, step), x[:n].reshape(-1, step)
+        rows = np.arange(len(xb))
+        imin, imax = xb.argmin(axis=1), xb.argmax(axis=1)
+        first = np.minimum(imin, imax)
+        second = np.maximum(imin, imax)
+        return (np.stack([tb[rows, first], tb[rows, second]], axis=1),
+                np.stack([xb[rows, first], xb[rows, second]], axis=1))
+
+    def feed(self, t: np.ndarray, x: np.ndarray) -> None:
+        t = np.r_[self._rest_t, np.asarray(t, dtype=float)]
+        x = np.r_[self._rest_x, np.asarray(x, dtype=float)]
+        n = (len(x) // self.step) * self.step
+        bt, bx = self._reduce(t, x, self.step)
+        self._t, self._x = np.vstack([self._t, bt]), np.vstack([self._x, bx])
+        self._rest_t, self._rest_x = t[n:], x[n:]
+        while 2 * len(self._x) > self.max_points:
+            # Fusion des buckets deux à deux : le pas double, les extrêmes sont conservés
+            self.step *= 2
+            m = len(self._x) // 2 * 2
+            bt, bx = self._reduce(self._t[:m].ravel(), self._x[:m].ravel(), 4)
+            self._t, self._x = np.vstack([bt, self._t[m:]]), np.vstack([bx, self._x[m:]])
+
+    def result(self) -> Chunk:
+        rest_t, rest_x = self._rest_t, self._rest_x
+        if len(rest_x) > 2:
+            rest_t, rest_x = (a.ravel() for a in self._reduce(rest_t, rest_x, len(rest_x)))
+        return np.r_[self._t.ravel(), rest_t], np.r_[self._x.ravel(), rest_x]
+
+
+def scan_signals(mdf_path: Path, signal_names: List[str], window_s: float = DEFAULT_WINDOW_S,
+                 max_points: int = 2000, progress=None,
+                 on_window: Optional[Callable[[Dict[str, Chunk]], None]] = None
+                 ) -> Tuple[Dict[str, RunningStats], Dict[str, Chunk]]:
+    """Un seul passage fenêtré : statistiques par signal + enveloppe décimée pour les graphiques.
+
+    ``on_window(window)`` reçoit aussi chaque fenêtre (autres accumulateurs sur le même passage).
+    """
+    stats = {s: RunningStats() for s in signal_names}
+    envelopes = {s: MinMaxDecimator(max_points) for s in signal_names}
+    for _, _, window in iter_windows(mdf_path, signal_names, window_s, progress):
+        if on_window is not None:
+            on_window(window)
+        for signal, (t, x) in window.items():
+            if not np.issubdtype(np.asarray(x).dtype, np.number):
+                continue
+            stats[signal].update(x)
+            envelopes[signal].feed(t, x)
+    return stats, {s: env.result() for s, env in envelopes.items() if stats[s].count}
+
+
+def detect_uc_intervals(mdf_path: Path, uc_map: Dict[str, List[Tuple[str, Optional[str]]]],
+                        window_s: float = DEFAULT_WINDOW_S, progress=None) -> pd.DataFrame:
+    """Intervalles d'activité des UC d'après leur variable B_Pres_Sig_UC (valeur non nulle)."""
+    uc_flags = {uc: next((b for _, b in pairs if b), None) for uc, pairs in uc_map.items()}
+    uc_flags = {uc: flag for uc, flag in uc_flags.items() if flag}
+    trackers = {uc: IntervalTracker() for uc in uc_flags}
+    for _, _, window in iter_windows(mdf_path, sorted(set(uc_flags.values())), window_s, progress):
+        for uc, flag in uc_flags.items():
+            if flag in window:
+                t, x = window[flag]
+                trackers[uc].feed(t, np.asarray(x, dtype=float) != 0)
+    records = []
+    for uc, tracker in trackers.items():
+        for start, end in tracker.close():
+            records.append({"UC": uc, "TSTART": start, "TEND": end, "Duration": end - start})
+    return pd.DataFrame.from_records(records, columns=["UC", "TSTART", "TEND", "Duration"])
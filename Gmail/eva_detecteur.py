@@ -14,6 +14,22 @@ except Exception:
     MDF = None  # type: ignore
     _ASAMMDF_AVAILABLE = False
 
+try:
+    import python_calamine  # type: ignore  # lecteur Excel natif, ~10x plus rapide qu'openpyxl
+    _CALAMINE_AVAILABLE = tuple(int(x) for x in pd.__version__.split(".")[:2]) >= (2, 2)
+except Exception:
+    _CALAMINE_AVAILABLE = False
+
+from eva_index import channel_names
+from eva_signals import CsvSignalReader, MdfSignalReader, SignalProxy
+from eva_pipeline import Pipeline, PipelineRun, Stage
+from eva_progress import AnalysisCancelled, CancelToken, Progress, ProgressCallback
+from eva_perf import PROFILE_MODES, StageRecorder, config_hash, profile_run, profiling
+from eva_records import SWEET_FALLBACK, SWEET_NOK, SWEET_OK, SweetTable, UCResult
+from eva_chunks import (DEFAULT_WINDOW_S, IntervalTracker, RunningStats, detect_uc_intervals, resolve_signal_name,
+                        scan_signals)
+from eva_session import Session
+
 try:
     # from eva_graphics import generate_all_plots
     _GRAPHICS_AVAILABLE = False  # Désactivé temporairement
@@ -54,8 +70,15 @@ EXIGENCES_CATALOG = {
     }
 }
 
-def read_signal_data(mdf_path: Path, signal_names: List[str]) -> Dict[str, np.ndarray]:
-    """Lit les données des signaux depuis un fichier MDF."""
+def read_signal_data(mdf_path: Path, signal_names: List[str],
+                     t_range: Optional[Tuple[float, float]] = None) -> Dict[str, SignalProxy]:
+    """Lit les signaux depuis un fichier MDF, de façon paresseuse.
+
+    Renvoie un ``SignalProxy`` par signal demandé : rien n'est décodé avant le
+    premier accès à ``.samples`` / ``.timestamps`` (ou ``np.asarray``). Un
+    signal absent donne un proxy vide. ``t_range=(début, fin)`` limite la
+    lecture à cette plage de temps, directement au niveau du lecteur.
+    """
     signal_data = {}
     
     if not mdf_path.exists():
@@ -64,42 +87,31 @@ def read_signal_data(mdf_path: Path, signal_names: List[str]) -> Dict[str, np.nd
     try:
         if _ASAMMDF_AVAILABLE and mdf_path.suffix.lower() in {".mf4", ".mf3", ".mdf"}:
             mdf = MDF(str(mdf_path))
+            reader = MdfSignalReader(mdf_path, mdf)
             channels = set(mdf.channels_db.keys())
             
             for signal in signal_names:
                 # Essayer différentes variantes du nom
-                variants = [signal, signal.lower(), signal.upper(), 
-                           signal.replace("_", ""), signal.replace(" ", "_")]
-                
-                found_signal = None
-                for variant in variants:
-                    if variant in channels:
-                        found_signal = variant
-                        break
-                
-                if found_signal:
-                    try:
-                        sig_data = mdf.get(found_signal)
-                        signal_data[signal] = sig_data.samples
-                    except Exception:
-                        signal_data[signal] = np.array([])
-                else:
-                    signal_data[signal] = np.array([])
+                found_signal = resolve_signal_name(signal, channels)
+                signal_data[signal] = SignalProxy(signal, reader, found_signal,
+                                                  reader.count(found_signal) if found_signal else 0, t_range)
                     
         elif mdf_path.suffix.lower() in {".csv", ".txt"}:
-            df = pd.read_csv(mdf_path)
+            reader = CsvSignalReader(mdf_path, map(str, pd.read_csv(mdf_path, nrows=0).columns), signal_names)
             for signal in signal_names:
-                if signal in df.columns:
-                    signal_data[signal] = df[signal].values
-                else:
-                    signal_data[signal] = np.array([])
+                found_signal = signal if signal in reader.columns else None
+                signal_data[signal] = SignalProxy(signal, reader, found_signal, reader.count(signal), t_range)
                     
     except Exception as e:
         print(f"Erreur lors de la lecture des signaux: {e}")
         
     return signal_data
 
-def verify_requirement(req_id: str, signal_data: Dict[str, np.ndarray]) -> Dict[str, Any]:
+def _has_samples(data) -> bool:
+    """Test de présence : ne décode pas les ``SignalProxy``."""
+    return data.present if isinstance(data, SignalProxy) else len(data) > 0
+
+def verify_requirement(req_id: str, signal_data: Dict[str, Any]) -> Dict[str, Any]:
     """Vérifie une exigence donnée avec les données des signaux."""
     if req_id not in EXIGENCES_CATALOG:
         return {"status": "UNKNOWN", "message": "Exigence non définie"}
@@ -112,11 +124,27 @@ def verify_requirement(req_id: str, signal_data: Dict[str, np.ndarray]) -> Dict[
     available_signals = {}
     
     for signal in required_signals:
-        if signal in signal_data and len(signal_data[signal]) > 0:
+        if signal in signal_data and _has_samples(signal_data[signal]):
             available_signals[signal] = signal_data[signal]
         else:
             missing_signals.append(signal)
     
+    means: Dict[str, float] = {}
+    if not missing_signals and req["logic"] == "custom":
+        # Utiliser la moyenne pour l'évaluation (ou autre logique selon besoin)
+        means = {signal: np.mean(data) for signal, data in available_signals.items()}
+    return _verdict(req, missing_signals, means)
+
+def verify_requirement_from_stats(req_id: str, stats: Dict[str, RunningStats]) -> Dict[str, Any]:
+    """Vérifie une exigence à partir de statistiques cumulées (mode fenêtré)."""
+    if req_id not in EXIGENCES_CATALOG:
+        return {"status": "UNKNOWN", "message": "Exigence non définie"}
+    req = EXIGENCES_CATALOG[req_id]
+    missing_signals = [s for s in req["signals"] if s not in stats or stats[s].count == 0]
+    means = {s: stats[s].mean for s in req["signals"] if s not in missing_signals}
+    return _verdict(req, missing_signals, means)
+
+def _verdict(req: Dict[str, Any], missing_signals: List[str], means: Dict[str, float]) -> Dict[str, Any]:
     if missing_signals:
         return {
             "status": "NOK",
@@ -137,10 +165,7 @@ def verify_requirement(req_id: str, signal_data: Dict[str, np.ndarray]) -> Dict[
             rule = req["rule"]
             
             # Créer un environnement d'évaluation avec les signaux
-            eval_env = {}
-            for signal, data in available_signals.items():
-                # Utiliser la moyenne pour l'évaluation (ou autre logique selon besoin)
-                eval_env[signal] = np.mean(data) if len(data) > 0 else 0
+            eval_env = dict(means)
             
             # Évaluer la règle
             eval_env.update({"abs": abs, "np": np})
@@ -167,22 +192,90 @@ def verify_requirement(req_id: str, signal_data: Dict[str, np.ndarray]) -> Dict[
     
     return {"status": "UNKNOWN", "message": "Logique non implémentée"}
 
-def verify_all_requirements(mdf_path: Path) -> pd.DataFrame:
-    """Vérifie toutes les exigences du catalogue."""
+class RuleViolations:
+    """Intervalles où la règle d'une exigence « custom » est fausse, échantillon par échantillon.
+
+    Le verdict d'une exigence porte sur les moyennes ; ces intervalles datent
+    les écarts (export, extraction des fenêtres). ``feed`` reçoit les signaux
+    fenêtre par fenêtre (ou en une fois) : les signaux d'une règle sont ramenés
+    sur la base de temps du premier par maintien de la dernière valeur, d'une
+    fenêtre à l'autre comprise.
+    """
+
+    def __init__(self, catalog: Optional[Dict[str, Dict[str, Any]]] = None):
+        catalog = EXIGENCES_CATALOG if catalog is None else catalog
+        self.rules = {req_id: req for req_id, req in catalog.items() if req["logic"] == "custom"}
+        self.trackers = {req_id: IntervalTracker() for req_id in self.rules}
+        self._last: Dict[str, Tuple[float, float]] = {}
+
+    def _hold(self, signal: str, t: np.ndarray, window: Dict[str, Any]) -> Optional[np.ndarray]:
+        last = self._last.get(signal)
+        if signal not in window:
+            return None if last is None else np.full(len(t), last[1])
+        ts, xs = window[signal]
+        if not np.issubdtype(np.asarray(xs).dtype, np.number):
+            return None
+        ts, xs = np.asarray(ts, dtype=float), np.asarray(xs, dtype=float)
+        if last is not None:
+            ts, xs = np.r_[last[0], ts], np.r_[last[1], xs]
+        return xs[np.maximum(np.searchsorted(ts, t, "right") - 1, 0)]
+
+    def feed(self, window: Dict[str, Any]) -> None:
+        """``window`` : ``{signal: (timestamps, samples)}``."""
+        for req_id, req in list(self.rules.items()):
+            reference = req["signals"][0]
+            if reference not in window or len(window[reference][0]) == 0:
+                continue
+            t = np.asarray(window[reference][0], dtype=float)
+            values = {s: self._hold(s, t, window) for s in req["signals"]}
+            if any(v is None for v in values.values()):
+                continue
+            try:
+                with np.errstate(invalid="ignore"):
+                    ok = np.asarray(pd.eval(req["rule"], local_dict=values, engine="python"), dtype=bool)
+            except Exception:
+                del self.rules[req_id]  # règle non vectorisable : le verdict signale déjà l'erreur
+                continue
+            known = np.logical_and.reduce([np.isfinite(v) for v in values.values()])
+            self.trackers[req_id].feed(t, ~ok & known)
+        for signal, (t, x) in window.items():
+            if len(t) and np.issubdtype(np.asarray(x).dtype, np.number):
+                self._last[signal] = (float(t[-1]), float(x[-1]))
+
+    def table(self) -> pd.DataFrame:
+        records = [(req_id, ", ".join(self.rules[req_id]["signals"]), start, end, end - start)
+                   for req_id, tracker in self.trackers.items() if req_id in self.rules
+                   for start, end in tracker.close()]
+        return pd.DataFrame(records, columns=["Exigence", "Signaux", "TSTART", "TEND", "Duration"])
+
+def violations_from_signals(signal_data: Dict[str, Any]) -> pd.DataFrame:
+    """Intervalles de violation à partir des signaux entiers (mode non fenêtré)."""
+    violations = RuleViolations()
+    violations.feed({s: (d.timestamps, d.samples) for s, d in signal_data.items() if _has_samples(d)})
+    return violations.table()
+
+def scan_catalog(mdf_path: Path, window_s: float = DEFAULT_WINDOW_S, progress=None):
+    """Passage fenêtré sur les signaux du catalogue : ``(statistiques, enveloppes, violations)``."""
+    violations = RuleViolations()
+    stats, envelopes = scan_signals(mdf_path, _catalog_signals(), window_s, progress=progress,
+                                    on_window=violations.feed)
+    return stats, envelopes, violations.table()
+
+def _catalog_signals() -> List[str]:
     all_signals = []
     for req in EXIGENCES_CATALOG.values():
         all_signals.extend(req["signals"])
-    
     # Supprimer les doublons
-    unique_signals = list(set(all_signals))
-    
-    # Lire les données des signaux
-    signal_data = read_signal_data(mdf_path, unique_signals)
-    
-    # Vérifier chaque exigence
+    return list(dict.fromkeys(all_signals))
+
+def _requirements_table(verify, progress=None) -> pd.DataFrame:
     results = []
-    for req_id, req_info in EXIGENCES_CATALOG.items():
-        verification = verify_requirement(req_id, signal_data)
+    for i, (req_id, req_info) in enumerate(EXIGENCES_CATALOG.items()):
+        if progress is not None:
+            progress.check()
+        verification = verify(req_id)
+        if progress is not None:
+            progress.update((i + 1) / len(EXIGENCES_CATALOG), req_id)
         results.append({
             "Exigence": req_id,
             "Label": req_info["label"],
@@ -191,46 +284,83 @@ def verify_all_requirements(mdf_path: Path) -> pd.DataFrame:
             "Message": verification["message"],
             "Description": verification["details"]
         })
-    
     return pd.DataFrame(results)
 
+def signal_stats(signal_data: Dict[str, Any]) -> Dict[str, RunningStats]:
+    """Statistiques des signaux présents (décode les ``SignalProxy`` qui ne le sont pas encore)."""
+    stats = {}
+    for signal, data in signal_data.items():
+        if _has_samples(data) and np.issubdtype(np.asarray(data).dtype, np.number):
+            stats[signal] = RunningStats()
+            stats[signal].update(np.asarray(data))
+    return stats
+
+def stats_table(stats: Dict[str, RunningStats]) -> pd.DataFrame:
+    """Tableau ``Signal, Count, Mean, Std, Min, Max`` (résultats, magasin, comparaison de runs)."""
+    rows = [(signal, s.count, s.mean, s.std, s.min, s.max) for signal, s in stats.items() if s.count]
+    return pd.DataFrame(rows, columns=["Signal", "Count", "Mean", "Std", "Min", "Max"])
+
+def requirements_table_from_stats(stats: Dict[str, RunningStats]) -> pd.DataFrame:
+    """Tableau des exigences à partir des statistiques d'un passage fenêtré."""
+    return _requirements_table(lambda req_id: verify_requirement_from_stats(req_id, stats))
+
+def verify_all_requirements(mdf_path: Path, chunked: bool = False, window_s: float = DEFAULT_WINDOW_S,
+                            progress=None) -> pd.DataFrame:
+    """Vérifie toutes les exigences du catalogue.
+
+    En mode ``chunked`` les signaux sont parcourus par fenêtres de ``window_s``
+    secondes sans jamais être chargés entièrement en mémoire. ``progress``
+    (``StageProgress``) reçoit l'avancement par exigence (ou par fenêtre).
+    """
+    unique_signals = _catalog_signals()
+    if chunked:
+        stats, _ = scan_signals(mdf_path, unique_signals, window_s, progress=progress)
+        return requirements_table_from_stats(stats)
+    
+    # Lire les données des signaux
+    signal_data = read_signal_data(mdf_path, unique_signals)
+    
+    # Vérifier chaque exigence (les signaux sont décodés au fil des exigences)
+    return _requirements_table(lambda req_id: verify_requirement(req_id, signal_data), progress)
+
 def list_mdf_channels(mdf_path: Optional[Path]) -> Set[str]:
+    """Canaux du log, via l'index persistant (``eva_index``) : seule la 1re analyse d'un fichier lit ses métadonnées."""
     if not mdf_path: return set()
+    if isinstance(mdf_path, Session):
+        return mdf_path.channels()
+    mdf_path = Path(mdf_path)
     if mdf_path.exists():
-        if _ASAMMDF_AVAILABLE and mdf_path.suffix.lower() in {".mf4",".mf3",".mdf"}:
-            try:
-                mdf = MDF(str(mdf_path))
-                return set(mdf.channels_db.keys())
-            except Exception:
-                pass
-        if mdf_path.suffix.lower() in {".csv",".txt"}:
-            try:
-                head = pd.read_csv(mdf_path, nrows=0)
-                return set(map(str, head.columns))
-            except Exception:
-                pass
+        try:
+            return channel_names(mdf_path)
+        except Exception:
+            pass
     return set()
 
+def _excel_file(path: Path) -> pd.ExcelFile:
+    """Classeur ouvert une seule fois (calamine si disponible : hors GIL, les lectures parallèles se recouvrent)."""
+    if _CALAMINE_AVAILABLE:
+        try:
+            return pd.ExcelFile(path, engine="calamine")
+        except Exception:
+            pass  # calamine inutilisable pour ce classeur : moteur par défaut (openpyxl)
+    return pd.ExcelFile(path)
+
 def read_feuil3(labels_xlsx: Path) -> pd.DataFrame:
     """Lit l'onglet Feuil3 ou cherche des alternatives."""
-    # Essayer d'abord Feuil3
     try:
-        df = pd.read_excel(labels_xlsx, sheet_name="Feuil3")
-        df.columns = [str(c).strip() for c in df.columns]
-        return df
+        xl = _excel_file(labels_xlsx)
     except Exception:
-        pass
-    
-    # Si Feuil3 n'est pas bon, essayer les autres onglets
-    try:
-        xl = pd.ExcelFile(labels_xlsx)
-        for sheet in xl.sheet_names:
-            if "sweet" in sheet.lower():
-                df = pd.read_excel(labels_xlsx, sheet_name=sheet)
+        return pd.DataFrame()
+    with xl:
+        # Essayer d'abord Feuil3, puis les onglets « sweet »
+        sheets = ["Feuil3"] + [sheet for sheet in xl.sheet_names if "sweet" in sheet.lower()]
+        for sheet in sheets:
+            try:
+                df = xl.parse(sheet)
                 df.columns = [str(c).strip() for c in df.columns]
                 return df
-    except Exception:
-        pass
+            except Exception:
+                continue
     
     # Retourner un DataFrame vide si rien ne fonctionne
     return pd.DataFrame()
@@ -306,6 +436,26 @@ def detect_from_presence(uc_map: Dict[str, List[Tuple[str, Optional[str]]]], cha
         records.append({"UC": uc, "Required": req, "Present": pres, "Missing": ", ".join(missing_list), "Status": status})
     return pd.DataFrame.from_records(records)
 
+# Colonnes texte très répétitives du mapping SWEET : stockées en catégories (codes entiers)
+MAPPING_CATEGORICAL_COLUMNS = ["Signal SWEET", "Signal MDF trouvé", "CAN Fallback", "Tx/Rx", "MyF2", "MyF3", "MyF4", "MyF5", "Exigence", "Domaine", "HEVC"]
+
+def _categorize_mapping(df: pd.DataFrame) -> pd.DataFrame:
+    for col in MAPPING_CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+def _codes_mask(series: pd.Series, values: Set[str], strip: bool = False) -> np.ndarray:
+    """Appartenance à ``values`` testée une fois par modalité puis propagée par code entier."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype("category")
+    cats = pd.Index(series.cat.categories.astype(str))
+    if strip:
+        cats = cats.str.strip()
+    hit = np.asarray(cats.isin(values) & (cats != ""), dtype=bool)
+    codes = series.cat.codes.to_numpy()
+    return (codes >= 0) & hit[np.maximum(codes, 0)] if len(hit) else np.zeros(len(codes), dtype=bool)
+
 def read_flux_mapping(flux_xlsx: Path, mode: str) -> pd.DataFrame:
     """Lit les mappings SWEET depuis le fichier Excel."""
     # Correspondance des modes vers les noms d'onglets réels
@@ -316,39 +466,40 @@ def read_flux_mapping(flux_xlsx: Path, mode: str) -> pd.DataFrame:
     
     possible_sheets = sheet_mapping.get(mode.lower(), [])
     
-    # Essayer chaque nom d'onglet possible
-    xl = pd.ExcelFile(flux_xlsx)
-    for sheet_name in possible_sheets:
-        if sheet_name in xl.sheet_names:
-            try:
-                df = pd.read_excel(flux_xlsx, sheet_name=sheet_name)
-                df.columns = [str(c).strip() for c in df.columns]
+    # Essayer chaque nom d'onglet possible (le classeur n'est ouvert et analysé qu'une fois)
+    with _excel_file(flux_xlsx) as xl:
+        for sheet_name in possible_sheets:
+            if sheet_name in xl.sheet_names:
+                try:
+                    df = xl.parse(sheet_name)
+                    df.columns = [str(c).strip() for c in df.columns]
                 
-                # Adapter les colonnes selon le format trouvé
-                if "Signal SWEET" not in df.columns:
-                    # Essayer de créer une structure compatible
-                    if len(df.columns) >= 2:
-                        # Renommer les premières colonnes
-                        new_columns = ["Signal SWEET", "Signal MDF trouvé"]
-                        for i, col in enumerate(df.columns[:2]):
-                            if i < len(new_columns):
-                                df = df.rename(columns={col: new_columns[i]})
+                    # Adapter les colonnes selon le format trouvé
+                    if "Signal SWEET" not in df.columns:
+                        # Essayer de créer une structure compatible
+                        if len(df.columns) >= 2:
+                            # Renommer les premières colonnes
+                            new_columns = ["Signal SWEET", "Signal MDF trouvé"]
+                            for i, col in enumerate(df.columns[:2]):
+                                if i < len(new_columns):
+                                    df = df.rename(columns={col: new_columns[i]})
                         
-                        # Ajouter les colonnes manquantes
-                        missing_cols = ["CAN Fallback", "Tx/Rx", "MyF2", "MyF3", "MyF4", "MyF5", "Exigence", "Domaine", "HEVC"]
-                        for col in missing_cols:
-                            if col not in df.columns:
-                                df[col] = "N/A"
+                            # Ajouter les colonnes manquantes
+                            missing_cols = ["CAN Fallback", "Tx/Rx", "MyF2", "MyF3", "MyF4", "MyF5", "Exigence", "Domaine", "HEVC"]
+                            for col in missing_cols:
+                                if col not in df.columns:
+                                    df[col] = "N/A"
                 
-                return df.drop_duplicates().reset_index(drop=True)
-            except Exception:
-                continue
+                    return _categorize_mapping(df.drop_duplicates().reset_index(drop=True))
+                except Exception:
+                    continue
     
     # Si aucun onglet ne fonctionne, retourner un DataFrame vide avec la structure attendue
     return pd.DataFrame(columns=["Signal SWEET", "Signal MDF trouvé", "CAN Fallback", "Tx/Rx", "MyF2", "MyF3", "MyF4", "MyF5", "Exigence", "Domaine", "HEVC"])
 
 def read_pval_requirements(pval_xlsm: Path) -> Set[str]:
-    df = pd.read_excel(pval_xlsm, sheet_name="REQ")
+    with _excel_file(pval_xlsm) as xl:
+        df = xl.parse("REQ")
     col = "DOORS Id" if "DOORS Id" in df.columns else next((c for c in df.columns if str(c).lower().startswith("doors")), None)
     if col is None: return set()
     return set(df[col].dropna().astype(str).str.strip().tolist())
@@ -357,21 +508,27 @@ def filter_mapping_by_pval(df_map: pd.DataFrame, doors_ids: Set[str]) -> pd.Data
     if not doors_ids:
         df_map["_pval_present"] = False
         return df_map
-    df = df_map.copy()
-    df["_pval_present"] = df["Exigence"].isin(doors_ids)
-    return df[df["_pval_present"]].copy().reset_index(drop=True)
+    # Une seule sélection (copie) au lieu de copie + filtre + copie
+    df = df_map.loc[_codes_mask(df_map["Exigence"], doors_ids)].reset_index(drop=True)
+    df["_pval_present"] = True
+    return df
+
+def sweet_table(df_map: pd.DataFrame, channels: Set[str]) -> SweetTable:
+    """Statuts SWEET codés (OK / Fallback / NOK) sans copier le mapping."""
+    def found(col: str) -> np.ndarray:
+        if col not in df_map.columns:
+            return np.zeros(len(df_map), dtype=bool)
+        return _codes_mask(df_map[col], channels, strip=True)
+    codes = np.where(found("Signal MDF trouvé"), SWEET_OK,
+                     np.where(found("CAN Fallback"), SWEET_FALLBACK, SWEET_NOK))
+    return SweetTable(df_map, codes)
 
 def compute_sweet_status(df_map: pd.DataFrame, channels: Set[str]) -> pd.DataFrame:
-    def row_status(row) -> str:
-        sig = str(row.get("Signal MDF trouvé","")).strip(); fb = str(row.get("CAN Fallback","")).strip()
-        if sig and sig in channels: return "OK"
-        if fb and fb in channels: return "Fallback"
-        return "NOK"
-    df = df_map.copy(); df["Statut"] = df.apply(row_status, axis=1); return df
+    return sweet_table(df_map, channels).to_frame()
 
 def _html_escape(s: str) -> str: return html.escape(str(s))
 
-def render(out_path: Path, meta: Dict[str,str], uc_table: pd.DataFrame, df_sweet: pd.DataFrame, uc_map: Dict[str, List[Tuple[str, Optional[str]]]], requirements_table: Optional[pd.DataFrame] = None, plots: Optional[Dict] = None):
+def render(out_path: Path, meta: Dict[str,str], uc_table: pd.DataFrame, df_sweet: pd.DataFrame, uc_map: Dict[str, List[Tuple[str, Optional[str]]]], requirements_table: Optional[pd.DataFrame] = None, plots: Optional[Dict] = None, uc_intervals: Optional[pd.DataFrame] = None, performance: Optional[StageRecorder] = None):
     css = """body{font-family:system-ui,-apple-system,Segoe UI,Roboto,Arial;margin:24px}
     h1{font-size:28px;margin:0 0 8px}h2{font-size:22px;margin-top:24px;border-bottom:1px solid #eee;padding-bottom:4px}
     table{border-collapse:collapse;width:100%;margin:16px 0}th,td{border:1px solid #ddd;padding:6px 8px;text-align:left;vertical-align:top}
@@ -402,6 +559,11 @@ def render(out_path: Path, meta: Dict[str,str], uc_table: pd.DataFrame, df_sweet
         details_html.append(f"<h3>{_html_escape(uc)}</h3><table><thead><tr><th>internal name</th><th>B_Pres_Sig_UC</th></tr></thead><tbody>{lines}</tbody></table>")
     sec3 = "<h2>3) Détails par UC</h2>" + ("".join(details_html) if details_html else "<p>(aucun détail)</p>")
     
+    # Occurrences UC (mode fenêtré)
+    if uc_intervals is not None and not uc_intervals.empty:
+        occ_rows = "".join(f"<tr><td>{_html_escape(r.UC)}</td><td>{r.TSTART:.3f}</td><td>{r.TEND:.3f}</td><td>{r.Duration:.3f}</td></tr>" for r in uc_intervals.itertuples())
+        sec3 += f"<h3>Occurrences</h3><table><thead><tr><th>UC</th><th>TSTART (s)</th><th>TEND (s)</th><th>Durée (s)</th></tr></thead><tbody>{occ_rows}</tbody></table>"
+    
     # Requirements verification
     sec4 = ""
     if requirements_table is not None and not requirements_table.empty:
@@ -441,7 +603,10 @@ def render(out_path: Path, meta: Dict[str,str], uc_table: pd.DataFrame, df_sweet
         rows.append("<tr>" + "".join(tds) + "</tr>")
     sec6 = f"<h2>6) SWEET (filtré PVAL) — Statuts</h2><table><thead><tr>{''.join(f'<th>{_html_escape(c)}</th>' for c in present_cols)}</tr></thead><tbody>{''.join(rows)}</tbody></table><p class='small muted'>OK si « Signal MDF trouvé » présent ; Fallback si « CAN Fallback » présent ; sinon NOK.</p>"
     
-    html_doc = f"<!doctype html><html lang=fr><head><meta charset='utf-8'/><title>Rapport EVA</title><style>{css}</style></head><body><h1>Rapport de Dépouillement Automatique EVA</h1>{sec1}{sec2}{sec3}{sec4}{sec_plots}{sec6}</body></html>"
+    # Performance (optionnel) : mesures des étapes déjà terminées
+    sec_perf = performance.html_section("7) Performance") if performance is not None else ""
+    
+    html_doc = f"<!doctype html><html lang=fr><head><meta charset='utf-8'/><title>Rapport EVA</title><style>{css}</style></head><body><h1>Rapport de Dépouillement Automatique EVA</h1>{sec1}{sec2}{sec3}{sec4}{sec_plots}{sec6}{sec_perf}</body></html>"
     out_path.write_text(html_doc, encoding="utf-8")
 
 # Configuration globale pour l'interface
@@ -452,33 +617,162 @@ CONFIG = {
     "pval_xlsm": Path("PVAL_SYS_ROBUSTNESS.005_copie_outil.xlsm")
 }
 
-def analyser_et_generer_rapport(mdf_path: str, lang: str = "fr", myf: Optional[str] = None) -> Dict[str, Dict]:
-    """Analyse un fichier MDF et retourne les résultats de détection des Use Cases."""
+def filter_mapping_by_myf(df_map: pd.DataFrame, myf) -> pd.DataFrame:
+    """Garde les lignes marquées « 1 » pour chaque version MyF demandée (``None`` / « All MyF versions » : tout)."""
+    versions = [myf] if isinstance(myf, str) else list(myf or [])
+    if not versions or "All MyF versions" in versions:
+        return df_map
+    mask = np.ones(len(df_map), dtype=bool)
+    for version in versions:
+        if version in df_map.columns:
+            mask &= (df_map[version] == "1").to_numpy()
+    return df_map if mask.all() else df_map.loc[mask]
+
+def _sweet_mapping(df_map: pd.DataFrame, doors: Set[str], myf) -> pd.DataFrame:
+    df_map = filter_mapping_by_myf(df_map, myf)
+    return filter_mapping_by_pval(df_map, doors) if doors else df_map.assign(_pval_present=False)
+
+# Graphe unique des étapes d'analyse (détecteur, moteur complet, générateur de rapport)
+PIPELINE = Pipeline([
+    Stage("channels", list_mdf_channels, ["mdf_path"]),
+    Stage("feuil3", read_feuil3, ["labels_xlsx"]),
+    Stage("uc_map", uc_signals_from_feuil3, ["feuil3"]),
+    Stage("uc_table", lambda uc_map, channels: detect_from_presence(uc_map, channels) if uc_map else pd.DataFrame(),
+          ["uc_map", "channels"]),
+    Stage("flux_mapping", read_flux_mapping, ["flux_xlsx", "mode"]),
+    Stage("pval_requirements", read_pval_requirements, ["pval_xlsm"]),
+    Stage("sweet_mapping", _sweet_mapping, ["flux_mapping", "pval_requirements", "myf"]),
+    Stage("sweet", sweet_table, ["sweet_mapping", "channels"]),
+    # Signaux du catalogue lus une fois : exigences, statistiques et graphiques partagent les mêmes proxys
+    Stage("catalog_data", lambda mdf_path: read_signal_data(mdf_path, _catalog_signals()), ["mdf_path"]),
+    Stage("requirements", lambda catalog_data, progress: _requirements_table(
+        lambda req_id: verify_requirement(req_id, catalog_data), progress), ["catalog_data", "progress"]),
+    Stage("signal_data", lambda catalog_data: dict(list(catalog_data.items())[:10]), ["catalog_data"]),
+    # Après les exigences : les signaux sont déjà décodés, et un même lecteur MDF n'est pas partagé entre threads
+    Stage("signal_stats", lambda catalog_data, requirements: stats_table(signal_stats(catalog_data)),
+          ["catalog_data", "requirements"]),
+    Stage("violations", lambda catalog_data, requirements: violations_from_signals(catalog_data),
+          ["catalog_data", "requirements"]),
+    # Mode fenêtré : un seul passage pour les statistiques et les enveloppes des graphiques
+    Stage("scan", scan_catalog, ["mdf_path", "window_s", "progress"]),
+    Stage("requirements_chunked", lambda scan: requirements_table_from_stats(scan[0]), ["scan"]),
+    Stage("signal_stats_chunked", lambda scan: stats_table(scan[0]), ["scan"]),
+    Stage("violations_chunked", lambda scan: scan[2], ["scan"]),
+    Stage("uc_intervals", detect_uc_intervals, ["mdf_path", "uc_map", "window_s", "progress"]),
+])
+
+# Poids des étapes dans l'avancement global : le décodage des signaux domine sur les gros logs
+STAGE_WEIGHTS = {"requirements": 4, "scan": 8, "uc_intervals": 4, "flux_mapping": 2, "pval_requirements": 2}
+# Sorties de l'analyse (non fenêtrée) calculées d'avance dès le choix du fichier (``eva_prewarm``)
+PREWARM_TARGETS = ("uc_map", "uc_table", "sweet", "requirements", "signal_data")
+
+def make_progress(callback: Optional[ProgressCallback] = None, cancel: Optional[CancelToken] = None) -> Optional[Progress]:
+    """``Progress`` pondéré par ``STAGE_WEIGHTS`` (``None`` si ni rappel ni jeton d'annulation)."""
+    if callback is None and cancel is None:
+        return None
+    return Progress(callback, cancel, STAGE_WEIGHTS)
+
+def pipeline_run(mdf_path: Optional[Path], recorder: Optional[StageRecorder] = None, **params: Any) -> PipelineRun:
+    """Run du ``PIPELINE`` ; les fichiers de configuration par défaut viennent de ``CONFIG``."""
+    defaults = {"labels_xlsx": CONFIG["labels_xlsx"], "flux_xlsx": CONFIG["flux_xlsx"], "pval_xlsm": CONFIG["pval_xlsm"],
+                "mode": "sweet400", "myf": None, "window_s": DEFAULT_WINDOW_S}
+    if mdf_path and not isinstance(mdf_path, Session):
+        mdf_path = Path(mdf_path)
+    return PIPELINE.run(recorder, defaults, 1 if _serial(recorder) else None, mdf_path=mdf_path or None, **params)
+
+def _serial(recorder: Optional[StageRecorder]) -> bool:
+    """Étapes en série : profilage (thread appelant seul suivi) ou pics mémoire par étape demandés."""
+    return profiling() or bool(recorder is not None and recorder.trace_memory)
+
+def sweet_summary(table: SweetTable, mode: str) -> Dict[str, Any]:
+    counts = table.counts()
+    return {"mode": mode, "total": len(table), "ok": counts["OK"], "fallback": counts["Fallback"], "nok": counts["NOK"]}
+
+def _run_tags(mdf_file: Optional[Path], *config_paths: Path) -> Dict[str, str]:
+    """Étiquettes des mesures : fichier MDF et empreinte de la configuration."""
+    paths = config_paths or (CONFIG["labels_xlsx"], CONFIG["flux_xlsx"], CONFIG["pval_xlsm"])
+    return {"mdf": mdf_file.name if mdf_file else "", "config_hash": config_hash(paths)}
+
+def _stage_done(tracker: Optional[Progress], name: str) -> None:
+    if tracker is not None:
+        tracker.stage(name).done()
+        tracker.check()
+
+def analyser_et_generer_rapport(mdf_path: str, lang: str = "fr", myf: Optional[str] = None,
+                                chunked: bool = False, window_s: float = DEFAULT_WINDOW_S,
+                                perf: bool = False, trace_path: Optional[str] = None,
+                                recorder: Optional[StageRecorder] = None,
+                                profile: Optional[str] = None,
+                                progress: Optional[ProgressCallback] = None,
+                                cancel: Optional[CancelToken] = None,
+                                run: Optional[PipelineRun] = None,
+                                report_path: Optional[Path] = None) -> Dict[str, Dict]:
+    """Analyse un fichier MDF et retourne les résultats de détection des Use Cases.
+
+    ``chunked=True`` active le mode fenêtré pour les logs plus gros que la RAM :
+    exigences, statistiques, intervalles UC et graphiques (décimés) sont
+    calculés en un seul passage sur des fenêtres de ``window_s`` secondes.
+
+    Chaque étape est mesurée (``results["_perf"]``) ; ``perf=True`` ajoute une
+    section « Performance » au rapport et ``trace_path`` écrit une trace JSON
+    pour chrome://tracing. ``profile`` (``"cprofile"`` ou ``"sample"``) profile
+    le run et écrit ``rapport_eva.prof`` / ``rapport_eva.folded`` à côté du rapport.
+
+    ``progress(fraction, message)`` est appelé (depuis les threads d'analyse) à
+    chaque étape et à chaque tranche décodée ; ``cancel.cancel()`` interrompt
+    l'analyse au prochain point de contrôle et lève ``AnalysisCancelled``.
+
+    ``run`` est un run déjà démarré pour ce fichier (préchauffage, voir
+    ``eva_prewarm``) : l'analyse s'y rattache et reprend ses sorties.
+    Le rapport HTML est écrit dans ``report_path`` (``rapport_eva.html`` par défaut).
+
+    ``mdf_path`` peut être une liste de segments d'un même roulage (ou une
+    ``eva_session.Session``) : ils sont analysés comme un seul log continu,
+    toujours en mode fenêtré.
+    """
+    if profile:
+        base = Path(report_path).with_suffix("") if report_path else Path("rapport_eva")
+        with profile_run(base, profile) as written:
+            results = analyser_et_generer_rapport(mdf_path, lang, myf, chunked, window_s, perf,
+                                                  trace_path, recorder, None, progress, cancel, run, report_path)
+        results["_profile"] = {k: str(v) for k, v in written.items()}
+        return results
+    if isinstance(mdf_path, (list, tuple)):
+        mdf_path = Session(mdf_path)
+    mdf_file = mdf_path if isinstance(mdf_path, Session) else Path(mdf_path)
+    chunked = chunked or isinstance(mdf_file, Session)  # segments parcourus à la suite, sans concaténation
+    rec = recorder or StageRecorder(trace_memory=perf, tags=_run_tags(mdf_file))
+    tracker = make_progress(progress, cancel)
     try:
-        mdf_file = Path(mdf_path)
-        channels = list_mdf_channels(mdf_file)
-        
-        # Lire Feuil3
-        f3 = read_feuil3(CONFIG["labels_xlsx"])
-        uc_map = uc_signals_from_feuil3(f3)
-        uc_table = detect_from_presence(uc_map, channels) if uc_map else pd.DataFrame()
-        
-        # Vérifier les exigences
-        requirements_table = verify_all_requirements(mdf_file)
-        
-        # Lire quelques signaux pour les graphiques
-        signal_names = []
-        for req in EXIGENCES_CATALOG.values():
-            signal_names.extend(req["signals"])
-        signal_names = list(set(signal_names))[:10]  # Limiter à 10 signaux
-        
-        signal_data = read_signal_data(mdf_file, signal_names)
+        if run is not None:
+            run.attach(tracker, rec)
+            if _serial(rec):
+                run.max_workers = 1  # étapes restantes dans ce thread : profileur, pics mémoire
+        else:
+            run = pipeline_run(mdf_file, rec, window_s=window_s, progress=tracker)
+        # Les étapes indépendantes (classeurs Excel, index MDF, exigences) s'exécutent en parallèle
+        uc_intervals = None
+        if chunked:
+            targets = ("uc_map", "uc_table", "sweet", "requirements_chunked", "scan", "uc_intervals",
+                       "signal_stats_chunked", "violations_chunked")
+        else:
+            targets = PREWARM_TARGETS + ("signal_stats", "violations")
+        if tracker is not None:
+            tracker.plan(run.pending(*targets) + ["generate_all_plots", "render"])
+        if chunked:
+            uc_map, uc_table, sweet, requirements_table, scan, uc_intervals, stats, violations = run.get(*targets)
+            signal_data = dict(list(scan[1].items())[:10])  # Limiter à 10 signaux
+        else:
+            uc_map, uc_table, sweet, requirements_table, signal_data, stats, violations = run.get(*targets)
+        df_sweet = sweet.to_frame()
         
         # Générer les graphiques
-        plots = generate_all_plots(signal_data, requirements_table, uc_table)
+        with rec.stage("generate_all_plots"):
+            plots = generate_all_plots(signal_data, requirements_table, uc_table)
+        _stage_done(tracker, "generate_all_plots")
         
         # Générer rapport HTML
-        output_path = Path("rapport_eva.html")
+        output_path = Path(report_path) if report_path else Path("rapport_eva.html")
         meta = {
             "VIN": "N/A",
             "SWID": "N/A", 
@@ -489,56 +783,60 @@ def analyser_et_generer_rapport(mdf_path: str, lang: str = "fr", myf: Optional[s
             "Flux SWEET": CONFIG["flux_xlsx"].name,
             "PVAL": CONFIG["pval_xlsm"].name
         }
+        if isinstance(mdf_file, Session):
+            meta["Segments"] = ", ".join(p.name if o is None else f"{p.name} (+{o:.1f} s)"
+                                         for p, o in zip(mdf_file.segments, mdf_file.offsets))
         
-        df_map = read_flux_mapping(CONFIG["flux_xlsx"], "sweet400")
-        doors = read_pval_requirements(CONFIG["pval_xlsm"])
-        df_map_pval = filter_mapping_by_pval(df_map, doors) if doors else df_map.assign(_pval_present=False)
-        df_sweet = compute_sweet_status(df_map_pval, channels)
-        
-        render(output_path, meta, uc_table, df_sweet, uc_map, requirements_table, plots)
+        with rec.stage("render"):
+            render(output_path, meta, uc_table, df_sweet, uc_map, requirements_table, plots, uc_intervals,
+                   performance=rec if perf else None)
+        _stage_done(tracker, "render")
         
         # Retourner les résultats pour l'interface
         results = {}
         if not uc_table.empty:
-            for _, row in uc_table.iterrows():
-                status = "detected" if row["Status"] == "DETECTABLE" else "not_detected"
-                results[row["UC"]] = {
-                    "status": status,
-                    "required": row["Required"],
-                    "present": row["Present"],
-                    "missing": row["Missing"]
-                }
+            for r in uc_table.itertuples(index=False):
+                status = "detected" if r.Status == "DETECTABLE" else "not_detected"
+                results[r.UC] = UCResult(status, r.Required, r.Present, r.Missing)
         
         # Ajouter les résultats des exigences
         if not requirements_table.empty:
+            counts = requirements_table["Status"].value_counts()
             results["_requirements"] = {
                 "total": len(requirements_table),
-                "ok": len(requirements_table[requirements_table["Status"] == "OK"]),
-                "nok": len(requirements_table[requirements_table["Status"] == "NOK"]),
-                "error": len(requirements_table[requirements_table["Status"] == "ERROR"])
+                "ok": int(counts.get("OK", 0)),
+                "nok": int(counts.get("NOK", 0)),
+                "error": int(counts.get("ERROR", 0))
             }
         
+        if uc_intervals is not None:
+            results["_uc_intervals"] = uc_intervals.to_dict("records")
+        
+        results["_sweet"] = sweet_summary(sweet, "sweet400")
+        # Tables complètes (magasin de résultats, exports) ; les interfaces ignorent les clés « _ »
+        results["_tables"] = {"uc": uc_table, "requirements": requirements_table, "sweet": sweet, "stats": stats,
+                              "violations": violations}
+        
         # Ajouter les graphiques
         results["_plots"] = plots
+        results["_perf"] = rec.to_dict()
+        if trace_path:
+            rec.write_chrome_trace(Path(trace_path))
         
         return results
         
+    except AnalysisCancelled:
+        raise
     except Exception as e:
         return {"Erreur": {"status": "error", "message": str(e)}}
+    finally:
+        if recorder is None:
+            rec.close()
 
 def verifier_presence_mapping_0p01s(mdf_path: str, mode: str = "sweet400", uc_id: Optional[str] = None, myf: Optional[str] = None) -> pd.DataFrame:
     """Vérifie la présence des signaux SWEET dans le fichier MDF."""
     try:
-        mdf_file = Path(mdf_path)
-        channels = list_mdf_channels(mdf_file)
-        
-        df_map = read_flux_mapping(CONFIG["flux_xlsx"], mode)
-        doors = read_pval_requirements(CONFIG["pval_xlsm"])
-        df_map_pval = filter_mapping_by_pval(df_map, doors) if doors else df_map.assign(_pval_present=False)
-        df_sweet = compute_sweet_status(df_map_pval, channels)
-        
-        return df_sweet
-        
+        return pipeline_run(mdf_path, mode=mode).get("sweet").to_frame()
     except Exception as e:
         return pd.DataFrame({"Erreur": [str(e)]})
 
@@ -552,25 +850,39 @@ def main():
     ap.add_argument("--vin", type=str, default="N/A")
     ap.add_argument("--swid", type=str, default="N/A")
     ap.add_argument("--out", type=Path, required=True)
+    ap.add_argument("--profile", nargs="?", const="cprofile", choices=PROFILE_MODES, default=None,
+                    help="Profiler le run (.prof + piles repliées .folded à côté du rapport)")
     args = ap.parse_args()
+    args.out.parent.mkdir(parents=True, exist_ok=True)
 
-    channels = list_mdf_channels(args.mdf) if args.mdf else set()
-
-    f3 = read_feuil3(args.labels_xlsx)
-    uc_map = uc_signals_from_feuil3(f3)
-    uc_table = detect_from_presence(uc_map, channels) if uc_map else pd.DataFrame()
+    if args.profile:
+        out_base = args.out.with_suffix("")
+        with profile_run(out_base, args.profile) as written:
+            rec = _run(args)
+        rec.write_chrome_trace(out_base.with_name(out_base.name + ".trace.json"))
+        for path in written.values():
+            print(f"Profil écrit: {path}")
+    else:
+        _run(args)
+    print(f"Rapport généré: {args.out}")
 
-    df_map = read_flux_mapping(args.flux_xlsx, args.mode)
-    doors = read_pval_requirements(args.pval_xlsm)
-    df_map_pval = filter_mapping_by_pval(df_map, doors) if doors else df_map.assign(_pval_present=False)
-    df_sweet = compute_sweet_status(df_map_pval, channels)
+def _run(args) -> StageRecorder:
+    rec = StageRecorder(trace_memory=bool(args.profile),
+                        tags=_run_tags(args.mdf, args.labels_xlsx, args.flux_xlsx, args.pval_xlsm))
+    try:
+        run = pipeline_run(args.mdf, rec, labels_xlsx=args.labels_xlsx, flux_xlsx=args.flux_xlsx,
+                           pval_xlsm=args.pval_xlsm, mode=args.mode)
+        uc_map, uc_table, sweet = run.get("uc_map", "uc_table", "sweet")
+        df_sweet = sweet.to_frame()
 
-    meta = {"VIN": args.vin, "SWID": args.swid, "Mode": args.mode, "Méthode UC": "Feuil3 (Labels Exemple)",
-            "Fichier MDF": str(args.mdf) if args.mdf else "(non fourni)", "Labels": args.labels_xlsx.name,
-            "Flux SWEET": args.flux_xlsx.name, "PVAL": args.pval_xlsm.name}
-    args.out.parent.mkdir(parents=True, exist_ok=True)
-    render(args.out, meta, uc_table, df_sweet, uc_map)
-    print(f"Rapport généré: {args.out}")
+        meta = {"VIN": args.vin, "SWID": args.swid, "Mode": args.mode, "Méthode UC": "Feuil3 (Labels Exemple)",
+                "Fichier MDF": str(args.mdf) if args.mdf else "(non fourni)", "Labels": args.labels_xlsx.name,
+                "Flux SWEET": args.flux_xlsx.name, "PVAL": args.pval_xlsm.name}
+        with rec.stage("render"):
+            render(args.out, meta, uc_table, df_sweet, uc_map, performance=rec if args.profile else None)
+    finally:
+        rec.close()
+    return rec
 
 if __name__ == "__main__":
     main()
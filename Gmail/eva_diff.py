@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Comparaison de deux analyses (run à run), sans réanalyse.
+
+À l'arrivée d'un nouveau SWID, la question est : qu'est-ce qui a changé par
+rapport au logiciel précédent sur le même véhicule ? ``diff_runs`` compare
+deux analyses déjà en cache :
+
+* signaux SWEET dont le statut a changé (OK → Fallback → NOK, ou l'inverse),
+  ajoutés ou retirés du mapping ;
+* exigences dont le statut a basculé ;
+* UC apparus ou disparus (détectés dans une seule des deux analyses) ;
+* statistiques des signaux (moyenne, min, max) qui bougent de plus de
+  ``tolerance`` (relative à la valeur de référence, au moins son écart-type).
+
+Les analyses viennent du magasin de résultats (id, ou chemin d'un log déjà
+analysé), d'un résultat JSON du service (``<out>/<id>.json``) ou directement
+des résultats de ``analyser_et_generer_rapport``. Tout est calculé par
+opérations d'ensembles et de tableaux sur ces résultats.
+
+Exemple :
+    python eva_diff.py log_sw41.mf4 log_sw42.mf4
+    python eva_diff.py log_sw42.mf4 --previous       # dernier log du même VIN sous un autre SWID
+    python eva_diff.py 1532 1618 --json
+"""
+from __future__ import annotations
+import argparse, json, re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from eva_records import SWEET_STATUSES
+from eva_store import SWEET_MISSING, ResultsStore
+
+DEFAULT_TOLERANCE = 0.05
+ABSENT = "absent"
+STATS_COMPARED = ("Mean", "Min", "Max")
+STATS_COLUMNS = ["Signal", "Count", "Mean", "Std", "Min", "Max"]
+_SERVICE_JOB = re.compile(r"[0-9a-f]{16}")
+
+Ref = Union[int, str, Path]
+
+
+def _frame(value: Any) -> pd.DataFrame:
+    """Table d'un résultat vivant (``DataFrame``, ``SweetTable``) ou relu du JSON (liste d'enregistrements)."""
+    if value is None:
+        return pd.DataFrame()
+    if hasattr(value, "to_frame"):
+        return value.to_frame()
+    return value if isinstance(value, pd.DataFrame) else pd.DataFrame(list(value))
+
+
+def _status_label(codes: np.ndarray) -> np.ndarray:
+    labels = np.array(SWEET_STATUSES + (ABSENT,), dtype=object)
+    return labels[np.where(codes == SWEET_MISSING, len(SWEET_STATUSES), codes)]
+
+
+class Snapshot:
+    """Résultats d'une analyse réduits à ce qui se compare.
+
+    ``signals`` est trié et sans doublon (meilleur statut si le mapping liste
+    un signal sur plusieurs lignes), ``codes`` lui est aligné.
+    """
+    __slots__ = ("label", "requirements", "uc", "signals", "codes", "stats")
+
+    def __init__(self, label: str, requirements: pd.Series, uc: pd.Series,
+                 signals: np.ndarray, codes: np.ndarray, stats: pd.DataFrame):
+        self.label = label
+        self.requirements = requirements
+        self.uc = uc
+        signals = np.asarray(signals, dtype=str)
+        self.signals, inverse = np.unique(signals, return_inverse=True)
+        self.codes = np.full(len(self.signals), len(SWEET_STATUSES), np.int8)
+        np.minimum.at(self.codes, inverse, np.asarray(codes, np.int8))
+        self.stats = stats
+
+    def __repr__(self) -> str:
+        return f"Snapshot({self.label!r}, {len(self.requirements)} exigences, {len(self.signals)} signaux SWEET)"
+
+    @classmethod
+    def from_store(cls, store: ResultsStore, analysis_id: int) -> "Snapshot":
+        detail = store.results(analysis_id)
+        analysis = detail["analysis"]
+        if analysis.empty:
+            raise LookupError(f"Analyse {analysis_id} absente du magasin")
+        a = analysis.iloc[0]
+        label = f"{a['name']} (SWID {a['swid'] or 'N/A'}, #{analysis_id})"
+        req = detail["requirements"]
+        uc = detail["uc"]
+        stats = detail["stats"].rename(columns=str.capitalize)
+        return cls(label, pd.Series(req["status"].to_numpy(), index=req["requirement"].to_numpy()),
+                   pd.Series(uc["status"].to_numpy(), index=uc["uc"].to_numpy()),
+                   detail["sweet"]["signal"].to_numpy(), detail["sweet"]["status"].to_numpy(),
+                   stats.reindex(columns=STATS_COLUMNS))
+
+    @classmethod
+    def from_results(cls, results: Dict[str, Any], label: str = "") -> "Snapshot":
+        """Depuis les résultats de ``analyser_et_generer_rapport`` ou leur version JSON (service)."""
+        tables = results.get("_tables") or {}
+        req = _frame(tables.get("requirements"))
+        uc = {k: v.get("status") for k, v in results.items() if not k.startswith("_") and hasattr(v, "get")}
+        uc = {k: status for k, status in uc.items() if status in ("detected", "not_detected")}
+        sweet = tables.get("sweet")
+        if hasattr(sweet, "codes"):
+            names = _frame(sweet).get("Signal SWEET", pd.Series(dtype=str)).fillna("").astype(str).to_numpy()
+            codes = sweet.codes
+        else:
+            sweet = _frame(sweet)
+            names = sweet.get("Signal SWEET", pd.Series(dtype=str)).fillna("").astype(str).to_numpy()
+            codes = sweet.get("Statut", pd.Series(dtype=str)).map({s: i for i, s in enumerate(SWEET_STATUSES)})
+            known = codes.notna().to_numpy()
+            names, codes = names[known], codes[known].to_numpy(np.int8)
+        stats = _frame(tables.get("stats")).reindex(columns=STATS_COLUMNS)
+        requirements = (pd.Series(req["Status"].astype(str).to_numpy(), index=req["Exigence"].astype(str).to_numpy())
+                        if not req.empty else pd.Series(dtype=object))
+        return cls(label, requirements, pd.Series(uc, dtype=object), names, codes, stats)
+
+
+class RunDiff:
+    """Écarts entre deux analyses (``before`` → ``after``), tables vides si rien n'a changé."""
+    __slots__ = ("before", "after", "tolerance", "sweet", "requirements", "uc_appeared", "uc_disappeared", "stats")
+
+    def __init__(self, before: str, after: str, tolerance: float, sweet: pd.DataFrame, requirements: pd.DataFrame,
+                 uc_appeared: List[str], uc_disappeared: List[str], stats: pd.DataFrame):
+        self.before = before
+        self.after = after
+        self.tolerance = tolerance
+        self.sweet = sweet
+        self.requirements = requirements
+        self.uc_appeared = uc_appeared
+        self.uc_disappeared = uc_disappeared
+        self.stats = stats
+
+    def __bool__(self) -> bool:
+        return bool(len(self.sweet) or len(self.requirements) or self.uc_appeared or self.uc_disappeared
+                    or len(self.stats))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"before": self.before, "after": self.after, "tolerance": self.tolerance,
+                "sweet": self.sweet.to_dict("records"), "requirements": self.requirements.to_dict("records"),
+                "uc_appeared": self.uc_appeared, "uc_disappeared": self.uc_disappeared,
+                "stats": self.stats.replace({np.nan: None}).to_dict("records")}
+
+    def summary(self) -> str:
+        lines = [f"{self.before}  →  {self.after}"]
+        if not self:
+            return "\n".join(lines + ["Aucun changement."])
+        if len(self.requirements):
+            lines.append(f"\nExigences ({len(self.requirements)}) :")
+            lines += [f"  {r.requirement:<28} {r.before} → {r.after}" for r in self.requirements.itertuples()]
+        if self.uc_appeared or self.uc_disappeared:
+            lines.append("\nUse Cases :")
+            lines += [f"  + {uc}" for uc in self.uc_appeared] + [f"  - {uc}" for uc in self.uc_disappeared]
+        if len(self.sweet):
+            counts = self.sweet["change"].value_counts()
+            lines.append(f"\nSWEET ({', '.join(f'{n} {k}' for k, n in counts.items())}) :")
+            lines += [f"  {r.signal:<40} {r.before} → {r.after}" for r in self.sweet.itertuples()]
+        if len(self.stats):
+            lines.append(f"\nStatistiques (écart > {self.tolerance:.0%}) :")
+            lines += [f"  {r.signal:<28} {r.stat:<5} {r.before:.4g} → {r.after:.4g} ({r.change:+.1%})"
+                      for r in self.stats.itertuples()]
+        return "\n".join(lines)
+
+
+def diff_runs(before: Snapshot, after: Snapshot, tolerance: float = DEFAULT_TOLERANCE) -> RunDiff:
+    """Compare deux analyses (voir le module)."""
+    # SWEET : statuts alignés sur l'union triée des signaux, absents codés SWEET_MISSING
+    signals = np.union1d(before.signals, after.signals)
+    codes = np.full((2, len(signals)), SWEET_MISSING, np.int8)
+    for row, snap in enumerate((before, after)):
+        codes[row, np.searchsorted(signals, snap.signals)] = snap.codes
+    changed = np.flatnonzero(codes[0] != codes[1])
+    b, a = codes[0, changed], codes[1, changed]
+    change = np.select([b == SWEET_MISSING, a == SWEET_MISSING, a > b], ["ajouté", "retiré", "dégradé"], "amélioré")
+    sweet = pd.DataFrame({"signal": signals[changed], "before": _status_label(b), "after": _status_label(a),
+                          "change": change})
+    order = {"dégradé": 0, "amélioré": 1, "retiré": 2, "ajouté": 3}
+    sweet = sweet.sort_values(["change", "signal"], key=lambda s: s.map(order) if s.name == "change" else s,
+                              kind="stable").reset_index(drop=True)
+
+    # Exigences : alignement par identifiant
+    req = pd.concat([before.requirements.rename("before"), after.requirements.rename("after")], axis=1).fillna(ABSENT)
+    req = req[req["before"] != req["after"]].rename_axis("requirement").reset_index()
+
+    # UC : ensembles des UC détectés
+    detected = [s.uc.index[s.uc.eq("detected").to_numpy()].to_numpy(dtype=str) for s in (before, after)]
+    appeared = np.setdiff1d(detected[1], detected[0]).tolist()
+    disappeared = np.setdiff1d(detected[0], detected[1]).tolist()
+
+    # Statistiques : signaux communs, écart relatif à max(|valeur de référence|, écart-type)
+    joined = before.stats.set_index("Signal").join(after.stats.set_index("Signal"), how="inner", lsuffix="_b", rsuffix="_a")
+    frames = []
+    if len(joined):
+        scale_floor = joined["Std_b"].abs().fillna(0).to_numpy()
+        for stat in STATS_COMPARED:
+            old, new = joined[f"{stat}_b"].to_numpy(float), joined[f"{stat}_a"].to_numpy(float)
+            scale = np.maximum(np.maximum(np.abs(old), scale_floor), np.finfo(float).tiny)
+            rel = (new - old) / scale
+            hit = np.abs(rel) > tolerance
+            frames.append(pd.DataFrame({"signal": joined.index[hit], "stat": stat, "before": old[hit],
+                                        "after": new[hit], "change": rel[hit]}))
+    stats = (pd.concat(frames, ignore_index=True).sort_values(["signal", "stat"], kind="stable").reset_index(drop=True)
+             if frames else pd.DataFrame(columns=["signal", "stat", "before", "after", "change"]))
+    return RunDiff(before.label, after.label, tolerance, sweet, req, appeared, disappeared, stats)
+
+
+def load_snapshot(ref: Ref, store: Optional[ResultsStore] = None, service_dir: Optional[Path] = None) -> Snapshot:
+    """Analyse en cache désignée par ``ref`` : id du magasin, résultat JSON, id de job du service ou log déjà analysé."""
+    text = str(ref)
+    if service_dir is not None and _SERVICE_JOB.fullmatch(text):
+        ref = text = str(Path(service_dir) / f"{text}.json")
+    if text.endswith(".json"):
+        data = json.loads(Path(text).read_text(encoding="utf-8"))
+        return Snapshot.from_results(data, Path(text).stem)
+    if store is None:
+        raise LookupError(f"Pas de magasin de résultats pour retrouver {text}")
+    if isinstance(ref, int) or text.isdigit():
+        return Snapshot.from_store(store, int(text))
+    analysis_id = store.latest(Path(text))
+    if analysis_id is None:
+        raise LookupError(f"Aucune analyse en cache pour {text} : l'analyser d'abord (eva_watch, eva_workers)")
+    return Snapshot.from_store(store, analysis_id)
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Différences entre deux analyses en cache (SWEET, exigences, UC, statistiques)")
+    ap.add_argument("before", help="Analyse de référence : id du magasin, log déjà analysé, résultat .json ou id de job")
+    ap.add_argument("after", nargs="?", default=None, help="Nouvelle analyse (même formes)")
+    ap.add_argument("--previous", action="store_true",
+                    help="Comparer BEFORE au dernier log du même VIN analysé sous un autre SWID")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Écart relatif toléré sur les statistiques")
+    ap.add_argument("--store", type=Path, default=None, help="Magasin de résultats SQLite (défaut: EVA_STORE)")
+    ap.add_argument("--service_out", type=Path, default=None, help="Répertoire des résultats du service HTTP")
+    ap.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = ap.parse_args(argv)
+    if (args.after is None) != args.previous:
+        ap.error("donner deux analyses, ou une seule avec --previous")
+
+    store = ResultsStore(args.store)
+    try:
+        if args.previous:
+            text = str(args.before)
+            current = int(text) if text.isdigit() else store.latest(Path(text))
+            previous = store.previous_swid(current) if current is not None else None
+            if previous is None:
+                raise SystemExit(f"Pas d'analyse antérieure du même véhicule sous un autre SWID pour {text}")
+            before, after = Snapshot.from_store(store, previous), Snapshot.from_store(store, current)
+        else:
+            before = load_snapshot(args.before, store, args.service_out)
+            after = load_snapshot(args.after, store, args.service_out)
+    finally:
+        store.close()
+    result = diff_runs(before, after, args.tolerance)
+    print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2) if args.json else result.summary())
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Export des résultats EVA en formats colonnes.
+
+Toutes les tables d'une analyse sont exportées : Use Cases, SWEET (mapping et
+statut), verdicts des exigences, intervalles de violation datés,
+statistiques des signaux. Le format suit l'extension du fichier choisi :
+
+* ``.parquet`` : un fichier Parquet par table, un row group par lot ;
+* ``.arrow`` / ``.feather`` : un fichier Arrow IPC par table, un lot par batch ;
+* ``.csv`` : un fichier CSV par table ;
+* ``.ndjson`` / ``.jsonl`` : un seul fichier, une ligne JSON par ligne de
+  table (champ ``table``) ;
+* ``.xlsx`` : un seul classeur, un onglet par table, écrit en mode
+  ``write_only`` d'openpyxl (les lignes partent sur disque au fil de l'eau).
+
+Les formats à un fichier par table nomment les fichiers ``<nom>.<table><ext>``.
+
+Les tables circulent par lots de colonnes (``{colonne: tableau}``, au plus
+``BATCH_ROWS`` lignes) : pas de dict par ligne, pas de ``DataFrame``
+intermédiaire. ``store_tables`` lit le magasin de résultats par lots
+(``ResultsStore.iter_rows``) : l'export d'une flotte entière ne tient jamais
+tout en mémoire.
+
+Parquet et Arrow demandent le paquet optionnel ``pyarrow``.
+
+Exemple :
+    python eva_export.py --out flotte.parquet --since 2026-10-12
+"""
+from __future__ import annotations
+import argparse, csv, json, math
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from eva_records import SWEET_STATUSES
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+    _PYARROW_AVAILABLE = True
+except Exception:
+    pa = pq = None  # type: ignore
+    _PYARROW_AVAILABLE = False
+
+BATCH_ROWS = 65_536
+XLSX_MAX_ROWS = 1_048_575          # limite d'un onglet Excel (hors en-tête)
+FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow",
+           ".ndjson": "ndjson", ".jsonl": "ndjson", ".xlsx": "xlsx", ".csv": "csv"}
+PER_TABLE_FORMATS = ("parquet", "arrow", "csv")
+# Filtres de boîte de dialogue pour les interfaces
+FILETYPES = [("Parquet", "*.parquet"), ("Arrow IPC", "*.arrow"), ("NDJSON", "*.ndjson"),
+             ("Excel", "*.xlsx"), ("CSV", "*.csv")]
+
+Batch = Dict[str, Any]
+
+
+# ---------- sources : lots de colonnes ----------
+
+def frame_batches(df, rows: int = BATCH_ROWS) -> Iterator[Batch]:
+    """Lots de colonnes d'un ``DataFrame`` (vues NumPy, sans copie ligne à ligne)."""
+    if df is None or len(df) == 0:
+        return
+    columns = {str(c): df[c].to_numpy() for c in df.columns}
+    for start in range(0, len(df), rows):
+        yield {c: a[start:start + rows] for c, a in columns.items()}
+
+
+def sweet_batches(table, rows: int = BATCH_ROWS) -> Iterator[Batch]:
+    """Lots d'une ``SweetTable`` : colonnes du mapping + « Statut » décodé depuis les codes int8."""
+    if table is None or len(table) == 0:
+        return
+    mapping = {str(c): table.mapping[c].to_numpy() for c in table.mapping.columns if not str(c).startswith("_")}
+    labels = np.array(SWEET_STATUSES, dtype=object)
+    for start in range(0, len(table), rows):
+        batch = {c: a[start:start + rows] for c, a in mapping.items()}
+        batch["Statut"] = labels[table.codes[start:start + rows]]
+        yield batch
+
+
+def _record_batch(records: Sequence[Any], columns: Dict[str, str]) -> Iterator[Batch]:
+    """Un lot depuis des enregistrements à ``__slots__`` (``UCResult``, ``RequirementVerdict``)."""
+    if records:
+        yield {name: [r.get(attr) for r in records] for name, attr in columns.items()}
+
+
+def result_tables(results: Dict[str, Any]) -> Dict[str, Iterable[Batch]]:
+    """Tables d'un résultat du détecteur (``_tables``) ou du moteur complet (``use_cases``...)."""
+    tables = results.get("_tables")
+    if tables is not None:
+        return {"uc": frame_batches(tables.get("uc")), "sweet": sweet_batches(tables.get("sweet")),
+                "requirements": frame_batches(tables.get("requirements")),
+                "violations": frame_batches(tables.get("violations")), "stats": frame_batches(tables.get("stats"))}
+    if "use_cases" in results:
+        uc = results["use_cases"]
+        requirements = (results.get("requirements") or {}).get("requirements") or []
+        return {
+            "uc": ({"UC": list(uc), **b} for b in _record_batch(list(uc.values()), {
+                "Status": "status", "Required": "required", "Present": "present", "Missing": "missing"})),
+            "sweet": sweet_batches((results.get("sweet_compliance") or {}).get("detailed_results")),
+            "requirements": _record_batch(requirements, {"Exigence": "id", "Description": "description",
+                                                         "Status": "result", "Message": "message",
+                                                         "Signaux NOK": "signals_nok"}),
+        }
+    # Résultats sans tables (anciens appels) : synthèse UC seule
+    uc = {k: v for k, v in results.items() if not k.startswith("_") and hasattr(v, "get")}
+    return {"uc": ({"UC": list(uc), **b} for b in _record_batch(list(uc.values()), {
+        "Status": "status", "Required": "required", "Present": "present", "Missing": "missing"}))}
+
+
+def store_tables(store, analysis_ids: Optional[Sequence[int]] = None,
+                 batch_rows: int = BATCH_ROWS) -> Dict[str, Iterable[Batch]]:
+    """Tables du magasin de résultats (toutes les analyses, ou ``analysis_ids``), lues par lots."""
+    where = ""
+    if analysis_ids is not None:
+        where = f"WHERE analysis_id IN ({', '.join(str(int(i)) for i in analysis_ids) or 'NULL'})"
+
+    def rows(table: str, where: str = where) -> Iterator[Batch]:
+        for columns, chunk in store.iter_rows(table, where, batch_rows=batch_rows):
+            yield dict(zip(columns, (list(c) for c in zip(*chunk))))
+
+    def sweet() -> Iterator[Batch]:
+        # Vecteurs de statuts déroulés en lignes (analysis_id, signal, statut), lot par lot
+        labels = np.array(SWEET_STATUSES, dtype=object)
+        per_vector = max(1, batch_rows // 512)
+        for _, chunk in store.iter_rows("sweet_results", where, batch_rows=per_vector):
+            ids, signals, codes = [], [], []
+            for analysis_id, set_id, blob in chunk:
+                vector = np.frombuffer(blob, np.int8)
+                ids.append(np.full(len(vector), analysis_id, np.int64))
+                signals.append(np.asarray(store.signal_names(set_id), dtype=object))
+                codes.append(vector)
+            if ids:
+                yield {"analysis_id": np.concatenate(ids), "signal": np.concatenate(signals),
+                       "Statut": labels[np.concatenate(codes)]}
+
+    analyses_where = where.replace("analysis_id", "id", 1)
+    return {"analyses": rows("analyses", analyses_where), "uc": rows("uc_results"),
+            "sweet": sweet(), "requirements": rows("requirement_results"),
+            "violations": rows("violations"), "stats": rows("signal_stats")}
+
+
+# ---------- écrivains ----------
+
+def _pylist(values: Any) -> List[Any]:
+    """Colonne en valeurs Python (NaN -> None) pour les formats texte et Excel."""
+    values = values.tolist() if hasattr(values, "tolist") else list(values)
+    return [None if isinstance(v, float) and math.isnan(v) else v for v in values]
+
+
+def _rows(batch: Batch) -> Iterator[tuple]:
+    return zip(*(_pylist(v) for v in batch.values()))
+
+
+class _ArrowSink:
+    """Parquet (un row group par lot) ou Arrow IPC (un record batch par lot) ; schéma fixé au 1er lot."""
+
+    def __init__(self, path: Path, fmt: str):
+        if not _PYARROW_AVAILABLE:
+            raise RuntimeError(f"L'export {fmt} demande le paquet pyarrow (pip install pyarrow)")
+        self.path, self.fmt = path, fmt
+        self.schema = None
+        self._writer = None
+
+    def write(self, batch: Batch) -> None:
+        if self.schema is None:
+            table = pa.Table.from_pydict(batch)
+            # Colonnes entièrement vides dans le 1er lot : texte, pour accepter les lots suivants
+            self.schema = pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                                     for f in table.schema])
+            table = table.cast(self.schema)
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(str(self.path), self.schema)
+            else:
+                self._writer = pa.ipc.new_file(str(self.path), self.schema)
+        else:
+            table = pa.Table.from_pydict(batch, schema=self.schema)
+        if self.fmt == "parquet":
+            self._writer.write_table(table)
+        else:
+            for record_batch in table.to_batches():
+                self._writer.write_batch(record_batch)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _CsvSink:
+    def __init__(self, path: Path):
+        self._fh = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._fh)
+        self._header = False
+
+    def write(self, batch: Batch) -> None:
+        if not self._header:
+            self._writer.writerow(batch.keys())
+            self._header = True
+        self._writer.writerows(_rows(batch))
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def _json_default(value: Any) -> Any:
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def export_tables(tables: Dict[str, Iterable[Batch]], path: Path, fmt: Optional[str] = None) -> List[Path]:
+    """Écrit les tables au format ``fmt`` (d'après l'extension par défaut) ; renvoie les fichiers écrits."""
+    path = Path(path)
+    fmt = fmt or FORMATS.get(path.suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Format d'export inconnu: {path.suffix} (attendu: {', '.join(sorted(FORMATS))})")
+    written: List[Path] = []
+    if fmt in PER_TABLE_FORMATS:
+        for name, batches in tables.items():
+            target = path.with_name(f"{path.stem}.{name}{path.suffix}")
+            sink = _CsvSink(target) if fmt == "csv" else _ArrowSink(target, fmt)
+            wrote = False
+            try:
+                for batch in batches:
+                    sink.write(batch)
+                    wrote = True
+            finally:
+                sink.close()
+            if wrote:
+                written.append(target)
+            elif target.exists():
+                target.unlink()  # table vide : pas de fichier
+        return written
+    if fmt == "ndjson":
+        with open(path, "w", encoding="utf-8") as fh:
+            for name, batches in tables.items():
+                for batch in batches:
+                    keys = ["table"] + list(batch)
+                    fh.writelines(json.dumps(dict(zip(keys, (name,) + row)), ensure_ascii=False,
+                                             default=_json_default) + "\n" for row in _rows(batch))
+        return [path]
+    # xlsx : classeur en écriture seule, un onglet par table (suite sur un nouvel onglet au-delà de la limite Excel)
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    for name, batches in tables.items():
+        sheet, count, part = None, 0, 1
+        for batch in batches:
+            for row in _rows(batch):
+                if sheet is None or count >= XLSX_MAX_ROWS:
+                    sheet = workbook.create_sheet(name if part == 1 else f"{name} ({part})")
+                    sheet.append(list(batch))
+                    count, part = 0, part + 1
+                sheet.append(row)
+                count += 1
+    if not workbook.worksheets:
+        workbook.create_sheet("vide")
+    workbook.save(str(path))
+    return [path]
+
+
+def export_results(results: Dict[str, Any], path: Path) -> List[Path]:
+    """Exporte toutes les tables d'un résultat d'analyse (voir ``result_tables``)."""
+    return export_tables(result_tables(results), path)
+
+
+def main(argv: Optional[List[str]] = None):
+    from eva_store import ResultsStore
+
+    ap = argparse.ArgumentParser(description="Export du magasin de résultats (Parquet, Arrow, NDJSON, XLSX, CSV)")
+    ap.add_argument("--out", type=Path, required=True, help="Fichier de sortie ; l'extension choisit le format")
+    ap.add_argument("--store", type=Path, default=None, help="Magasin de résultats SQLite (défaut: EVA_STORE)")
+    ap.add_argument("--since", default=None, help="Analyses à partir de cette date (AAAA-MM-JJ)")
+    ap.add_argument("--swid", default=None)
+    ap.add_argument("--vin", default=None)
+    args = ap.parse_args(argv)
+
+    store = ResultsStore(args.store)
+    try:
+        ids = None
+        if args.since or args.swid or args.vin:
+            clauses, params = [], []
+            for column, op, value in (("analyzed_at", ">=", args.since), ("swid", "=", args.swid), ("vin", "=", args.vin)):
+                if value:
+                    clauses.append(f"{column} {op} ?")
+                    params.append(value)
+            ids = store.frame("analyses", f"WHERE {' AND '.join(clauses)}", params)["id"].tolist()
+        written = export_tables(store_tables(store, ids), args.out)
+    finally:
+        store.close()
+    for path in written:
+        print(f"Export écrit: {path}")
+    return written
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Extraction des fenêtres de violation d'un log en petits fichiers MF4 / Parquet.
+
+Pour analyser une exigence NOK, l'ingénieur n'a besoin que des signaux de
+l'exigence autour des instants fautifs, pas du log complet de plusieurs Go.
+Chaque intervalle de violation (``RuleViolations``), élargi de ``padding_s``
+de part et d'autre, donne un fichier ``<log>_<exigence>_<début>s.mf4``
+contenant seulement les signaux de l'exigence sur cette fenêtre :
+
+* découpe par blocs : pour un MF4 non compressé, les bornes de chaque bloc DT
+  de la base de temps sont lues puis une recherche dichotomique délimite la
+  fenêtre dans les seuls blocs concernés (``MappedChannel.window``). Aucun
+  signal n'est décodé en entier ; un log de 10 Go s'extrait en quelques
+  secondes. Les canaux compressés (DZ) passent par asammdf (base de temps du
+  groupe puis ``record_offset`` / ``record_count``) ;
+* fenêtres d'une même exigence qui se recouvrent une fois élargies : fusionnées
+  en un seul fichier ;
+* temps conservé (temps du log) pour recouper avec le rapport ; l'en-tête MF4
+  reprend l'heure de début du log source ;
+* Parquet (paquet optionnel ``pyarrow``) : format long ``signal``,
+  ``timestamps``, ``samples`` (chaque signal garde sa propre base de temps).
+
+Les intervalles viennent du magasin de résultats si le log y est déjà analysé,
+sinon d'un passage fenêtré sur les signaux du catalogue (``scan_catalog``).
+
+Exemple :
+    python eva_extract.py log.mf4 --padding 5 --out extraits/
+    python eva_extract.py log.mf4 --requirement REQ_6.519 --format parquet
+"""
+from __future__ import annotations
+import argparse, re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from eva_chunks import CSV_SUFFIXES, MDF_SUFFIXES, _csv_time_column, open_mdf, resolve_signal_name
+from eva_signals import CsvSignalReader, MdfSignalReader
+
+try:
+    from asammdf import MDF, Signal  # type: ignore
+    _ASAMMDF_AVAILABLE = True
+except Exception:
+    MDF = Signal = None  # type: ignore
+    _ASAMMDF_AVAILABLE = False
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+    _PYARROW_AVAILABLE = True
+except Exception:
+    pa = pq = None  # type: ignore
+    _PYARROW_AVAILABLE = False
+
+DEFAULT_PADDING_S = 5.0
+FORMATS = ("mf4", "parquet")
+
+Window = Tuple[str, List[str], float, float]  # (exigence, signaux, début, fin)
+
+
+def violation_windows(violations: pd.DataFrame, padding_s: float = DEFAULT_PADDING_S,
+                      requirements: Optional[Sequence[str]] = None,
+                      catalog: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Window]:
+    """Fenêtres à extraire : intervalles élargis de ``padding_s``, fusionnés par exigence.
+
+    Accepte la table du détecteur (``Exigence``, ``Signaux``, ``TSTART``,
+    ``TEND``) comme celle du magasin (``requirement``, ``tstart``, ``tend``) ;
+    sans colonne de signaux, ceux de l'exigence sont pris dans le catalogue.
+    """
+    if violations is None or violations.empty:
+        return []
+    df = violations.rename(columns={"Exigence": "requirement", "TSTART": "tstart", "TEND": "tend", "Signaux": "signals"})
+    if requirements:
+        df = df[df["requirement"].isin(requirements)]
+    if "signals" not in df.columns:
+        if catalog is None:
+            from eva_detecteur import EXIGENCES_CATALOG as catalog  # cœur d'analyse : chargé seulement ici
+        df = df.assign(signals=[", ".join(catalog.get(r, {}).get("signals", ())) for r in df["requirement"]])
+    windows: List[Window] = []
+    for requirement, group in df.sort_values(["requirement", "tstart"]).groupby("requirement", sort=False):
+        signals = [s.strip() for s in str(group["signals"].iloc[0]).split(",") if s.strip()]
+        current: Optional[List[float]] = None
+        for start, end in zip(group["tstart"] - padding_s, group["tend"] + padding_s):
+            if current is not None and start <= current[1]:
+                current[1] = max(current[1], end)
+                continue
+            if current is not None:
+                windows.append((requirement, signals, current[0], current[1]))
+            current = [float(start), float(end)]
+        if current is not None:
+            windows.append((requirement, signals, current[0], current[1]))
+    return windows
+
+
+def _file_name(log: Path, requirement: str, start: float, suffix: str) -> str:
+    safe = re.sub(r"[^\w.-]+", "_", requirement)
+    return f"{log.stem}_{safe}_{max(start, 0.0):.1f}s{suffix}"
+
+
+def _write_mf4(path: Path, data: Dict[str, Tuple[np.ndarray, np.ndarray]], source_mdf=None,
+               comment: str = "") -> None:
+    if not _ASAMMDF_AVAILABLE:
+        raise RuntimeError("L'extraction MF4 demande le paquet asammdf")
+    out = MDF(version="4.10")
+    try:
+        if source_mdf is not None:
+            out.header.start_time = source_mdf.header.start_time
+        out.header.comment = comment
+        for name, (t, x) in data.items():
+            out.append([Signal(x, t, name=name)], comment=comment)
+        out.save(str(path), overwrite=True)
+    finally:
+        out.close()
+
+
+def _write_parquet(path: Path, data: Dict[str, Tuple[np.ndarray, np.ndarray]], comment: str = "") -> None:
+    if not _PYARROW_AVAILABLE:
+        raise RuntimeError("L'extraction Parquet demande le paquet pyarrow (pip install pyarrow)")
+    names = [np.full(len(t), name, dtype=object) for name, (t, _) in data.items()]
+    table = pa.table({"signal": np.concatenate(names) if names else [],
+                      "timestamps": np.concatenate([t for t, _ in data.values()]) if data else [],
+                      "samples": np.concatenate([np.asarray(x, dtype=float) for _, x in data.values()]) if data else []})
+    pq.write_table(table.replace_schema_metadata({"eva.extract": comment}), str(path))
+
+
+def extract_windows(log_path: Path, windows: Sequence[Window], out_dir: Path, fmt: str = "mf4") -> List[Path]:
+    """Écrit un fichier par fenêtre (signaux de l'exigence seulement) ; renvoie les fichiers écrits."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Format d'extraction inconnu: {fmt} (attendu: {', '.join(FORMATS)})")
+    if hasattr(log_path, "iter_windows"):
+        raise ValueError("Log segmenté : extraire segment par segment")
+    log_path = Path(log_path)
+    if not log_path.exists():
+        raise ValueError(f"Log introuvable: {log_path}")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    suffix = log_path.suffix.lower()
+    mdf = None
+    try:
+        if suffix in MDF_SUFFIXES:
+            mdf = open_mdf(log_path)
+            reader, channels = MdfSignalReader(log_path, mdf), set(mdf.channels_db.keys())
+        elif suffix in CSV_SUFFIXES:
+            columns = list(map(str, pd.read_csv(log_path, nrows=0).columns))
+            channels = set(columns) - {_csv_time_column(columns)}
+            wanted = {resolve_signal_name(s, channels) for _, signals, _, _ in windows for s in signals}
+            reader = CsvSignalReader(log_path, columns, wanted - {None})
+        else:
+            raise ValueError(f"Format de log non supporté: {log_path.suffix}")
+        written: List[Path] = []
+        for requirement, signals, start, end in windows:
+            data: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+            for signal in signals:
+                found = resolve_signal_name(signal, channels)
+                if found is None:
+                    continue
+                t, x = reader.decode(found, (start, end))
+                if len(t):
+                    data[found] = (np.asarray(t, dtype=float), np.asarray(x))
+            if not data:
+                continue
+            comment = f"{requirement} [{start:.3f} s, {end:.3f} s] extrait de {log_path.name}"
+            target = out_dir / _file_name(log_path, requirement, start, ".parquet" if fmt == "parquet" else ".mf4")
+            if fmt == "parquet":
+                _write_parquet(target, data, comment)
+            else:
+                _write_mf4(target, data, mdf, comment)
+            written.append(target)
+        return written
+    finally:
+        if mdf is not None:
+            mdf.close()
+
+
+def log_violations(log_path: Path, store=None) -> pd.DataFrame:
+    """Intervalles de violation du log : magasin de résultats si déjà analysé, sinon passage fenêtré."""
+    if store is not None:
+        analysis_id = store.latest(Path(log_path))
+        if analysis_id is not None:
+            return store.results(analysis_id)["violations"]
+    from eva_detecteur import scan_catalog  # cœur d'analyse : chargé seulement ici
+    return scan_catalog(Path(log_path))[2]
+
+
+def main(argv: Optional[List[str]] = None):
+    from eva_store import ResultsStore
+
+    ap = argparse.ArgumentParser(description="Extraction des fenêtres de violation (signaux de l'exigence seulement)")
+    ap.add_argument("log", type=Path)
+    ap.add_argument("--out", type=Path, default=Path("extraits"), help="Répertoire des extraits")
+    ap.add_argument("--padding", type=float, default=DEFAULT_PADDING_S, help="Secondes ajoutées avant et après")
+    ap.add_argument("--format", choices=FORMATS, default="mf4")
+    ap.add_argument("--requirement", action="append", default=None, help="Exigence(s) à extraire (défaut: toutes)")
+    ap.add_argument("--store", type=Path, default=None, help="Magasin de résultats SQLite (défaut: EVA_STORE)")
+    ap.add_argument("--rescan", action="store_true", help="Ignorer le magasin et réévaluer les exigences")
+    args = ap.parse_args(argv)
+
+    store = None if args.rescan else ResultsStore(args.store)
+    try:
+        violations = log_violations(args.log, store)
+    finally:
+        if store is not None:
+            store.close()
+    windows = violation_windows(violations, args.padding, args.requirement)
+    written = extract_windows(args.log, windows, args.out, args.format)
+    for path in written:
+        print(f"Extrait écrit: {path}")
+    print(f"{len(written)} extrait(s) pour {len(windows)} fenêtre(s) de violation")
+    return written
+
+
+if __name__ == "__main__":
+    main()
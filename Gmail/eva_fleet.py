@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Rapport de flotte : agrégation des analyses du magasin de résultats.
+
+``render`` (rapport EVA) et ``EVAReportGenerator`` décrivent un seul log. Le
+rapport de flotte répond aux questions de validation sur une semaine de
+roulages : taux OK / NOK par exigence et par SWID, disponibilité des signaux
+SWEET par véhicule, nombre de logs où chaque UC est détecté.
+
+* ``Fleet.load`` sélectionne les analyses du magasin (``eva_store``) : une
+  seule par fichier (la plus récente), filtres période / SWID / VIN / mode ;
+* les agrégations sont des ``groupby`` pandas sur les tables longues
+  (exigences, UC) et des réductions NumPy sur la matrice des statuts SWEET
+  (analyses × signaux, ``int8``) : aucune boucle par log ;
+* ``render_fleet`` écrit un seul HTML autonome.
+
+10 000 analyses s'agrègent en quelques secondes, lecture du magasin comprise.
+
+Exemple :
+    python eva_fleet.py --since 2026-10-12 --out rapport_flotte.html
+    python eva_fleet.py --swid SW42 --vin VF1ABC... --out sw42.html
+"""
+from __future__ import annotations
+import argparse, datetime as dt, html
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from eva_records import SWEET_FALLBACK, SWEET_OK
+from eva_store import SWEET_MISSING, ResultsStore
+
+UNKNOWN = "N/A"                  # VIN / SWID non renseignés
+DEFAULT_MAX_SIGNALS = 150        # lignes de la carte SWEET (signaux les moins disponibles d'abord)
+
+IDENTITY = ["path", "size", "mtime_ns", "mode"]
+
+
+class Fleet:
+    """Analyses retenues et leurs résultats, en tables longues prêtes à agréger.
+
+    ``analyses`` : une ligne par log ; ``requirements`` / ``uc`` : lignes de
+    détail avec ``vin`` / ``swid`` de leur analyse ; ``sweet_codes`` :
+    statuts SWEET (lignes alignées sur ``sweet_ids``, colonnes sur ``signals``).
+    """
+    __slots__ = ("analyses", "requirements", "uc", "sweet_ids", "signals", "sweet_codes")
+
+    def __init__(self, analyses: pd.DataFrame, requirements: pd.DataFrame, uc: pd.DataFrame,
+                 sweet_ids: np.ndarray, signals: List[str], sweet_codes: np.ndarray):
+        self.analyses = analyses
+        self.requirements = requirements
+        self.uc = uc
+        self.sweet_ids = sweet_ids
+        self.signals = signals
+        self.sweet_codes = sweet_codes
+
+    def __len__(self) -> int:
+        return len(self.analyses)
+
+    @classmethod
+    def load(cls, store: ResultsStore, since: Optional[str] = None, until: Optional[str] = None,
+             swid: Optional[str] = None, vin: Optional[str] = None, mode: Optional[str] = None) -> "Fleet":
+        """Analyses réussies du magasin, la plus récente par fichier ; ``since`` / ``until`` : dates ISO."""
+        clauses, params = ["status = 'ok'"], []
+        for column, op, value in (("analyzed_at", ">=", since), ("analyzed_at", "<", until),
+                                  ("swid", "=", swid), ("vin", "=", vin), ("mode", "=", mode)):
+            if value:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        analyses = store.frame("analyses", f"WHERE {' AND '.join(clauses)} ORDER BY id", params)
+        # Un fichier réanalysé (nouvelle configuration) ne compte qu'une fois
+        analyses = analyses.drop_duplicates(IDENTITY, keep="last").reset_index(drop=True)
+        analyses[["vin", "swid"]] = analyses[["vin", "swid"]].fillna(UNKNOWN)
+        tags = analyses.set_index("id")[["vin", "swid"]]
+
+        def detail(table: str) -> pd.DataFrame:
+            df = store.frame(table)
+            df = df[df["analysis_id"].isin(tags.index)]
+            return df.join(tags, on="analysis_id").reset_index(drop=True)
+
+        ids, signals, codes = store.sweet_matrix()
+        keep = np.isin(ids, tags.index.to_numpy())
+        return cls(analyses, detail("requirement_results"), detail("uc_results"), ids[keep], signals, codes[keep])
+
+    # ---------- agrégations ----------
+    def requirement_rates(self, by: Sequence[str] = ()) -> pd.DataFrame:
+        """Par exigence (et par ``by``, p.ex. ``["swid"]``) : logs, OK, NOK, ERROR, taux OK."""
+        req = self.requirements
+        keys = list(by) + ["requirement"]
+        if req.empty:
+            return pd.DataFrame(columns=keys + ["logs", "ok", "nok", "error", "rate"])
+        flags = pd.DataFrame({"ok": req["status"].eq("OK"), "nok": req["status"].eq("NOK")})
+        flags["error"] = ~(flags["ok"] | flags["nok"])
+        grouped = flags.groupby([req[k] for k in keys], sort=True)
+        table = grouped.sum().astype(int)
+        table.insert(0, "logs", grouped.size())
+        table["rate"] = table["ok"] / table["logs"]
+        return table.reset_index()
+
+    def sweet_available(self) -> pd.DataFrame:
+        """Disponibilité (OK ou Fallback = 1, NOK = 0, hors liste = NaN) : analyses × signaux."""
+        codes = self.sweet_codes
+        available = ((codes == SWEET_OK) | (codes == SWEET_FALLBACK)).astype(np.float32)
+        available[codes == SWEET_MISSING] = np.nan
+        return pd.DataFrame(available, index=pd.Index(self.sweet_ids, name="analysis_id"), columns=self.signals)
+
+    def sweet_availability(self, by: str = "vin") -> pd.DataFrame:
+        """Carte signaux × ``by`` (VIN par défaut) : part des logs où le signal est disponible."""
+        available = self.sweet_available()
+        groups = self.analyses.set_index("id")[by].reindex(available.index)
+        return available.groupby(groups.to_numpy(), sort=True).mean().T
+
+    def uc_counts(self, by: Sequence[str] = ()) -> pd.DataFrame:
+        """Par UC (et par ``by``) : logs, logs où l'UC est détecté, taux, occurrences (mode fenêtré)."""
+        uc = self.uc
+        keys = list(by) + ["uc"]
+        if uc.empty:
+            return pd.DataFrame(columns=keys + ["logs", "detected", "rate", "occurrences"])
+        grouped = pd.DataFrame({"detected": uc["status"].eq("detected"), "occurrences": uc["occurrences"]}) \
+            .groupby([uc[k] for k in keys], sort=True)
+        table = grouped.agg(logs=("detected", "size"), detected=("detected", "sum"),
+                            occurrences=("occurrences", lambda s: s.sum(min_count=1)))
+        table["rate"] = table["detected"] / table["logs"]
+        return table.reset_index()[keys + ["logs", "detected", "rate", "occurrences"]]
+
+    def swid_summary(self) -> pd.DataFrame:
+        """Par SWID : logs, véhicules, période, taux OK des exigences, disponibilité SWEET, UC détectés par log."""
+        a = self.analyses
+        if a.empty:
+            return pd.DataFrame(columns=["swid", "logs", "vehicles", "first", "last", "requirements_ok",
+                                         "sweet_available", "uc_detected"])
+        table = a.groupby("swid", sort=True).agg(logs=("id", "size"), vehicles=("vin", "nunique"),
+                                                 first=("analyzed_at", "min"), last=("analyzed_at", "max"))
+        req = self.requirements
+        table["requirements_ok"] = req["status"].eq("OK").groupby(req["swid"]).mean()
+        per_log = self.sweet_available().mean(axis=1)
+        table["sweet_available"] = per_log.groupby(a.set_index("id")["swid"].reindex(per_log.index).to_numpy()).mean()
+        uc = self.uc
+        table["uc_detected"] = uc["status"].eq("detected").groupby(uc["swid"]).sum() / table["logs"]
+        return table.reset_index()
+
+
+# ---------- rendu ----------
+
+CSS = """body{font-family:system-ui,-apple-system,Segoe UI,Roboto,Arial;margin:24px}
+h1{font-size:28px;margin:0 0 8px}h2{font-size:22px;margin-top:24px;border-bottom:1px solid #eee;padding-bottom:4px}
+table{border-collapse:collapse;margin:16px 0}th,td{border:1px solid #ddd;padding:6px 8px;text-align:left;vertical-align:top}
+th{background:#f7f7f7}td.num{text-align:right}.muted{color:#666}.small{font-size:12px}
+table.heat td{padding:2px 4px;font-size:11px;text-align:center;min-width:28px}
+table.heat th{font-size:11px;padding:2px 4px}"""
+
+
+def _esc(value: Any) -> str:
+    return html.escape(str(value))
+
+
+def _rate_cell(rate: float) -> str:
+    """Cellule colorée du rouge (0 %) au vert (100 %)."""
+    if rate is None or not np.isfinite(rate):
+        return "<td class='muted'>–</td>"
+    return f"<td class='num' style='background:hsl({rate * 120:.0f},65%,82%)'>{rate:.0%}</td>"
+
+
+def _table(df: pd.DataFrame, rates: Sequence[str] = (), css: str = "") -> str:
+    if df.empty:
+        return "<p class='muted'>(aucune donnée)</p>"
+    head = "".join(f"<th>{_esc(c)}</th>" for c in df.columns)
+    rows = []
+    for values in df.itertuples(index=False):
+        cells = []
+        for column, value in zip(df.columns, values):
+            if column in rates:
+                cells.append(_rate_cell(value))
+            elif isinstance(value, (int, np.integer)):
+                cells.append(f"<td class='num'>{value}</td>")
+            elif isinstance(value, (float, np.floating)):
+                cells.append(f"<td class='num'>{'' if np.isnan(value) else f'{value:.2f}'}</td>")
+            else:
+                cells.append(f"<td>{_esc(value)}</td>")
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    return f"<table class='{css}'><thead><tr>{head}</tr></thead><tbody>{''.join(rows)}</tbody></table>"
+
+
+def _pivot_rates(df: pd.DataFrame, index: str, columns: str) -> pd.DataFrame:
+    if df.empty:
+        return df
+    pivot = df.pivot(index=index, columns=columns, values="rate")
+    return pivot.reset_index().rename_axis(None, axis=1)
+
+
+def render_fleet(out_path: Path, fleet: Fleet, filters: Optional[Dict[str, str]] = None,
+                 max_signals: int = DEFAULT_MAX_SIGNALS) -> Path:
+    """Rapport de flotte HTML (vue d'ensemble, SWID, exigences, UC, carte SWEET)."""
+    a = fleet.analyses
+    now = dt.datetime.now().strftime("%Y-%m-%d %H:%M")
+    overview = {
+        "Logs analysés": len(a),
+        "Véhicules": a["vin"].nunique() if len(a) else 0,
+        "SWID": a["swid"].nunique() if len(a) else 0,
+        "Période": f"{a['analyzed_at'].min()} → {a['analyzed_at'].max()}" if len(a) else "–",
+        "Configurations": a["config_hash"].nunique() if len(a) else 0,
+        **{k: v for k, v in (filters or {}).items() if v},
+        "Généré le": now,
+    }
+    sec1 = "<h2>1) Vue d'ensemble</h2><table><tbody>" + "".join(
+        f"<tr><th>{_esc(k)}</th><td>{_esc(v)}</td></tr>" for k, v in overview.items()) + "</tbody></table>"
+
+    sec2 = "<h2>2) Par SWID</h2>" + _table(fleet.swid_summary(), rates=("requirements_ok", "sweet_available"))
+
+    overall = fleet.requirement_rates()
+    by_swid = _pivot_rates(fleet.requirement_rates(["swid"]), "requirement", "swid")
+    sec3 = ("<h2>3) Exigences</h2><h3>Toute la flotte</h3>" + _table(overall, rates=("rate",))
+            + "<h3>Taux OK par SWID</h3>" + _table(by_swid, rates=[c for c in by_swid.columns if c != "requirement"]))
+
+    uc = fleet.uc_counts()
+    uc_by_swid = _pivot_rates(fleet.uc_counts(["swid"]), "uc", "swid")
+    sec4 = ("<h2>4) Use Cases</h2>" + _table(uc, rates=("rate",))
+            + "<h3>Part des logs où l'UC est détecté, par SWID</h3>"
+            + _table(uc_by_swid, rates=[c for c in uc_by_swid.columns if c != "uc"]))
+
+    heat = fleet.sweet_availability("vin")
+    note = ""
+    if len(heat) > max_signals:
+        note = f"<p class='small muted'>{max_signals} signaux les moins disponibles sur {len(heat)}.</p>"
+    heat = heat.loc[heat.mean(axis=1).sort_values(kind="stable").index[:max_signals]]
+    heat = heat.rename_axis("Signal SWEET").reset_index()
+    sec5 = ("<h2>5) Disponibilité SWEET (signal × véhicule)</h2>" + note
+            + _table(heat, rates=[c for c in heat.columns if c != "Signal SWEET"], css="heat")
+            + "<p class='small muted'>Disponible : statut OK ou Fallback. Case vide : signal hors du mapping "
+              "des analyses de ce véhicule.</p>")
+
+    doc = (f"<!doctype html><html lang=fr><head><meta charset='utf-8'/><title>Rapport de flotte EVA</title>"
+           f"<style>{CSS}</style></head><body><h1>Rapport de flotte EVA</h1>{sec1}{sec2}{sec3}{sec4}{sec5}</body></html>")
+    out_path = Path(out_path)
+    out_path.write_text(doc, encoding="utf-8")
+    return out_path
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Rapport de flotte à partir du magasin de résultats")
+    ap.add_argument("--store", type=Path, default=None, help="Magasin de résultats SQLite (défaut: EVA_STORE)")
+    ap.add_argument("--out", type=Path, default=Path("rapport_flotte.html"))
+    ap.add_argument("--since", default=None, help="Analyses à partir de cette date (AAAA-MM-JJ)")
+    ap.add_argument("--until", default=None, help="Analyses avant cette date (AAAA-MM-JJ)")
+    ap.add_argument("--swid", default=None)
+    ap.add_argument("--vin", default=None)
+    ap.add_argument("--mode", choices=["sweet400", "sweet500"], default=None)
+    ap.add_argument("--max_signals", type=int, default=DEFAULT_MAX_SIGNALS, help="Lignes de la carte SWEET")
+    args = ap.parse_args(argv)
+
+    store = ResultsStore(args.store)
+    try:
+        filters = {"Depuis": args.since, "Avant": args.until, "SWID filtré": args.swid,
+                   "VIN filtré": args.vin, "Mode": args.mode}
+        fleet = Fleet.load(store, args.since, args.until, args.swid, args.vin, args.mode)
+        render_fleet(args.out, fleet, filters, args.max_signals)
+    finally:
+        store.close()
+    print(f"{len(fleet)} analyse(s) agrégée(s) — rapport: {args.out}")
+    return fleet
+
+
+if __name__ == "__main__":
+    main()
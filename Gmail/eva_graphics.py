@@ -11,7 +11,11 @@ from typing import Dict, List, Optional
 import pandas as pd
 
 def create_signal_plots(signal_data: Dict[str, np.ndarray], output_dir: Path = Path("plots")) -> List[Path]:
-    """Génère des graphiques pour les signaux."""
+    """Génère des graphiques pour les signaux.
+
+    Une valeur peut aussi être un couple ``(timestamps, samples)``, p.ex.
+    l'enveloppe min/max produite par le mode fenêtré (``eva_chunks.scan_signals``).
+    """
     output_dir.mkdir(exist_ok=True)
     generated_plots = []
     
@@ -25,6 +29,9 @@ def create_signal_plots(signal_data: Dict[str, np.ndarray], output_dir: Path = P
             pass  # Utiliser le style par défaut
     
     for signal_name, data in signal_data.items():
+        time_axis = None
+        if isinstance(data, tuple):
+            time_axis, data = data
         if len(data) == 0:
             continue
             
@@ -33,7 +40,8 @@ def create_signal_plots(signal_data: Dict[str, np.ndarray], output_dir: Path = P
             fig, ax = plt.subplots(figsize=(12, 6))
             
             # Créer un axe temporel simple
-            time_axis = np.linspace(0, len(data) * 0.01, len(data))  # 10ms par échantillon
+            if time_axis is None:
+                time_axis = np.linspace(0, len(data) * 0.01, len(data))  # 10ms par échantillon
             
             ax.plot(time_axis, data, linewidth=2, label=signal_name)
             ax.set_xlabel('Temps (s)')
@@ -152,8 +160,13 @@ def create_use_cases_plot(uc_table: pd.DataFrame, output_path: Path = Path("use_
 
 def generate_all_plots(signal_data: Dict[str, np.ndarray], 
                       requirements_table: Optional[pd.DataFrame] = None,
-                      uc_table: Optional[pd.DataFrame] = None) -> Dict[str, List[Path]]:
-    """Génère tous les graphiques et retourne les chemins."""
+                      uc_table: Optional[pd.DataFrame] = None,
+                      output_dir: Optional[Path] = None) -> Dict[str, List[Path]]:
+    """Génère tous les graphiques et retourne les chemins.
+
+    ``output_dir`` regroupe tous les fichiers (signaux et synthèses) dans un
+    même dossier ; par défaut ``plots/`` et le répertoire courant.
+    """
     plots = {
         "signals": [],
         "summary": []
@@ -161,16 +174,16 @@ def generate_all_plots(signal_data: Dict[str, np.ndarray],
     
     # Graphiques des signaux
     if signal_data:
-        plots["signals"] = create_signal_plots(signal_data)
+        plots["signals"] = create_signal_plots(signal_data, output_dir) if output_dir else create_signal_plots(signal_data)
     
     # Graphiques de synthèse
     if requirements_table is not None and not requirements_table.empty:
-        req_plot = create_requirements_summary_plot(requirements_table)
+        req_plot = create_requirements_summary_plot(requirements_table, *([output_dir / "requirements_summary.png"] if output_dir else []))
         if req_plot:
             plots["summary"].append(req_plot)
     
     if uc_table is not None and not uc_table.empty:
-        uc_plot = create_use_cases_plot(uc_table)
+        uc_plot = create_use_cases_plot(uc_table, *([output_dir / "use_cases_summary.png"] if output_dir else []))
         if uc_plot:
             plots["summary"].append(uc_plot)
     
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Index des canaux d'un log EVA (MDF ou CSV), mis en cache.
+
+L'index (noms des canaux, nombre d'échantillons, groupe) est construit à
+partir des seules métadonnées du fichier puis mémorisé :
+
+* en mémoire (les ``max_entries`` derniers fichiers utilisés), pour la
+  durée du processus ;
+* sur disque (JSON, un fichier par log), pour les analyses suivantes du même
+  fichier, y compris depuis un autre processus ou une autre interface.
+
+La clé est ``(chemin absolu, taille, mtime)`` : un fichier modifié est
+réindexé automatiquement. Le répertoire du cache disque vient de la variable
+d'environnement ``EVA_INDEX_DIR`` (par défaut ``~/.cache/eva/index``).
+"""
+from __future__ import annotations
+import hashlib, json, os, threading
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+import pandas as pd
+
+try:
+    from asammdf import MDF  # type: ignore
+    _ASAMMDF_AVAILABLE = True
+except Exception:
+    MDF = None  # type: ignore
+    _ASAMMDF_AVAILABLE = False
+
+from eva_chunks import CSV_SUFFIXES, MDF_SUFFIXES
+
+INDEX_VERSION = 1
+INDEX_DIR = Path(os.environ.get("EVA_INDEX_DIR", Path.home() / ".cache" / "eva" / "index"))
+
+FileKey = Tuple[str, int, int]
+
+
+class ChannelIndex:
+    """Métadonnées des canaux d'un fichier : ``{nom: (groupe, nb d'échantillons)}``.
+
+    Pour un CSV, le groupe vaut 0 et le nombre d'échantillons -1 (inconnu sans
+    lire le fichier).
+    """
+    __slots__ = ("path", "size", "mtime_ns", "channels")
+
+    def __init__(self, path: str, size: int, mtime_ns: int, channels: Dict[str, Tuple[int, int]]):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.channels = channels
+
+    @property
+    def key(self) -> FileKey:
+        return (self.path, self.size, self.mtime_ns)
+
+    @property
+    def names(self) -> Set[str]:
+        return set(self.channels)
+
+    def count(self, name: str) -> int:
+        return self.channels.get(name, (0, 0))[1]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.channels
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def to_json(self) -> Dict:
+        return {"version": INDEX_VERSION, "path": self.path, "size": self.size, "mtime_ns": self.mtime_ns,
+                "channels": {k: list(v) for k, v in self.channels.items()}}
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "ChannelIndex":
+        return cls(data["path"], data["size"], data["mtime_ns"],
+                   {k: (int(v[0]), int(v[1])) for k, v in data["channels"].items()})
+
+
+def file_key(path: Path) -> FileKey:
+    st = path.stat()
+    return (str(path.resolve()), st.st_size, st.st_mtime_ns)
+
+
+def _build(path: Path, key: FileKey) -> ChannelIndex:
+    suffix = path.suffix.lower()
+    channels: Dict[str, Tuple[int, int]] = {}
+    if suffix in MDF_SUFFIXES and _ASAMMDF_AVAILABLE:
+        mdf = MDF(str(path))
+        try:
+            for name, occurrences in mdf.channels_db.items():
+                group = occurrences[0][0]
+                channels[name] = (group, int(mdf.groups[group].channel_group.cycles_nr))
+        finally:
+            mdf.close()
+    elif suffix in CSV_SUFFIXES:
+        head = pd.read_csv(path, nrows=0)
+        channels = {str(c): (0, -1) for c in head.columns}
+    return ChannelIndex(*key, channels)
+
+
+class IndexCache:
+    """Cache à deux niveaux (mémoire + JSON sur disque) des ``ChannelIndex``."""
+
+    def __init__(self, cache_dir: Optional[Path] = INDEX_DIR, max_entries: int = 64):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_entries = max_entries
+        self._memory: Dict[FileKey, ChannelIndex] = {}
+        self._lock = threading.Lock()
+
+    def _disk_path(self, resolved: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{hashlib.sha1(resolved.encode('utf-8')).hexdigest()}.json"
+
+    def _load_disk(self, key: FileKey) -> Optional[ChannelIndex]:
+        disk = self._disk_path(key[0])
+        if disk is None or not disk.exists():
+            return None
+        try:
+            data = json.loads(disk.read_text(encoding="utf-8"))
+            if data.get("version") != INDEX_VERSION:
+                return None
+            index = ChannelIndex.from_json(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return index if index.key == key else None
+
+    def _save_disk(self, index: ChannelIndex) -> None:
+        disk = self._disk_path(index.path)
+        if disk is None:
+            return
+        try:
+            disk.parent.mkdir(parents=True, exist_ok=True)
+            tmp = disk.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(index.to_json()), encoding="utf-8")
+            os.replace(tmp, disk)
+        except OSError:
+            pass  # cache disque en lecture seule / indisponible : l'index mémoire suffit
+
+    def get(self, path: Path) -> ChannelIndex:
+        key = file_key(path)
+        with self._lock:
+            index = self._memory.pop(key, None)
+            if index is not None:
+                self._memory[key] = index  # le plus récemment utilisé passe en fin
+        if index is not None:
+            return index
+        index = self._load_disk(key)
+        if index is None:
+            index = _build(path, key)
+            if index.channels:
+                self._save_disk(index)
+        with self._lock:
+            if len(self._memory) >= self.max_entries:
+                self._memory.pop(next(iter(self._memory)))  # le moins récemment utilisé
+            self._memory[key] = index
+        return index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+
+_CACHE = IndexCache()
+
+
+def channel_index(path: Path) -> ChannelIndex:
+    """Index des canaux de ``path`` (cache mémoire puis disque, construit au besoin)."""
+    return _CACHE.get(Path(path))
+
+
+def channel_names(path: Path) -> Set[str]:
+    return channel_index(path).names
+
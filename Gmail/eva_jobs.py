@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+File de travaux d'arrière-plan partagée par les interfaces Tk.
+
+Chaque application crée un ``JobExecutor`` : les actions (analyse,
+vérification SWEET, rapport, export) y sont soumises avec une clé
+``job_key(action, fichier, **options)`` au lieu de démarrer chacune leur
+``threading.Thread``.
+
+* Les travaux passent par un pool borné (un seul worker par défaut) : deux
+  analyses ne se disputent plus les E/S.
+* Une requête identique à un travail en cours (même action, même fichier,
+  mêmes options) ne relance rien : elle est rattachée au travail existant.
+* Les derniers résultats sont conservés par clé (``result``) pour que les
+  actions dépendantes les réutilisent, p.ex. la vérification SWEET à partir
+  de l'analyse qui vient de se terminer. La clé inclut taille et mtime du
+  fichier : un log modifié n'est jamais servi depuis le cache.
+
+Les rappels ``on_done`` / ``on_error`` sont exécutés via ``dispatch`` ; une
+interface Tk passe ``lambda fn: root.after(0, fn)`` pour les recevoir dans la
+boucle Tk.
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+JobKey = Tuple[Hashable, ...]
+Callback = Optional[Callable[[Any], None]]
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = tuple(_freeze(v) for v in value)
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else items
+    return value
+
+
+def _file_ident(path: Any) -> Hashable:
+    """Même identité que ``eva_index.file_key`` (chemin absolu, taille, mtime), sans importer pandas :
+    les interfaces créent leur ``JobExecutor`` avant que le cœur d'analyse ne soit chargé."""
+    path = Path(path)
+    try:
+        st = path.stat()
+    except OSError:
+        return str(path)
+    return (str(path.resolve()), st.st_size, st.st_mtime_ns)
+
+
+def job_key(action: str, path: Any = None, **options: Any) -> JobKey:
+    """Clé d'un travail : action + identité du fichier (chemin, taille, mtime) + options."""
+    return (action, _file_ident(path) if path is not None else None, _freeze(options))
+
+
+class JobExecutor:
+    """Pool de travaux avec dédoublonnage des requêtes en cours et résultats partagés."""
+
+    def __init__(self, dispatch: Optional[Callable[[Callable[[], None]], Any]] = None,
+                 max_workers: int = 1, keep: int = 16):
+        self.dispatch = dispatch or (lambda fn: fn())
+        self.keep = keep
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="eva-job")
+        self._running: Dict[JobKey, Future] = {}
+        self._results: "OrderedDict[JobKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key: JobKey, fn: Callable[..., Any], *args: Any,
+               on_done: Callback = None, on_error: Callback = None, reuse: bool = False, **kwargs: Any) -> Future:
+        """Planifie ``fn(*args, **kwargs)`` sous la clé ``key``.
+
+        Si un travail de même clé est en cours, ses rappels sont simplement
+        ajoutés. Avec ``reuse=True``, un résultat déjà obtenu pour la clé est
+        servi sans rien relancer.
+        """
+        started = False
+        with self._lock:
+            future = self._running.get(key)
+            if future is None and reuse and key in self._results:
+                future = Future()
+                future.set_result(self._results[key])
+            elif future is None:
+                future = self._pool.submit(fn, *args, **kwargs)
+                self._running[key] = future
+                started = True
+        if started:
+            # Hors du verrou : un travail déjà terminé exécute le rappel immédiatement, dans ce thread
+            future.add_done_callback(lambda f, k=key: self._finished(k, f))
+        future.add_done_callback(lambda f: self._notify(f, on_done, on_error))
+        return future
+
+    def _finished(self, key: JobKey, future: Future) -> None:
+        with self._lock:
+            if self._running.get(key) is future:
+                del self._running[key]
+            if not future.cancelled() and future.exception() is None:
+                self._results[key] = future.result()
+                self._results.move_to_end(key)
+                while len(self._results) > self.keep:
+                    self._results.popitem(last=False)
+
+    def _notify(self, future: Future, on_done: Callback, on_error: Callback) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            if on_done is not None:
+                self.dispatch(lambda: on_done(future.result()))
+        elif on_error is not None:
+            self.dispatch(lambda: on_error(error))
+
+    def running(self, key: JobKey) -> bool:
+        with self._lock:
+            return key in self._running
+
+    @property
+    def busy(self) -> bool:
+        with self._lock:
+            return bool(self._running)
+
+    def result(self, key: JobKey, default: Any = None) -> Any:
+        """Dernier résultat obtenu pour ``key`` (``default`` sinon)."""
+        with self._lock:
+            return self._results.get(key, default)
+
+    def latest(self, action: str, path: Any = None) -> Any:
+        """Résultat le plus récent d'une action sur un fichier, quelles que soient les options."""
+        ident = job_key(action, path)[1]
+        with self._lock:
+            for (a, i, _), value in reversed(self._results.items()):
+                if a == action and i == ident:
+                    return value
+        return None
+
+    def forget(self, path: Any = None) -> None:
+        """Oublie les résultats conservés (tous, ou ceux d'un fichier)."""
+        ident = job_key("", path)[1] if path is not None else None
+        with self._lock:
+            stale: List[JobKey] = [k for k in self._results if ident is None or k[1] == ident]
+            for k in stale:
+                del self._results[k]
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Chargement paresseux des modules lourds pour un démarrage rapide des interfaces.
+
+pandas, numpy, asammdf et le cœur d'analyse (``eva_detecteur``,
+``eva_complete_engine``) coûtent plusieurs centaines de millisecondes à
+importer. Les interfaces Tk les référencent via ``lazy_import`` /
+``lazy_attr`` : la fenêtre s'affiche d'abord, l'import réel a lieu au premier
+usage, ou plus tôt en arrière-plan avec ``preload`` pendant que l'utilisateur
+choisit un fichier.
+
+Ce module ne doit importer que la bibliothèque standard.
+"""
+from __future__ import annotations
+import importlib
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+_MISSING = object()
+
+
+class LazyModule:
+    """Module importé au premier accès à l'un de ses attributs."""
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)  # verrou d'import par module : sûr entre threads
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyModule {self._name!r} {'chargé' if self.loaded else 'non chargé'}>"
+
+
+class LazyAttr:
+    """Attribut d'un module (fonction, objet, dict) résolu au premier usage.
+
+    Si le module est introuvable, ``fallback()`` fournit la valeur de
+    remplacement (les interfaces gardent ainsi leurs implémentations de
+    secours sans importer le cœur au démarrage).
+    """
+    __slots__ = ("_module", "_attr", "_fallback", "_value", "_lock")
+
+    def __init__(self, module: str, attr: str, fallback: Optional[Callable[[], Any]] = None):
+        self._module = module
+        self._attr = attr
+        self._fallback = fallback
+        self._value = _MISSING
+        self._lock = threading.Lock()
+
+    def _resolve(self) -> Any:
+        if self._value is _MISSING:
+            with self._lock:
+                if self._value is _MISSING:
+                    try:
+                        self._value = getattr(importlib.import_module(self._module), self._attr)
+                    except ImportError:
+                        if self._fallback is None:
+                            raise
+                        self._value = self._fallback()
+        return self._value
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self._resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._resolve(), attr)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._resolve()[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._resolve()[key] = value
+
+    def __iter__(self):
+        return iter(self._resolve())
+
+    def __repr__(self) -> str:
+        return f"<LazyAttr {self._module}.{self._attr}>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def lazy_attr(module: str, attr: str, fallback: Optional[Callable[[], Any]] = None) -> LazyAttr:
+    return LazyAttr(module, attr, fallback)
+
+
+def preload(names: Iterable[str], on_done: Optional[Callable[[], None]] = None) -> threading.Thread:
+    """Importe ``names`` dans un thread d'arrière-plan ; les erreurs d'import sont ignorées
+    (elles réapparaîtront, ou déclencheront le repli, au premier usage)."""
+    names = list(names)
+
+    def run() -> None:
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+        if on_done is not None:
+            on_done()
+
+    thread = threading.Thread(target=run, name="eva-preload", daemon=True)
+    thread.start()
+    return thread
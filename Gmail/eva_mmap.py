@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Lecture zero-copy des canaux MF4 non compressés.
+
+Pour un groupe de canaux trié dont les blocs de données sont des DT bruts
+(pas de DZ), chaque canal à enregistrement de taille fixe est exposé comme une
+vue ``np.ndarray`` à pas (stride = taille d'enregistrement) sur un
+``np.memmap`` du fichier : aucune copie, les pages sont servies par le cache
+du système. La conversion physique (``channel.conversion``) n'est appliquée
+qu'à l'accès, et seulement si le canal en possède une.
+
+Tout canal qui ne remplit pas ces conditions renvoie ``None`` : l'appelant
+retombe alors sur le décodage asammdf habituel.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+try:
+    from asammdf.blocks import v4_constants as v4c  # type: ignore
+    _ASAMMDF_AVAILABLE = True
+except Exception:
+    v4c = None  # type: ignore
+    _ASAMMDF_AVAILABLE = False
+
+# data_type MF4 -> (type numpy, boutisme)
+_DTYPE_KINDS = {0: ("u", "<"), 1: ("u", ">"), 2: ("i", "<"), 3: ("i", ">"), 4: ("f", "<"), 5: ("f", ">")}
+
+
+class MappedChannel:
+    """Canal MF4 lu directement dans le fichier mappé, bloc DT par bloc DT."""
+    __slots__ = ("name", "raw_blocks", "conversion", "_master")
+
+    def __init__(self, name: str, raw_blocks: List[np.ndarray], conversion, master: Optional["MappedChannel"]):
+        self.name = name
+        self.raw_blocks = raw_blocks
+        self.conversion = conversion
+        self._master = master
+
+    def __len__(self) -> int:
+        return sum(len(b) for b in self.raw_blocks)
+
+    def physical(self, raw: np.ndarray) -> np.ndarray:
+        """Applique la conversion du canal (aucune copie si le canal n'en a pas)."""
+        return raw if self.conversion is None else self.conversion.convert(raw)
+
+    @property
+    def raw(self) -> np.ndarray:
+        """Valeurs brutes : vue directe si un seul bloc, sinon concaténation."""
+        if len(self.raw_blocks) == 1:
+            return self.raw_blocks[0]
+        return np.concatenate(self.raw_blocks) if self.raw_blocks else np.array([])
+
+    @property
+    def samples(self) -> np.ndarray:
+        return self.physical(self.raw)
+
+    @property
+    def timestamps(self) -> Optional[np.ndarray]:
+        return self._master.samples if self._master is not None else None
+
+    def window(self, t_start: float, t_end: float) -> Tuple[np.ndarray, np.ndarray]:
+        """``(timestamps, samples)`` sur ``[t_start, t_end]`` : seuls les blocs DT qui recoupent l'intervalle sont lus.
+
+        Les bornes de chaque bloc de la base de temps sont lues d'abord (une page
+        chacune), puis la recherche dichotomique se fait dans les blocs retenus.
+        """
+        master = self._master if self._master is not None else self
+        times, values = [], []
+        for block, t_block in zip(self.raw_blocks, master.raw_blocks):
+            if not len(t_block):
+                continue
+            if master.physical(t_block[-1:])[0] < t_start:
+                continue
+            if master.physical(t_block[:1])[0] > t_end:
+                break  # base de temps croissante : blocs suivants hors intervalle
+            t = t_block if master.conversion is None else master.physical(t_block)
+            i0, i1 = np.searchsorted(t, t_start, "left"), np.searchsorted(t, t_end, "right")
+            times.append(master.physical(t_block[i0:i1]))
+            values.append(self.physical(block[i0:i1]))
+        if len(times) == 1:
+            return times[0], values[0]
+        if not times:
+            return np.array([]), np.array([])
+        return np.concatenate(times), np.concatenate(values)
+
+    def iter_chunks(self, max_records: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Itère ``(timestamps, samples)`` par tranches de ``max_records`` enregistrements."""
+        master = self._master if self._master is not None else self
+        for block, t_block in zip(self.raw_blocks, master.raw_blocks):
+            for start in range(0, len(block), max_records):
+                stop = start + max_records
+                yield master.physical(t_block[start:stop]), self.physical(block[start:stop])
+
+
+class MdfMapper:
+    """Fabrique de vues zero-copy pour les canaux d'un MDF déjà ouvert avec asammdf."""
+
+    def __init__(self, mdf_path: Path, mdf):
+        self.mdf_path = Path(mdf_path)
+        self.mdf = mdf
+        self._buffer: Optional[np.memmap] = None
+        self._masters: Dict[int, Optional[MappedChannel]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return _ASAMMDF_AVAILABLE and str(getattr(self.mdf, "version", "")) >= "4.00"
+
+    @property
+    def buffer(self) -> np.memmap:
+        if self._buffer is None:
+            self._buffer = np.memmap(self.mdf_path, dtype=np.uint8, mode="r")
+        return self._buffer
+
+    def _map(self, group_index: int, channel_index: int) -> Optional[MappedChannel]:
+        group = self.mdf.groups[group_index]
+        if not group.sorted or group.data_group.record_id_len:
+            return None
+        blocks = list(group.get_data_blocks())
+        if any(b.block_type != v4c.DT_BLOCK or b.location != v4c.LOCATION_ORIGINAL_FILE for b in blocks):
+            return None
+        ch = group.channels[channel_index]
+        if ch.channel_type not in (v4c.CHANNEL_TYPE_VALUE, v4c.CHANNEL_TYPE_MASTER):
+            return None
+        if ch.flags & v4c.FLAG_CN_INVALIDATION_PRESENT or ch.bit_offset or ch.data_type not in _DTYPE_KINDS:
+            return None
+        if ch.bit_count not in (8, 16, 32, 64) or (ch.data_type in (4, 5) and ch.bit_count < 32):
+            return None
+        kind, endian = _DTYPE_KINDS[ch.data_type]
+        dtype = np.dtype(f"{endian}{kind}{ch.bit_count // 8}")
+        cg = group.channel_group
+        record_size = cg.samples_byte_nr + cg.invalidation_bytes_nr
+        if ch.byte_offset + dtype.itemsize > cg.samples_byte_nr:
+            return None
+        views = []
+        for b in blocks:
+            count = b.original_size // record_size
+            views.append(np.ndarray(shape=(count,), dtype=dtype, buffer=self.buffer,
+                                    offset=b.address + ch.byte_offset, strides=(record_size,)))
+        master = None
+        if ch.channel_type != v4c.CHANNEL_TYPE_MASTER:
+            master = self._master(group_index)
+            if master is None:
+                return None  # base de temps non mappable : décodage classique
+        return MappedChannel(ch.name, views, ch.conversion, master)
+
+    def _master(self, group_index: int) -> Optional[MappedChannel]:
+        if group_index not in self._masters:
+            group = self.mdf.groups[group_index]
+            idx = next((i for i, c in enumerate(group.channels) if c.channel_type == v4c.CHANNEL_TYPE_MASTER), None)
+            self._masters[group_index] = self._map(group_index, idx) if idx is not None else None
+        return self._masters[group_index]
+
+    def channel(self, name: str) -> Optional[MappedChannel]:
+        """Vue zero-copy du canal ``name``, ou ``None`` s'il faut passer par asammdf."""
+        if not self.enabled:
+            return None
+        occurrences = self.mdf.channels_db.get(name, ())
+        if len(occurrences) != 1:
+            return None
+        group_index, channel_index = occurrences[0]
+        try:
+            return self._map(group_index, channel_index)
+        except Exception:
+            return None
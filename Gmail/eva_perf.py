@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Instrumentation légère des étapes d'analyse EVA.
+
+``StageRecorder.stage(nom)`` (gestionnaire de contexte) ou ``@recorder.timed(nom)``
+mesure pour chaque étape : temps réel, temps CPU, pic RSS du processus, pic
+tracemalloc (si activé) et octets lus. Le pic tracemalloc est global au
+processus : il n'est attribué à une étape que si aucune étape d'un autre thread
+ne l'a chevauchée (run en série, p.ex. ``--profile``). Les mesures sont exportables en liste
+de dicts (résultats), en section HTML « Performance » et en trace JSON
+lisible par ``chrome://tracing`` / Perfetto.
+
+``profile_run`` profile un run complet (cProfile et/ou échantillonnage des
+piles) et écrit les statistiques ``.prof`` et un fichier de piles repliées
+``.folded`` (flamegraph.pl, speedscope) à côté du rapport.
+"""
+from __future__ import annotations
+import cProfile, collections, functools, hashlib, html, io, json, os, pstats, sys, threading, time, tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import resource  # type: ignore  # absent sous Windows
+except ImportError:
+    resource = None  # type: ignore
+
+try:
+    import psutil  # type: ignore
+except ImportError:
+    psutil = None  # type: ignore
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    return None
+
+
+def _bytes_read() -> Optional[int]:
+    """Octets lus par le processus (``/proc/self/io`` ou psutil), ``None`` si indisponible."""
+    try:
+        with open("/proc/self/io", "rb") as fh:
+            for line in fh:
+                if line.startswith(b"rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if psutil is not None:
+        try:
+            return psutil.Process().io_counters().read_bytes
+        except Exception:
+            pass
+    return None
+
+
+def config_hash(paths: Iterable[Any]) -> str:
+    """Empreinte courte (sha1) du contenu des fichiers de configuration."""
+    digest = hashlib.sha1()
+    for p in paths:
+        if p is None:
+            continue
+        p = Path(p)
+        digest.update(p.name.encode("utf-8"))
+        try:
+            digest.update(p.read_bytes())
+        except OSError:
+            digest.update(b"<absent>")
+    return digest.hexdigest()[:12]
+
+
+class StageRecorder:
+    """Collecte les mesures des étapes d'une analyse (étapes imbriquables, enregistrables depuis plusieurs threads).
+
+    Temps et octets lus sont mesurés par étape quel que soit le thread ; le pic
+    tracemalloc d'une étape chevauchée par une étape d'un autre thread est
+    laissé vide (``None``).
+    """
+
+    def __init__(self, trace_memory: bool = False, tags: Optional[Dict[str, Any]] = None):
+        self.trace_memory = trace_memory
+        self.tags: Dict[str, Any] = dict(tags or {})
+        self.stages: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._active: Dict[int, int] = {}  # thread -> étapes ouvertes
+        self._epoch = 0                    # incrémenté quand deux threads ont des étapes ouvertes
+        self._own_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracing = True
+
+    def close(self) -> None:
+        if self._own_tracing:
+            tracemalloc.stop()
+            self._own_tracing = False
+
+    @property
+    def _stack(self) -> List[Dict[str, Any]]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        """Mesure le bloc ; le dict produit peut être complété (``rec["rows"] = ...``)."""
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        stack = self._stack
+        ident = threading.get_ident()
+        with self._lock:
+            shared = any(t != ident for t in self._active)
+            if shared and not stack:
+                self._epoch += 1
+            self._active[ident] = self._active.get(ident, 0) + 1
+            epoch = self._epoch
+        if shared:
+            tracing = False  # pic global : ne pas remettre à zéro celui des étapes en cours ailleurs
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]["_peak_seen"] = max(stack[-1]["_peak_seen"], peak)
+            tracemalloc.reset_peak()
+        else:
+            current = 0
+        rec: Dict[str, Any] = {"name": name, "args": dict(args), "depth": len(stack),
+                               "thread": threading.current_thread().name, "_mem_start": current, "_peak_seen": current}
+        read0 = _bytes_read()
+        cpu0 = time.thread_time()
+        t0 = time.perf_counter()
+        stack.append(rec)
+        try:
+            yield rec
+        finally:
+            stack.pop()
+            with self._lock:
+                overlapped = shared or self._epoch != epoch
+                self._active[ident] -= 1
+                if not self._active[ident]:
+                    del self._active[ident]
+            rec["wall_s"] = time.perf_counter() - t0
+            rec["cpu_s"] = time.thread_time() - cpu0
+            rec["start_s"] = t0 - self._origin
+            read1 = _bytes_read()
+            rec["bytes_read"] = read1 - read0 if read0 is not None and read1 is not None else None
+            rec["peak_rss_bytes"] = _peak_rss_bytes()
+            mem_start, peak_seen = rec.pop("_mem_start"), rec.pop("_peak_seen")
+            if tracing and not overlapped:
+                peak = max(peak_seen, tracemalloc.get_traced_memory()[1])
+                rec["tracemalloc_peak_bytes"] = peak - mem_start
+                if stack:
+                    stack[-1]["_peak_seen"] = max(stack[-1]["_peak_seen"], peak)
+            elif self.trace_memory:
+                rec["tracemalloc_peak_bytes"] = None
+            with self._lock:
+                self.stages.append(rec)
+
+    def timed(self, name: Optional[str] = None):
+        """Décorateur : mesure chaque appel de la fonction comme une étape."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*a, **kw):
+                with self.stage(name or fn.__name__):
+                    return fn(*a, **kw)
+            return wrapper
+        return decorator
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            stages = sorted(self.stages, key=lambda r: r["start_s"])
+        return [{**r, **({"tags": self.tags} if self.tags else {})} for r in stages]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace au format « Trace Event » (événements complets ``ph: X``, en µs)."""
+        pid = os.getpid()
+        tids: Dict[str, int] = {}
+        events = []
+        for r in self.to_dict():
+            tid = tids.setdefault(r["thread"], len(tids) + 1)
+            args = {k: v for k, v in r.items() if k not in ("name", "start_s", "wall_s", "thread", "depth", "args")}
+            args.update(r["args"])
+            events.append({"name": r["name"], "cat": "eva", "ph": "X", "pid": pid, "tid": tid,
+                           "ts": r["start_s"] * 1e6, "dur": r["wall_s"] * 1e6, "args": args})
+        for thread, tid in tids.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": self.tags}
+
+    def write_chrome_trace(self, path: Path) -> Path:
+        path = Path(path)
+        path.write_text(json.dumps(self.chrome_trace(), default=str), encoding="utf-8")
+        return path
+
+    def html_section(self, title: str = "Performance") -> str:
+        """Section HTML (tableau des étapes) pour le rapport."""
+        def mb(v):
+            return f"{v / 1024**2:.1f}" if v is not None else "—"
+        rows = "".join(
+            f"<tr><td>{'&nbsp;' * 4 * r['depth']}{html.escape(r['name'])}</td><td>{r['wall_s'] * 1000:.1f}</td>"
+            f"<td>{r['cpu_s'] * 1000:.1f}</td><td>{mb(r.get('tracemalloc_peak_bytes'))}</td>"
+            f"<td>{mb(r['peak_rss_bytes'])}</td><td>{mb(r['bytes_read'])}</td></tr>"
+            for r in self.to_dict())
+        return (f"<h2>{html.escape(title)}</h2><table><thead><tr><th>Étape</th><th>Temps (ms)</th><th>CPU (ms)</th>"
+                f"<th>Pic tracemalloc (MB)</th><th>Pic RSS (MB)</th><th>Lu (MB)</th></tr></thead><tbody>{rows}</tbody></table>")
+
+
+class SamplingProfiler:
+    """Échantillonne la pile d'un thread à intervalle fixe (``sys._current_frames``).
+
+    Le résultat est un compteur de piles repliées ``a;b;c`` (racine en premier),
+    le format attendu par flamegraph.pl et speedscope.
+    """
+
+    def __init__(self, interval_s: float = 0.005, thread_id: Optional[int] = None):
+        self.interval_s = interval_s
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks: collections.Counter = collections.Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{Path(code.co_filename).name}:{code.co_name}"
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="eva-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def write_collapsed(self, path: Path) -> Path:
+        path = Path(path)
+        lines = (f"{stack} {count}" for stack, count in self.stacks.most_common())
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+
+PROFILE_MODES = ("cprofile", "sample")
+_profiling = threading.local()
+
+
+def profiling() -> bool:
+    """Vrai dans un bloc ``profile_run`` du thread courant : les étapes doivent s'y exécuter en série."""
+    return getattr(_profiling, "depth", 0) > 0
+
+
+@contextmanager
+def profile_run(out_base: Path, mode: str = "cprofile", interval_s: float = 0.005) -> Iterator[Dict[str, Path]]:
+    """Profile le bloc et écrit ``<out_base>.folded`` (+ ``.prof`` / ``.prof.txt`` en mode cprofile).
+
+    L'échantillonneur tourne dans les deux modes ; ``sample`` évite le surcoût
+    de cProfile. Le dict produit est rempli avec les chemins écrits en sortie.
+    Les deux ne suivent que le thread appelant : pendant le bloc ``profiling()``
+    est vrai et les runs du pipeline s'exécutent en série dans ce thread.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Mode de profilage inconnu: {mode} (attendu: {', '.join(PROFILE_MODES)})")
+    out_base = Path(out_base)
+    out_base.parent.mkdir(parents=True, exist_ok=True)  # un profil écrit même si le bloc échoue
+    written: Dict[str, Path] = {}
+    profiler = cProfile.Profile() if mode == "cprofile" else None
+    sampler = SamplingProfiler(interval_s)
+    sampler.start()
+    if profiler is not None:
+        profiler.enable()
+    _profiling.depth = getattr(_profiling, "depth", 0) + 1
+    try:
+        yield written
+    finally:
+        _profiling.depth -= 1
+        if profiler is not None:
+            profiler.disable()
+        sampler.stop()
+        written["folded"] = sampler.write_collapsed(out_base.with_name(out_base.name + ".folded"))
+        if profiler is not None:
+            written["prof"] = out_base.with_name(out_base.name + ".prof")
+            profiler.dump_stats(str(written["prof"]))
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(40)
+            written["summary"] = out_base.with_name(out_base.name + ".prof.txt")
+            written["summary"].write_text(summary.getvalue(), encoding="utf-8")
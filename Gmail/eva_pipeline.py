@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Pipeline d'analyse EVA par étapes nommées.
+
+Chaque ``Stage`` déclare ses entrées (paramètres du run ou sorties d'autres
+étapes) et produit une sortie du même nom. ``Pipeline.run(**params)`` crée un
+``PipelineRun`` : les sorties y sont mémorisées pour toute la durée du run, et
+``run.get(...)`` n'exécute que les étapes nécessaires, en parallèle (pool de
+threads) dès que leurs entrées sont prêtes — p.ex. lecture des classeurs
+Excel ∥ indexation du MDF.
+
+Le paramètre réservé ``progress`` (un ``eva_progress.Progress``) rend compte
+de l'avancement étape par étape et permet l'annulation entre deux étapes ; une
+étape qui déclare l'entrée ``progress`` reçoit son propre ``StageProgress``
+pour rapporter son avancement interne.
+
+Le graphe des étapes EVA est défini dans ``eva_detecteur.PIPELINE`` ; le
+détecteur, le moteur complet et le générateur de rapport le consomment tous.
+"""
+from __future__ import annotations
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+DEFAULT_WORKERS = 4
+PROGRESS = "progress"   # entrée réservée : suivi d'avancement propre à l'étape
+
+
+class PipelineStopped(Exception):
+    """Run arrêté (``PipelineRun.stop``) avant d'avoir produit les sorties demandées."""
+
+
+class Stage:
+    """Étape nommée : ``fn(*entrées)`` -> sortie ``name``."""
+    __slots__ = ("name", "fn", "inputs")
+
+    def __init__(self, name: str, fn: Callable[..., Any], inputs: Sequence[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, inputs={self.inputs!r})"
+
+
+class Pipeline:
+    """Graphe d'étapes (sans cycle) ; les entrées non produites par une étape sont des paramètres."""
+
+    def __init__(self, stages: Iterable[Stage], max_workers: int = DEFAULT_WORKERS):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Étape en double: {stage.name}")
+            self.stages[stage.name] = stage
+        self.max_workers = max_workers
+        self.params: Set[str] = {i for s in self.stages.values() for i in s.inputs if i not in self.stages}
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        state: Dict[str, int] = {}
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == 2 or name not in self.stages:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Cycle dans le pipeline: {' -> '.join(path + [name])}")
+            state[name] = 1
+            for dep in self.stages[name].inputs:
+                visit(dep, path + [name])
+            state[name] = 2
+
+        for name in self.stages:
+            visit(name, [])
+
+    def affected(self, params: Iterable[str]) -> Set[str]:
+        """Étapes dont la sortie dépend (directement ou non) d'un des paramètres ``params``."""
+        changed = set(params)
+        affected: Set[str] = set()
+        grew = True
+        while grew:
+            grew = False
+            for name, stage in self.stages.items():
+                if name not in affected and any(i in changed or i in affected for i in stage.inputs):
+                    affected.add(name)
+                    grew = True
+        return affected
+
+    def run(self, recorder=None, defaults: Optional[Dict[str, Any]] = None,
+            max_workers: Optional[int] = None, **params: Any) -> "PipelineRun":
+        """Nouveau run ; ``recorder`` (``StageRecorder``) mesure chaque étape exécutée.
+
+        ``max_workers=1`` exécute les étapes en série dans le thread appelant
+        (profilage : cProfile et l'échantillonneur ne suivent que ce thread).
+        """
+        return PipelineRun(self, {**(defaults or {}), **params}, recorder, max_workers)
+
+
+class PipelineRun:
+    """Exécution mémoïsée d'un ``Pipeline`` pour un jeu de paramètres."""
+
+    def __init__(self, pipeline: Pipeline, params: Dict[str, Any], recorder=None, max_workers: Optional[int] = None):
+        self.pipeline = pipeline
+        self.params = params
+        self.params.setdefault(PROGRESS, None)
+        self.recorder = recorder
+        self.max_workers = max_workers or pipeline.max_workers
+        self._results: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._results or name in self.params
+
+    def attach(self, progress=None, recorder=None) -> "PipelineRun":
+        """Rattache un nouveau suivi (avancement, mesures) à un run déjà démarré, p.ex. préchauffé.
+
+        Les étapes qui démarrent ensuite rendent compte à ``progress`` ; annuler
+        son jeton annule aussi le suivi précédent, donc les étapes en cours.
+        """
+        previous = self.params[PROGRESS]
+        if progress is not None and previous is not None and previous.token is not progress.token:
+            progress.token.link(previous.token)
+        self.params[PROGRESS] = progress
+        if recorder is not None:
+            self.recorder = recorder
+        return self
+
+    def stop(self) -> None:
+        """N'ouvre plus aucune étape ; celles en cours s'achèvent et gardent leur sortie (reprise par ``derive``)."""
+        self._stopped.set()
+
+    def derive(self, recorder=None, **params: Any) -> "PipelineRun":
+        """Nouveau run aux paramètres modifiés : les sorties déjà obtenues qui ne dépendent
+        d'aucun paramètre changé sont reprises, seules les étapes touchées seront recalculées.
+
+        Les étapes en cours dans ce run sont attendues avant l'instantané : arrêter
+        le run d'abord (``stop``) pour ne pas attendre aussi celles qui restaient à lancer.
+        """
+        changed = {k for k, v in params.items()
+                   if k != PROGRESS and (k not in self.params or self.params[k] != v)}
+        run = PipelineRun(self.pipeline, {**self.params, PROGRESS: None, **params}, recorder or self.recorder,
+                          self.max_workers)
+        stale = self.pipeline.affected(changed) | changed
+        with self._lock:  # ``get`` garde le verrou tant que des étapes sont en cours
+            done = dict(self._results)
+        run._results = {k: v for k, v in done.items() if k not in stale}
+        return run
+
+    def _needed(self, targets: Sequence[str]) -> List[str]:
+        needed: List[str] = []
+        seen: Set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in seen or name in self._results:
+                return
+            seen.add(name)
+            if name not in self.pipeline.stages:
+                if name not in self.params:
+                    raise KeyError(f"Paramètre manquant pour le pipeline: {name}")
+                return
+            for dep in self.pipeline.stages[name].inputs:
+                visit(dep)
+            needed.append(name)
+
+        for t in targets:
+            visit(t)
+        return needed
+
+    def _value(self, name: str) -> Any:
+        return self._results[name] if name in self._results else self.params[name]
+
+    def _execute(self, stage: Stage) -> Any:
+        progress = self.params[PROGRESS]
+        tracker = None
+        if progress is not None:
+            progress.check()
+            tracker = progress.stage(stage.name)
+        args = [tracker if i == PROGRESS else self._value(i) for i in stage.inputs]
+        if self.recorder is None:
+            result = stage.fn(*args)
+        else:
+            with self.recorder.stage(stage.name):
+                result = stage.fn(*args)
+        if tracker is not None:
+            tracker.done()
+        return result
+
+    def pending(self, *names: str) -> List[str]:
+        """Étapes qu'il faudrait encore exécuter pour obtenir ``names``."""
+        with self._lock:
+            return self._needed(names)
+
+    def provide(self, name: str, value: Any) -> None:
+        """Fournit la sortie d'une étape calculée ailleurs ; l'étape ne sera pas exécutée."""
+        with self._lock:
+            self._results[name] = value
+
+    def results(self, *names: str) -> Dict[str, Any]:
+        """Comme ``get`` mais renvoie ``{nom: sortie}``."""
+        if not names:
+            return {}
+        values = self.get(*names)
+        return dict(zip(names, values if len(names) > 1 else (values,)))
+
+    def get(self, *names: str) -> Any:
+        """Sortie(s) demandée(s) ; une seule valeur si un seul nom, sinon un tuple."""
+        with self._lock:
+            pending = self._needed(names)
+            if pending:
+                if self.params[PROGRESS] is not None:
+                    self.params[PROGRESS].plan(pending)
+                self._schedule(pending)
+            values = tuple(self._value(n) for n in names)
+        return values[0] if len(values) == 1 else values
+
+    def _schedule(self, pending: List[str]) -> None:
+        stages = self.pipeline.stages
+        remaining = list(pending)
+        running: Dict[Future, str] = {}
+        workers = min(self.max_workers, len(pending))
+        if workers <= 1:
+            for name in remaining:
+                if self._stopped.is_set():
+                    raise PipelineStopped(name)
+                self._results[name] = self._execute(stages[name])
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eva-stage") as pool:
+            while remaining or running:
+                ready = [] if self._stopped.is_set() else [
+                    n for n in remaining if all(i in self._results or i in self.params for i in stages[n].inputs)]
+                for name in ready:
+                    remaining.remove(name)
+                    running[pool.submit(self._execute, stages[name])] = name
+                if not running:
+                    raise PipelineStopped(", ".join(remaining))  # étapes en cours achevées, les autres jamais lancées
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self._results[name] = future.result()  # l'erreur d'une étape remonte à l'appelant
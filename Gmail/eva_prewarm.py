@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Préchauffage spéculatif d'une analyse dès le choix du fichier.
+
+Entre la sélection du log et le clic sur « Analyser », l'utilisateur règle
+ses options pendant plusieurs secondes. ``Prewarmer.start`` lance aussitôt,
+dans un thread d'arrière-plan, les étapes du pipeline qui ne dépendent que du
+fichier et des options courantes : index des canaux MDF, configuration Excel
+compilée, décodage des signaux requis.
+
+* ``take`` remet le run préchauffé à l'analyse : celle-ci s'y rattache
+  (``PipelineRun.attach``) et attend les étapes en cours au lieu de repartir
+  de zéro.
+* Changer d'options arrête le run en cours (``PipelineRun.stop`` : aucune
+  nouvelle étape, celles en cours s'achèvent) et en dérive un nouveau run
+  (``PipelineRun.derive``) : seules les étapes qui dépendent des options
+  changées sont recalculées.
+* Changer de fichier repart d'un run neuf.
+
+Ce module n'importe que la bibliothèque standard et des modules légers : les
+interfaces le créent au démarrage, le cœur d'analyse n'est chargé que dans
+le thread de préchauffage.
+"""
+from __future__ import annotations
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Sequence
+
+from eva_jobs import job_key
+from eva_progress import CancelToken, Progress
+
+
+def _stop_run(future: Future) -> None:
+    if future.exception() is None and future.result() is not None:
+        future.result().stop()
+
+
+class Prewarmer:
+    """Un run préchauffé à la fois, pour le dernier fichier choisi.
+
+    ``make_run(mdf_path, progress=..., **options)`` crée le ``PipelineRun`` ;
+    les options sont des paramètres du pipeline (p.ex. ``mode``, ``myf``) et
+    ``targets`` les sorties à calculer d'avance. Les deux ne sont résolus que
+    dans le thread de préchauffage (ils peuvent venir de ``eva_lazy``).
+    """
+
+    def __init__(self, make_run: Callable[..., Any], targets: Sequence[str]):
+        self.make_run = make_run
+        self.targets = targets
+        self._lock = threading.Lock()
+        self._key = None
+        self._file = None
+        self._token: Optional[CancelToken] = None
+        self._run: Optional[Future] = None
+
+    def start(self, mdf_path: Any, **options: Any) -> None:
+        """(Re)lance le préchauffage pour ``mdf_path`` et ``options`` ; sans effet s'il est déjà en cours."""
+        key = job_key("prewarm", mdf_path, **options)
+        with self._lock:
+            if key == self._key:
+                return
+            previous = self._run if key[1] == self._file else None
+            if previous is not None:
+                previous.add_done_callback(_stop_run)  # étapes en cours gardées pour le nouveau run
+            elif self._token is not None:
+                self._token.cancel()
+            token, future = CancelToken(), Future()
+            self._key, self._file, self._token, self._run = key, key[1], token, future
+        threading.Thread(target=self._warm, args=(future, previous, mdf_path, options, token),
+                         name="eva-prewarm", daemon=True).start()
+
+    def _warm(self, future: Future, previous: Optional[Future], mdf_path: Any, options: dict,
+              token: CancelToken) -> None:
+        progress = Progress(token=token)
+        try:
+            base = previous.result() if previous is not None else None
+        except Exception:
+            base = None
+        try:
+            if base is not None:
+                run = base.derive(progress=progress, **options)
+            else:
+                run = self.make_run(mdf_path, progress=progress, **options)
+        except Exception as e:
+            future.set_exception(e)  # le cœur d'analyse ne se charge pas : l'analyse le signalera
+            return
+        future.set_result(run)
+        if run is None:
+            return
+        try:
+            run.get(*self.targets)
+        except Exception:
+            pass  # annulé, ou étape en échec : l'analyse la refera et remontera l'erreur
+
+    def take(self, mdf_path: Any, **options: Any):
+        """Run préchauffé pour ce fichier (inchangé) et ces options, sinon ``None``.
+
+        Le run est remis à l'appelant : un changement d'options ultérieur ne
+        l'annule plus.
+        """
+        key = job_key("prewarm", mdf_path, **options)
+        with self._lock:
+            if key != self._key:
+                return None
+            future = self._run
+            self._key = self._file = self._token = self._run = None
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def cancel(self) -> None:
+        """Abandonne le préchauffage en cours (changement d'interface, fermeture)."""
+        with self._lock:
+            if self._token is not None:
+                self._token.cancel()
+            self._key = self._file = self._token = self._run = None
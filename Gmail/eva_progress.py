@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Avancement et annulation des analyses EVA.
+
+``Progress`` agrège l'avancement pondéré des étapes d'une analyse et le
+transmet à un rappel ``callback(fraction, message)`` (fraction dans [0, 1]).
+Chaque étape reçoit un ``StageProgress`` qui rapporte son avancement interne
+(p.ex. par tranche décodée) et vérifie le ``CancelToken`` : une annulation
+lève ``AnalysisCancelled`` au prochain point de contrôle, c'est-à-dire au
+plus tard après la tranche en cours.
+
+Le rappel est appelé depuis les threads de travail : une interface Tk doit le
+relayer avec ``root.after(0, ...)``.
+"""
+from __future__ import annotations
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+ProgressCallback = Callable[[float, str], None]
+
+
+class AnalysisCancelled(Exception):
+    """Analyse interrompue à la demande de l'utilisateur."""
+
+
+class CancelToken:
+    """Drapeau d'annulation partagé entre l'interface et les threads d'analyse."""
+    __slots__ = ("_event", "_linked")
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._linked: list = []
+
+    def cancel(self) -> None:
+        self._event.set()
+        for token in self._linked:
+            token.cancel()
+
+    def link(self, token: "CancelToken") -> None:
+        """Propage l'annulation de ce jeton à ``token`` (p.ex. vers un préchauffage rattaché)."""
+        self._linked.append(token)
+        if self.cancelled:
+            token.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise AnalysisCancelled()
+
+
+class Progress:
+    """Avancement global : moyenne pondérée de l'avancement de chaque étape prévue."""
+
+    def __init__(self, callback: Optional[ProgressCallback] = None, token: Optional[CancelToken] = None,
+                 weights: Optional[Dict[str, float]] = None):
+        self.callback = callback
+        self.token = token or CancelToken()
+        self.weights = dict(weights or {})
+        self._planned: Dict[str, float] = {}
+        self._done: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def plan(self, stages: Iterable[str]) -> None:
+        """Déclare des étapes à venir (idempotent) ; à appeler avant qu'elles démarrent."""
+        with self._lock:
+            for name in stages:
+                self._planned.setdefault(name, float(self.weights.get(name, 1.0)))
+
+    @property
+    def fraction(self) -> float:
+        with self._lock:
+            return self._fraction()
+
+    def _fraction(self) -> float:
+        total = sum(self._planned.values())
+        if not total:
+            return 0.0
+        return sum(w * self._done.get(n, 0.0) for n, w in self._planned.items()) / total
+
+    def check(self) -> None:
+        self.token.check()
+
+    def stage(self, name: str) -> "StageProgress":
+        self.plan([name])
+        return StageProgress(self, name)
+
+    def finish(self, message: str = "") -> None:
+        """Marque toutes les étapes prévues comme terminées (celles qui n'ont pas eu lieu comprises)."""
+        with self._lock:
+            self._done.update(dict.fromkeys(self._planned, 1.0))
+        if self.callback is not None:
+            self.callback(1.0, message)
+
+    def _set(self, name: str, fraction: float, message: str) -> None:
+        with self._lock:
+            self._done[name] = max(self._done.get(name, 0.0), min(max(fraction, 0.0), 1.0))
+            overall = self._fraction()
+        if self.callback is not None:
+            self.callback(overall, message)
+
+
+class StageProgress:
+    """Vue d'une étape sur le ``Progress`` global."""
+    __slots__ = ("_progress", "name")
+
+    def __init__(self, progress: Progress, name: str):
+        self._progress = progress
+        self.name = name
+
+    def update(self, fraction: float, detail: str = "") -> None:
+        self._progress._set(self.name, fraction, f"{self.name}: {detail}" if detail else self.name)
+
+    def done(self) -> None:
+        self.update(1.0)
+
+    def check(self) -> None:
+        self._progress.check()
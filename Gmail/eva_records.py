@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Enregistrements de résultats compacts pour EVA.
+
+Les résultats (UC, exigences, SWEET) circulent sous forme d'objets à
+``__slots__`` et de tables adossées à des tableaux NumPy avec des statuts
+codés en entiers ; la conversion en ``DataFrame`` / dict ne se fait qu'aux
+bords (rendu HTML, export, JSON). Les enregistrements restent lisibles comme
+des dicts (``rec["status"]``, ``rec.get("missing")``) pour les interfaces.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Sequence
+import numpy as np
+import pandas as pd
+
+# Statuts SWEET codés : l'index dans ce tuple est le code stocké
+SWEET_STATUSES = ("OK", "Fallback", "NOK")
+SWEET_OK, SWEET_FALLBACK, SWEET_NOK = range(3)
+
+
+class _Record:
+    """Base : ``__slots__`` + accès en lecture façon dict."""
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def keys(self) -> Sequence[str]:
+        return self.__slots__
+
+    def items(self):
+        return ((k, getattr(self, k)) for k in self.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class UCResult(_Record):
+    """Résultat de détection d'un Use Case."""
+    __slots__ = ("status", "required", "present", "missing", "signals")
+
+    def __init__(self, status: str, required: int, present: int, missing: str = "", signals: Sequence = ()):
+        self.status = status
+        self.required = int(required)
+        self.present = int(present)
+        self.missing = missing
+        self.signals = signals
+
+
+class RequirementVerdict(_Record):
+    """Verdict d'une exigence (moteur complet)."""
+    __slots__ = ("id", "description", "result", "message", "signals_nok")
+
+    def __init__(self, id: str, description: str, result: str, message: str, signals_nok: str = ""):
+        self.id = id
+        self.description = description
+        self.result = result
+        self.message = message
+        self.signals_nok = signals_nok
+
+
+class SweetRow(_Record):
+    """Ligne SWEET matérialisée à la demande depuis une ``SweetTable``."""
+    __slots__ = ("signal", "mdf_signal", "fallback", "requirement", "status")
+
+    def __init__(self, signal: str, mdf_signal: str, fallback: str, requirement: str, status: str):
+        self.signal = signal
+        self.mdf_signal = mdf_signal
+        self.fallback = fallback
+        self.requirement = requirement
+        self.status = status
+
+
+class SweetTable:
+    """Table SWEET : le mapping (partagé, jamais copié) + un code de statut int8 par ligne."""
+    __slots__ = ("mapping", "codes")
+
+    def __init__(self, mapping: pd.DataFrame, codes: np.ndarray):
+        self.mapping = mapping
+        self.codes = np.asarray(codes, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.codes, minlength=len(SWEET_STATUSES))
+        return dict(zip(SWEET_STATUSES, map(int, counts)))
+
+    def status(self) -> pd.Categorical:
+        return pd.Categorical.from_codes(self.codes, categories=list(SWEET_STATUSES))
+
+    def _column(self, name: str) -> List[str]:
+        if name not in self.mapping.columns:
+            return [""] * len(self)
+        return self.mapping[name].astype(object).fillna("").astype(str).tolist()  # colonnes catégorielles
+
+    def __iter__(self) -> Iterator[SweetRow]:
+        columns = zip(self._column("Signal SWEET"), self._column("Signal MDF trouvé"),
+                      self._column("CAN Fallback"), self._column("Exigence"))
+        for (signal, mdf_signal, fallback, requirement), code in zip(columns, self.codes):
+            yield SweetRow(signal, mdf_signal, fallback, requirement, SWEET_STATUSES[code])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Conversion de bord : mapping + colonne « Statut » catégorielle."""
+        return self.mapping.assign(Statut=self.status())
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return self.to_frame().to_dict("records")
+
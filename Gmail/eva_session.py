@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Session de roulage découpée en plusieurs segments (MF4 / CSV).
+
+Les enregistreurs coupent un même roulage en segments (p.ex. un MF4 toutes
+les 15 min). Analysés séparément, une occurrence de UC ou une statistique à
+cheval sur une coupure est perdue ou comptée deux fois. ``Session`` présente
+la suite ordonnée des segments comme un seul log continu dans le temps :
+
+* les segments sont parcourus l'un après l'autre par le mode fenêtré
+  (``eva_chunks.iter_windows``) : jamais de concaténation, une seule fenêtre
+  par signal en mémoire ;
+* les accumulateurs (``RunningStats``, ``IntervalTracker``, enveloppes) sont
+  alimentés sans remise à zéro entre segments : un intervalle UC ouvert en
+  fin de segment se poursuit dans le suivant ;
+* temps de session : un segment MDF est placé d'après l'heure de début de son
+  en-tête (les vrais trous entre segments sont conservés). Sans en-tête
+  exploitable (CSV, horodatage incohérent), il est accolé à la fin du
+  précédent, au pas d'échantillonnage près ; un segment dont le temps continue
+  déjà celui du précédent (temps absolu) est laissé tel quel ;
+* canaux de la session : union des canaux des segments (``eva_index``).
+
+Exemple :
+    python eva_session.py drive_001.mf4 drive_002.mf4 drive_003.mf4 --out rapport_session.html
+"""
+from __future__ import annotations
+import argparse, threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from eva_chunks import DEFAULT_WINDOW_S, MDF_SUFFIXES, Chunk, iter_windows, open_mdf
+from eva_index import channel_names
+
+ALIGN_MODES = ("auto", "chain")
+
+
+class _SegmentProgress:
+    """Avancement d'un segment ramené à sa part de la session."""
+    __slots__ = ("progress", "index", "count", "name")
+
+    def __init__(self, progress, index: int, count: int, name: str):
+        self.progress = progress
+        self.index = index
+        self.count = count
+        self.name = name
+
+    def update(self, fraction: float, detail: str = "") -> None:
+        self.progress.update((self.index + fraction) / self.count, f"{self.name} {detail}".strip())
+
+    def check(self) -> None:
+        self.progress.check()
+
+
+class Session:
+    """Segments ordonnés d'un même roulage, vus comme un log continu (voir le module).
+
+    ``align="chain"`` ignore l'heure des en-têtes MDF et accole toujours les
+    segments. ``offsets`` donne, après un parcours, le décalage (s) appliqué
+    au temps de chaque segment.
+    """
+
+    def __init__(self, segments: Iterable[Path], align: str = "auto"):
+        self.segments: List[Path] = [Path(p) for p in segments]
+        if not self.segments:
+            raise ValueError("Session vide : au moins un segment est requis")
+        if align not in ALIGN_MODES:
+            raise ValueError(f"Alignement inconnu: {align}")
+        self.align = align
+        self.offsets: List[Optional[float]] = [None] * len(self.segments)
+        self._starts: Optional[List[Optional[float]]] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"Session({[p.name for p in self.segments]!r})"
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    @property
+    def name(self) -> str:
+        first = self.segments[0].name
+        return first if len(self) == 1 else f"{first} (+{len(self) - 1} segments)"
+
+    def exists(self) -> bool:
+        return all(p.exists() for p in self.segments)
+
+    def channels(self) -> Set[str]:
+        """Union des canaux des segments (index en cache, métadonnées seulement)."""
+        names: Set[str] = set()
+        for path in self.segments:
+            if path.exists():
+                names |= channel_names(path)
+        return names
+
+    def _header_starts(self) -> List[Optional[float]]:
+        """Début de chaque segment (s, relatif au premier) d'après l'en-tête MDF, ``None`` si inconnu."""
+        with self._lock:
+            if self._starts is not None:
+                return self._starts
+            stamps = []
+            for path in self.segments:
+                stamp = None
+                if self.align == "auto" and path.suffix.lower() in MDF_SUFFIXES and path.exists():
+                    try:
+                        mdf = open_mdf(path)
+                        try:
+                            stamp = mdf.header.start_time.timestamp()
+                        finally:
+                            mdf.close()
+                    except Exception:
+                        stamp = None
+                stamps.append(stamp)
+            origin = stamps[0]
+            self._starts = [s - origin if s is not None and origin is not None else None for s in stamps]
+            return self._starts
+
+    def iter_windows(self, signal_names: List[str], window_s: float = DEFAULT_WINDOW_S,
+                     progress=None) -> Iterator[Tuple[float, float, Dict[str, Chunk]]]:
+        """Fenêtres de tous les segments à la suite, en temps de session (mêmes sorties que ``iter_windows``)."""
+        starts = self._header_starts()
+        end: Optional[float] = None   # dernier instant (temps de session) déjà produit
+        step = 0.0                    # pas d'échantillonnage observé en fin de segment
+        for i, path in enumerate(self.segments):
+            sub = _SegmentProgress(progress, i, len(self), path.name) if progress is not None else None
+            shift: Optional[float] = None
+            for t0, t1, window in iter_windows(path, signal_names, window_s, sub):
+                if shift is None:
+                    first = min(float(t[0]) for t, _ in window.values())
+                    shift = starts[i] or 0.0
+                    if end is not None and first + shift <= end:
+                        shift = end + step - first  # pas d'en-tête exploitable : accolé au précédent
+                    self.offsets[i] = shift
+                if shift:
+                    window = {s: (t + shift, x) for s, (t, x) in window.items()}
+                for t, _ in window.values():
+                    last = float(t[-1])
+                    if end is None or last > end:
+                        end = last
+                        if len(t) > 1:
+                            step = float(np.median(np.diff(t[-64:])))
+                yield t0 + shift, t1 + shift, window
+
+
+def main(argv: Optional[List[str]] = None):
+    from eva_detecteur import analyser_et_generer_rapport  # cœur d'analyse : chargé seulement ici
+
+    ap = argparse.ArgumentParser(description="Analyse d'un roulage découpé en segments, comme un seul log")
+    ap.add_argument("segments", nargs="+", type=Path, help="Segments dans l'ordre du roulage")
+    ap.add_argument("--out", type=Path, default=Path("rapport_session.html"))
+    ap.add_argument("--window_s", type=float, default=DEFAULT_WINDOW_S)
+    ap.add_argument("--align", choices=ALIGN_MODES, default="auto",
+                    help="auto : heure des en-têtes MDF si cohérente ; chain : segments accolés")
+    args = ap.parse_args(argv)
+
+    session = Session(args.segments, args.align)
+    results = analyser_et_generer_rapport(session, window_s=args.window_s, report_path=args.out)
+    for path, offset in zip(session.segments, session.offsets):
+        print(f"{path.name:<40} {'(vide)' if offset is None else f'+{offset:.3f} s'}")
+    print(f"{len(results.get('_uc_intervals', []))} occurrence(s) UC — rapport: {args.out}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Signaux paresseux pour EVA.
+
+``read_signal_data`` ne renvoie plus des tableaux mais des ``SignalProxy`` :
+chaque proxy connaît l'emplacement du canal (fichier, groupe, index) et ne
+décode les données qu'au premier accès à ``.samples`` / ``.timestamps``.
+La présence et le nombre d'échantillons d'un canal MDF viennent des
+métadonnées (``cycles_nr``) : un test de présence ne décode jamais rien.
+"""
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from eva_chunks import CSV_SAMPLE_PERIOD_S, _csv_time_column
+from eva_mmap import MdfMapper
+
+TimeRange = Tuple[float, float]
+_EMPTY = np.array([])
+
+
+class MdfSignalReader:
+    """Décode à la demande les canaux d'un MDF ouvert (vue mémoire si possible)."""
+
+    def __init__(self, mdf_path: Path, mdf):
+        self.mdf = mdf
+        self.mapper = MdfMapper(mdf_path, mdf)
+
+    def count(self, name: str) -> int:
+        occurrences = self.mdf.channels_db.get(name, ())
+        if not occurrences:
+            return 0
+        return int(self.mdf.groups[occurrences[0][0]].channel_group.cycles_nr)
+
+    def decode(self, name: str, t_range: Optional[TimeRange]) -> Tuple[np.ndarray, np.ndarray]:
+        mapped = self.mapper.channel(name)
+        if mapped is not None:
+            if t_range is None:
+                return mapped.timestamps, mapped.samples
+            # Recherche par blocs DT puis dichotomique sur la base de temps mappée : seules quelques pages sont lues
+            return mapped.window(*t_range)
+        if t_range is None:
+            sig = self.mdf.get(name)
+            return sig.timestamps, sig.samples
+        group = self.mdf.channels_db[name][0][0]
+        t = self.mdf.get_master(group)
+        i0, i1 = int(np.searchsorted(t, t_range[0], "left")), int(np.searchsorted(t, t_range[1], "right"))
+        sig = self.mdf.get(name, record_offset=i0, record_count=max(i1 - i0, 0))
+        return sig.timestamps, sig.samples
+
+
+class CsvSignalReader:
+    """Lit d'un seul passage les colonnes utiles d'un CSV, au premier accès.
+
+    ``wanted`` : colonnes susceptibles d'être demandées (défaut : toutes) ; elles
+    sont lues ensemble avec la colonne temps puis gardées en mémoire, un CSV ne
+    permettant pas de lire une colonne sans parcourir tout le fichier.
+    """
+
+    def __init__(self, csv_path: Path, columns, wanted=None):
+        self.csv_path = csv_path
+        self.columns = set(columns)
+        self.time_col = _csv_time_column(self.columns)
+        self.wanted = self.columns if wanted is None else self.columns & set(wanted)
+        self._frame: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+
+    def _data(self) -> pd.DataFrame:
+        with self._lock:
+            if self._frame is None:
+                usecols = self.wanted | ({self.time_col} if self.time_col else set())
+                self._frame = pd.read_csv(self.csv_path, usecols=lambda c: c in usecols)
+            return self._frame
+
+    def count(self, name: str) -> int:
+        # Colonne absente ou entièrement vide : signal manquant
+        if name not in self.wanted:
+            return 0
+        column = self._data()[name]
+        return len(column) if column.notna().any() else 0
+
+    def decode(self, name: str, t_range: Optional[TimeRange]) -> Tuple[np.ndarray, np.ndarray]:
+        df = self._data()
+        x = df[name].values
+        t = df[self.time_col].to_numpy(dtype=float) if self.time_col else np.arange(len(df)) * CSV_SAMPLE_PERIOD_S
+        if t_range is not None:
+            keep = (t >= t_range[0]) & (t <= t_range[1])
+            t, x = t[keep], x[keep]
+        return t, x
+
+
+class SignalProxy:
+    """Signal dont les données ne sont décodées qu'au premier accès."""
+    __slots__ = ("name", "_reader", "_location", "_count", "_t_range", "_data")
+
+    def __init__(self, name: str, reader=None, location: Optional[str] = None,
+                 count: int = 0, t_range: Optional[TimeRange] = None):
+        self.name = name
+        self._reader = reader
+        self._location = location
+        self._count = count if location is not None else 0
+        self._t_range = t_range
+        self._data: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @property
+    def present(self) -> bool:
+        """Vrai si le canal existe et contient des échantillons (sans décodage)."""
+        return self._count != 0
+
+    @property
+    def decoded(self) -> bool:
+        return self._data is not None
+
+    def _load(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._data is None:
+            if not self.present:
+                self._data = (_EMPTY, _EMPTY)
+            else:
+                try:
+                    self._data = self._reader.decode(self._location, self._t_range)
+                except Exception:
+                    self._data = (_EMPTY, _EMPTY)
+        return self._data
+
+    @property
+    def samples(self) -> np.ndarray:
+        return self._load()[1]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._load()[0]
+
+    def slice(self, t_start: float, t_end: float) -> "SignalProxy":
+        """Nouveau proxy limité à ``[t_start, t_end]`` ; le découpage est fait par le lecteur."""
+        return SignalProxy(self.name, self._reader, self._location,
+                           -1 if self._count else 0, (t_start, t_end))
+
+    def __len__(self) -> int:
+        if self._count >= 0 and self._data is None:
+            return self._count
+        return len(self.samples)
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.samples, dtype=dtype)
+
+    def __repr__(self) -> str:
+        state = "décodé" if self.decoded else "non décodé"
+        return f"SignalProxy({self.name!r}, {self._location!r}, {state})"
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Banc de démarrage des interfaces EVA : temps d'import et de premier affichage.
+
+Chaque interface est mesurée dans un interpréteur neuf (les modules déjà
+importés fausseraient la mesure) :
+
+* ``import_s`` : import du module de l'interface ;
+* ``paint_s``  : import + construction de la fenêtre + premier ``update()``
+  (seulement si un affichage est disponible) ;
+* ``heavy``    : modules lourds (pandas, asammdf, cœur d'analyse...) chargés
+  dès l'import — ils doivent l'être paresseusement (``eva_lazy``).
+
+Le code de sortie vaut 1 si une interface dépasse le budget (300 ms par
+défaut, sur le premier affichage ou à défaut l'import) ou charge un module
+lourd au démarrage.
+
+Exemples :
+    python eva_startup_bench.py
+    python eva_startup_bench.py --repeat 5 --budget_ms 300 --out startup.json
+"""
+from __future__ import annotations
+import argparse, json, statistics, subprocess, sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 300.0
+# Module de l'interface -> classe de l'application
+INTERFACES = {
+    "eva_interface": "EVAModernApp",
+    "eva_professional_fixed": "EVAInterface",
+    "eva_professional": "ProfessionalEVAInterface",
+}
+HEAVY_MODULES = ("pandas", "numpy", "asammdf", "matplotlib", "openpyxl",
+                 "eva_detecteur", "eva_complete_engine", "eva_report_generator")
+
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.append("Gmail")
+module = __import__({module!r})
+import_s = time.perf_counter() - t0
+heavy = [m for m in {heavy!r} if m in sys.modules]
+paint_s = None
+if {paint!r}:
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        root = None
+    if root is not None:
+        getattr(module, {app!r})(root)
+        root.update()
+        paint_s = time.perf_counter() - t0
+        root.destroy()
+print(json.dumps({{"import_s": import_s, "paint_s": paint_s, "heavy": heavy}}))
+"""
+
+
+def probe(module: str, app: str, paint: bool = True, cwd: Path = ROOT) -> Dict:
+    """Une mesure dans un interpréteur neuf."""
+    code = _PROBE.format(module=module, app=app, heavy=HEAVY_MODULES, paint=paint)
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench_startup(modules: Sequence[str] = tuple(INTERFACES), repeat: int = 3, paint: bool = True) -> List[Dict]:
+    rows = []
+    for module in modules:
+        samples = [probe(module, INTERFACES[module], paint) for _ in range(max(1, repeat))]
+        paints = [s["paint_s"] for s in samples if s["paint_s"] is not None]
+        rows.append({
+            "module": module,
+            "import_s": statistics.median(s["import_s"] for s in samples),
+            "paint_s": statistics.median(paints) if paints else None,
+            "heavy": sorted({m for s in samples for m in s["heavy"]}),
+        })
+    return rows
+
+
+def check_budget(rows: List[Dict], budget_ms: float = DEFAULT_BUDGET_MS) -> List[str]:
+    """Messages d'échec (liste vide si toutes les interfaces tiennent le budget)."""
+    failures = []
+    for r in rows:
+        measured = r["paint_s"] if r["paint_s"] is not None else r["import_s"]
+        if measured * 1000 > budget_ms:
+            failures.append(f"{r['module']}: {measured * 1000:.0f} ms > {budget_ms:.0f} ms")
+        if r["heavy"]:
+            failures.append(f"{r['module']}: modules lourds importés au démarrage ({', '.join(r['heavy'])})")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Temps de démarrage des interfaces EVA")
+    ap.add_argument("--modules", default=",".join(INTERFACES), help="Interfaces à mesurer (séparées par des virgules)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--budget_ms", type=float, default=DEFAULT_BUDGET_MS)
+    ap.add_argument("--no_paint", action="store_true", help="Ne mesurer que l'import (sans ouvrir de fenêtre)")
+    ap.add_argument("--out", type=Path, default=None, help="Fichier JSON de résultats")
+    args = ap.parse_args(argv)
+
+    rows = bench_startup([m for m in args.modules.split(",") if m], args.repeat, not args.no_paint)
+    for r in rows:
+        paint = f"{r['paint_s'] * 1000:8.1f} ms" if r["paint_s"] is not None else "       —   "
+        print(f"{r['module']:<26} import {r['import_s'] * 1000:8.1f} ms   1er affichage {paint}"
+              f"   {'lourds: ' + ', '.join(r['heavy']) if r['heavy'] else ''}")
+    if args.out:
+        args.out.write_text(json.dumps({"budget_ms": args.budget_ms, "interfaces": rows}, indent=2), encoding="utf-8")
+    failures = check_budget(rows, args.budget_ms)
+    if failures:
+        ap.exit(1, "\n".join(failures) + "\n")
+    print(f"\nToutes les interfaces démarrent sous {args.budget_ms:.0f} ms.")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
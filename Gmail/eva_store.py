@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Magasin de résultats EVA (SQLite, bibliothèque standard).
+
+Chaque analyse enregistrée donne une ligne ``analyses`` (identité du fichier :
+chemin, taille, mtime ; empreinte de la configuration ; VIN / SWID) et ses
+lignes de détail :
+
+* ``uc_results``          : une ligne par Use Case ;
+* ``requirement_results`` : une ligne par exigence du catalogue ;
+* ``violations``          : intervalles où la règle d'une exigence est fausse ;
+* ``signal_stats``        : statistiques (nombre, moyenne, écart-type, min,
+  max) des signaux du catalogue des exigences ;
+* ``sweet_results``       : les statuts SWEET de l'analyse en un seul vecteur
+  ``int8`` (``eva_records.SWEET_STATUSES``), aligné sur une liste de signaux
+  partagée (``signal_sets``) : les analyses d'une même configuration
+  pointent vers la même liste. 10 000 analyses se relisent en une matrice
+  (analyses × signaux) sans une ligne SQL par signal (``sweet_matrix``).
+
+Réenregistrer le même fichier (inchangé) avec la même configuration remplace
+l'analyse précédente. ``lookup`` permet aux traitements incrémentaux (dossier
+surveillé) de sauter les fichiers déjà analysés ; ``frame`` relit une table
+en ``DataFrame`` pour les agrégations.
+
+Le fichier vient de la variable d'environnement ``EVA_STORE`` (par défaut
+``~/.cache/eva/results.sqlite``). C'est un cache reconstructible à partir des
+logs : un magasin d'un autre ``SCHEMA_VERSION`` est vidé à l'ouverture.
+"""
+from __future__ import annotations
+import datetime, hashlib, json, os, sqlite3, threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+STORE_PATH = Path(os.environ.get("EVA_STORE", Path.home() / ".cache" / "eva" / "results.sqlite"))
+SCHEMA_VERSION = 4
+SWEET_MISSING = -1  # signal absent de la liste d'une analyse (autre configuration)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    config_hash TEXT NOT NULL DEFAULT '',
+    mode        TEXT NOT NULL DEFAULT 'sweet400',
+    vin         TEXT,
+    swid        TEXT,
+    status      TEXT NOT NULL,
+    error       TEXT,
+    report      TEXT,
+    elapsed_s   REAL,
+    analyzed_at TEXT NOT NULL,
+    UNIQUE (path, size, mtime_ns, config_hash, mode)
+);
+CREATE TABLE IF NOT EXISTS uc_results (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    uc TEXT NOT NULL, status TEXT NOT NULL, required INTEGER, present INTEGER, occurrences INTEGER
+);
+CREATE TABLE IF NOT EXISTS requirement_results (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    requirement TEXT NOT NULL, status TEXT NOT NULL, message TEXT
+);
+CREATE TABLE IF NOT EXISTS violations (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    requirement TEXT NOT NULL, tstart REAL NOT NULL, tend REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS signal_stats (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    signal TEXT NOT NULL, count INTEGER, mean REAL, std REAL, min REAL, max REAL
+);
+CREATE TABLE IF NOT EXISTS signal_sets (id INTEGER PRIMARY KEY, digest TEXT NOT NULL UNIQUE, names TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS sweet_results (
+    analysis_id INTEGER PRIMARY KEY REFERENCES analyses(id) ON DELETE CASCADE,
+    signal_set_id INTEGER NOT NULL REFERENCES signal_sets(id), codes BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS uc_by_analysis ON uc_results(analysis_id);
+CREATE INDEX IF NOT EXISTS req_by_analysis ON requirement_results(analysis_id);
+CREATE INDEX IF NOT EXISTS stats_by_analysis ON signal_stats(analysis_id);
+CREATE INDEX IF NOT EXISTS violations_by_analysis ON violations(analysis_id);
+"""
+TABLES = ("analyses", "uc_results", "requirement_results", "violations", "signal_stats", "sweet_results", "signal_sets")
+
+
+class ResultsStore:
+    """Accès au magasin ; une connexion partagée entre threads, protégée par un verrou."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else STORE_PATH
+        if str(self.path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")  # lectures (rapports de flotte) pendant les écritures
+        self._db.execute("PRAGMA foreign_keys=ON")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            with self._db:
+                for table in reversed(TABLES + ("signals",)):
+                    self._db.execute(f"DROP TABLE IF EXISTS {table}")
+            self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._db.executescript(SCHEMA)
+        self._signal_sets: Dict[int, List[str]] = {}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _identity(path: Path) -> Dict[str, Any]:
+        path = Path(path)
+        st = path.stat()
+        return {"path": str(path.resolve()), "name": path.name, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def lookup(self, path: Path, config_hash: str = "", mode: str = "sweet400") -> Optional[int]:
+        """Id de l'analyse déjà enregistrée pour ce fichier inchangé et cette configuration."""
+        try:
+            ident = self._identity(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id FROM analyses WHERE path=? AND size=? AND mtime_ns=? AND config_hash=? AND mode=?",
+                (ident["path"], ident["size"], ident["mtime_ns"], config_hash, mode)).fetchone()
+        return row[0] if row else None
+
+    def latest(self, path: Path, mode: Optional[str] = None) -> Optional[int]:
+        """Id de la dernière analyse réussie de ce fichier inchangé, quelle que soit la configuration."""
+        try:
+            ident = self._identity(path)
+        except OSError:
+            return None
+        sql = "SELECT id FROM analyses WHERE path=? AND size=? AND mtime_ns=? AND status='ok'"
+        params = [ident["path"], ident["size"], ident["mtime_ns"]]
+        if mode:
+            sql, params = sql + " AND mode=?", params + [mode]
+        with self._lock:
+            row = self._db.execute(sql + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        return row[0] if row else None
+
+    def previous_swid(self, analysis_id: int) -> Optional[int]:
+        """Dernière analyse du même véhicule avec un autre SWID, sur un log antérieur (comparaison de logiciels)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT p.id FROM analyses a JOIN analyses p ON p.vin = a.vin AND p.mode = a.mode "
+                "WHERE a.id=? AND p.status='ok' AND p.swid IS NOT a.swid AND p.mtime_ns < a.mtime_ns "
+                "ORDER BY p.mtime_ns DESC, p.id DESC LIMIT 1", (analysis_id,)).fetchone()
+        return row[0] if row else None
+
+    def record(self, path: Path, results: Dict[str, Any], config_hash: str = "", mode: str = "sweet400",
+               vin: Optional[str] = None, swid: Optional[str] = None, report: Optional[Path] = None,
+               elapsed_s: Optional[float] = None) -> int:
+        """Enregistre les résultats de ``analyser_et_generer_rapport`` ; renvoie l'id de l'analyse."""
+        ident = self._identity(path)
+        tables = results.get("_tables") or {}
+        error = next((v.get("message") for k, v in results.items()
+                      if not k.startswith("_") and isinstance(v, dict) and v.get("status") == "error"), None)
+        analysis = {**ident, "config_hash": config_hash, "mode": mode, "vin": vin, "swid": swid,
+                    "status": "error" if error or not tables else "ok", "error": error,
+                    "report": str(report) if report else None, "elapsed_s": elapsed_s,
+                    "analyzed_at": datetime.datetime.now().isoformat(timespec="seconds")}
+        occurrences: Dict[str, int] = {}
+        for interval in results.get("_uc_intervals") or ():
+            occurrences[interval["UC"]] = occurrences.get(interval["UC"], 0) + 1
+        counted = "_uc_intervals" in results
+        uc_rows = [(uc, r["status"], r.get("required"), r.get("present"), occurrences.get(uc, 0) if counted else None)
+                   for uc, r in results.items()
+                   if not uc.startswith("_") and r.get("status") in ("detected", "not_detected")]
+        requirements = tables.get("requirements")
+        req_rows = []
+        if requirements is not None and not requirements.empty:
+            req_rows = list(zip(requirements["Exigence"].astype(str), requirements["Status"].astype(str),
+                                requirements["Message"].astype(str)))
+        stats = tables.get("stats")
+        stat_rows = []
+        if stats is not None and not stats.empty:
+            stat_rows = list(stats[["Signal", "Count", "Mean", "Std", "Min", "Max"]]
+                             .astype({"Signal": str, "Count": int}).itertuples(index=False, name=None))
+        violations = tables.get("violations")
+        violation_rows = []
+        if violations is not None and not violations.empty:
+            violation_rows = list(zip(violations["Exigence"].astype(str), violations["TSTART"].astype(float),
+                                      violations["TEND"].astype(float)))
+        sweet = tables.get("sweet")
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM analyses WHERE path=? AND size=? AND mtime_ns=? AND config_hash=? AND mode=?",
+                             (ident["path"], ident["size"], ident["mtime_ns"], config_hash, mode))
+            columns = ", ".join(analysis)
+            cursor = self._db.execute(f"INSERT INTO analyses ({columns}) VALUES ({', '.join('?' * len(analysis))})",
+                                      tuple(analysis.values()))
+            analysis_id = cursor.lastrowid
+            self._db.executemany("INSERT INTO uc_results VALUES (?, ?, ?, ?, ?, ?)",
+                                 [(analysis_id,) + r for r in uc_rows])
+            self._db.executemany("INSERT INTO requirement_results VALUES (?, ?, ?, ?)",
+                                 [(analysis_id,) + r for r in req_rows])
+            self._db.executemany("INSERT INTO violations VALUES (?, ?, ?, ?)",
+                                 [(analysis_id,) + r for r in violation_rows])
+            self._db.executemany("INSERT INTO signal_stats VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 [(analysis_id,) + tuple(r) for r in stat_rows])
+            if sweet is not None and len(sweet) and "Signal SWEET" in sweet.mapping.columns:
+                names = sweet.mapping["Signal SWEET"].fillna("").astype(str).tolist()
+                self._db.execute("INSERT INTO sweet_results VALUES (?, ?, ?)",
+                                 (analysis_id, self._signal_set(names), np.asarray(sweet.codes, np.int8).tobytes()))
+        return analysis_id
+
+    def _signal_set(self, names: List[str]) -> int:
+        digest = hashlib.sha1("\n".join(names).encode("utf-8")).hexdigest()
+        self._db.execute("INSERT OR IGNORE INTO signal_sets (digest, names) VALUES (?, ?)", (digest, json.dumps(names)))
+        return self._db.execute("SELECT id FROM signal_sets WHERE digest=?", (digest,)).fetchone()[0]
+
+    def _names(self, set_ids: Iterable[int]) -> Dict[int, List[str]]:
+        missing = [i for i in set(set_ids) if i not in self._signal_sets]
+        if missing:
+            rows = self._db.execute(f"SELECT id, names FROM signal_sets WHERE id IN ({', '.join('?' * len(missing))})",
+                                    missing).fetchall()
+            self._signal_sets.update((i, json.loads(names)) for i, names in rows)
+        return self._signal_sets
+
+    def sweet_matrix(self, analysis_ids: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """Statuts SWEET de plusieurs analyses : ``(ids, signaux, codes)``.
+
+        ``codes[i, j]`` est le statut du signal ``j`` dans l'analyse ``ids[i]``
+        (``SWEET_MISSING`` si le signal n'est pas dans sa liste ; meilleur
+        statut si le mapping le liste sur plusieurs lignes). Les analyses
+        sans statuts SWEET sont omises ; ``None`` : toutes les analyses.
+        """
+        with self._lock:
+            if analysis_ids is None:
+                rows = self._db.execute("SELECT analysis_id, signal_set_id, codes FROM sweet_results").fetchall()
+            else:
+                wanted = list(map(int, analysis_ids))
+                rows = []
+                for start in range(0, len(wanted), 500):  # limite des paramètres SQLite
+                    batch = wanted[start:start + 500]
+                    rows += self._db.execute("SELECT analysis_id, signal_set_id, codes FROM sweet_results "
+                                             f"WHERE analysis_id IN ({', '.join('?' * len(batch))})", batch).fetchall()
+            sets = self._names(r[1] for r in rows)
+        if not rows:
+            return np.empty(0, np.int64), [], np.empty((0, 0), np.int8)
+        ids = np.fromiter((r[0] for r in rows), np.int64, len(rows))
+        set_ids = np.fromiter((r[1] for r in rows), np.int64, len(rows))
+        names = list(dict.fromkeys(n for i in dict.fromkeys(set_ids.tolist()) for n in sets[i]))
+        column = {n: j for j, n in enumerate(names)}
+        codes = np.full((len(rows), len(names)), SWEET_MISSING, np.int8)
+        for set_id in np.unique(set_ids):
+            # Une affectation par liste de signaux (en général une seule par configuration)
+            members = np.flatnonzero(set_ids == set_id)
+            columns = np.fromiter((column[n] for n in sets[set_id]), np.int64, len(sets[set_id]))
+            block = np.frombuffer(b"".join(rows[i][2] for i in members), np.int8).reshape(len(members), -1)
+            unique, inverse = np.unique(columns, return_inverse=True)
+            if len(unique) < len(columns):
+                block = pd.DataFrame(block.T).groupby(inverse).min().to_numpy(np.int8).T
+            codes[np.ix_(members, unique)] = block
+        return ids, names, codes
+
+    def frame(self, table: str, where: str = "", params: Iterable[Any] = ()) -> pd.DataFrame:
+        """Table (ou sélection) du magasin en ``DataFrame``."""
+        if table not in TABLES:
+            raise ValueError(f"Table inconnue: {table}")
+        with self._lock:
+            return pd.read_sql_query(f"SELECT * FROM {table} {where}", self._db, params=tuple(params))
+
+    def iter_rows(self, table: str, where: str = "", params: Iterable[Any] = (),
+                  batch_rows: int = 50_000) -> Iterator[Tuple[List[str], List[tuple]]]:
+        """Lignes d'une table par lots ``(colonnes, lignes)`` (exports volumineux, mémoire bornée).
+
+        La lecture passe par une connexion à part : en WAL elle ne bloque pas
+        les enregistrements en cours.
+        """
+        if table not in TABLES:
+            raise ValueError(f"Table inconnue: {table}")
+        if str(self.path) == ":memory:":
+            with self._lock:
+                cursor = self._db.execute(f"SELECT * FROM {table} {where}", tuple(params))
+                columns = [d[0] for d in cursor.description]
+                rows = cursor.fetchall()
+            for start in range(0, len(rows), batch_rows):
+                yield columns, rows[start:start + batch_rows]
+            return
+        db = sqlite3.connect(str(self.path))
+        try:
+            cursor = db.execute(f"SELECT * FROM {table} {where}", tuple(params))
+            columns = [d[0] for d in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    return
+                yield columns, rows
+        finally:
+            db.close()
+
+    def signal_names(self, set_id: int) -> List[str]:
+        """Liste de signaux SWEET ``set_id`` (colonnes des vecteurs de statuts)."""
+        with self._lock:
+            return self._names([set_id])[set_id]
+
+    def results(self, analysis_id: int) -> Dict[str, pd.DataFrame]:
+        """Détail d'une analyse : ``{"analysis", "uc", "requirements", "violations", "stats", "sweet"}``
+        (statuts SWEET codés)."""
+        where, params = "WHERE analysis_id=?", (analysis_id,)
+        with self._lock:
+            row = self._db.execute("SELECT signal_set_id, codes FROM sweet_results WHERE analysis_id=?",
+                                   params).fetchone()
+            names = self._names([row[0]])[row[0]] if row else []
+        return {
+            "analysis": self.frame("analyses", "WHERE id=?", params),
+            "uc": self.frame("uc_results", where, params),
+            "requirements": self.frame("requirement_results", where, params),
+            "violations": self.frame("violations", where, params),
+            "stats": self.frame("signal_stats", where, params),
+            "sweet": pd.DataFrame({"signal": names, "status": np.frombuffer(row[1], np.int8) if row else np.empty(0, np.int8)}),
+        }
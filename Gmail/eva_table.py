@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Tableau virtualisé pour les grands résultats (SWEET, UC) dans les interfaces Tk.
+
+``TableModel`` garde les données en colonnes (tableaux numpy, aucune copie
+ligne à ligne) et une *vue* : le tableau des indices de lignes visibles après
+filtrage par statut et tri. Filtre et tri sont des opérations vectorisées sur
+les colonnes ; seules les cellules affichées sont converties en texte.
+
+``VirtualTable`` est un ``ttk.Treeview`` qui ne matérialise qu'autant de lignes
+que la hauteur du widget en affiche : le défilement réaffecte les valeurs de
+ces lignes à partir de la vue. Un résultat de 100 000 lignes s'ouvre donc
+aussi vite qu'un résultat de 20.
+"""
+from __future__ import annotations
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+ALL = "All"
+
+
+def _cell(value) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return str(value)
+
+
+class TableModel:
+    """Données en colonnes + vue (indices des lignes filtrées et triées)."""
+
+    def __init__(self, df: Optional[pd.DataFrame] = None, status_column: Optional[str] = None):
+        self.load(df if df is not None else pd.DataFrame(), status_column)
+
+    def load(self, df: pd.DataFrame, status_column: Optional[str] = None) -> None:
+        self.columns: List[str] = [str(c) for c in df.columns]
+        self._data: Dict[str, np.ndarray] = {str(c): df[c].to_numpy() for c in df.columns}
+        self._sort_keys: Dict[str, np.ndarray] = {}
+        self.n_rows = len(df)
+        self.status_column = status_column if status_column in self.columns else None
+        if self.status_column is not None:
+            status = pd.Categorical(df[self.status_column])
+            self.statuses: List[str] = [str(c) for c in status.categories]
+            self._status_codes = np.asarray(status.codes)
+        else:
+            self.statuses = []
+            self._status_codes = None
+        self.status_filter: Optional[Sequence[str]] = None
+        self.sort_column: Optional[str] = None
+        self.descending = False
+        self.view = np.arange(self.n_rows)
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def _sort_key(self, column: str) -> np.ndarray:
+        """Clé de tri entière (ou numérique) de la colonne, calculée une fois."""
+        key = self._sort_keys.get(column)
+        if key is None:
+            values = self._data[column]
+            if column == self.status_column:
+                key = self._status_codes  # ordre des catégories : OK, Fallback, NOK
+            elif values.dtype.kind in "biuf":
+                key = values
+            else:
+                key = pd.factorize(pd.Series(values).astype("string"), sort=True)[0]  # manquants : -1
+            self._sort_keys[column] = key
+        return key
+
+    def _refresh(self) -> None:
+        rows = np.arange(self.n_rows)
+        if self.status_filter is not None and self._status_codes is not None:
+            wanted = [self.statuses.index(s) for s in self.status_filter if s in self.statuses]
+            rows = rows[np.isin(self._status_codes, wanted)]
+        if self.sort_column is not None:
+            key = self._sort_key(self.sort_column)[rows]
+            order = np.argsort(key, kind="stable")
+            rows = rows[order[::-1]] if self.descending else rows[order]
+        self.view = rows
+
+    def filter_status(self, statuses: Optional[Sequence[str]]) -> None:
+        """Ne garde que les lignes dont le statut est dans ``statuses`` (``None`` : toutes)."""
+        self.status_filter = list(statuses) if statuses is not None else None
+        self._refresh()
+
+    def sort(self, column: str, descending: Optional[bool] = None) -> None:
+        """Trie la vue sur ``column`` ; sans ``descending``, un 2e tri sur la même colonne inverse l'ordre."""
+        if descending is None:
+            descending = (not self.descending) if column == self.sort_column else False
+        self.sort_column, self.descending = column, descending
+        self._refresh()
+
+    def rows(self, start: int, stop: int) -> List[List[str]]:
+        """Lignes ``start:stop`` de la vue, converties en texte."""
+        index = self.view[start:stop]
+        columns = [self._data[c][index] for c in self.columns]
+        return [[_cell(v) for v in row] for row in zip(*columns)]
+
+    def counts(self) -> Dict[str, int]:
+        if self._status_codes is None:
+            return {}
+        counts = np.bincount(self._status_codes[self._status_codes >= 0], minlength=len(self.statuses))
+        return dict(zip(self.statuses, map(int, counts)))
+
+
+class VirtualTable(ttk.Frame):
+    """``ttk.Treeview`` virtualisé : seules les lignes visibles existent dans le widget."""
+
+    def __init__(self, parent, status_column: Optional[str] = "Statut", **kwargs):
+        super().__init__(parent, **kwargs)
+        self.model = TableModel(status_column=status_column)
+        self.status_column = status_column
+        self._offset = 0
+        self._items: List[str] = []
+
+        bar = ttk.Frame(self)
+        bar.pack(fill="x", pady=(0, 4))
+        ttk.Label(bar, text="Status:").pack(side="left")
+        self._filter = tk.StringVar(value=ALL)
+        self._filter_box = ttk.Combobox(bar, textvariable=self._filter, state="readonly", width=12, values=[ALL])
+        self._filter_box.pack(side="left", padx=4)
+        self._filter_box.bind("<<ComboboxSelected>>", lambda e: self._apply_filter())
+        self._count = ttk.Label(bar, text="")
+        self._count.pack(side="right")
+
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(body, show="headings", selectmode="browse")
+        self._scroll = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self._scroll.pack(side="right", fill="y")
+
+        self.tree.bind("<Configure>", lambda e: self._layout())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_wheel)
+        for key, delta in (("<Down>", 1), ("<Up>", -1), ("<Next>", "page"), ("<Prior>", "-page")):
+            self.tree.bind(key, lambda e, d=delta: self._on_key(d))
+
+    # ---------- données ----------
+    def load(self, df: pd.DataFrame) -> None:
+        """Affiche ``df`` (aucune ligne n'est matérialisée au-delà de la zone visible)."""
+        self.model.load(df, self.status_column)
+        self.tree.configure(columns=self.model.columns)
+        for column in self.model.columns:
+            self.tree.heading(column, text=column, command=lambda c=column: self._sort(c))
+            self.tree.column(column, width=120, stretch=True)
+        self._filter_box.configure(values=[ALL] + self.model.statuses)
+        self._filter.set(ALL)
+        self._offset = 0
+        self._layout(force=True)
+
+    def _apply_filter(self) -> None:
+        value = self._filter.get()
+        self.model.filter_status(None if value == ALL else [value])
+        self._offset = 0
+        self._render()
+
+    def _sort(self, column: str) -> None:
+        self.model.sort(column)
+        for c in self.model.columns:
+            arrow = (" ▼" if self.model.descending else " ▲") if c == column else ""
+            self.tree.heading(c, text=c + arrow)
+        self._render()
+
+    # ---------- virtualisation ----------
+    def _visible_rows(self) -> int:
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        header = 24
+        return max(1, (self.tree.winfo_height() - header) // row_height)
+
+    def _layout(self, force: bool = False) -> None:
+        """Ajuste le nombre de lignes matérialisées à la hauteur du widget."""
+        wanted = self._visible_rows()
+        if force or wanted != len(self._items):
+            self.tree.delete(*self.tree.get_children())
+            self._items = [self.tree.insert("", "end", values=()) for _ in range(wanted)]
+        self._render()
+
+    def _render(self) -> None:
+        total = len(self.model)
+        page = len(self._items)
+        self._offset = max(0, min(self._offset, total - page))
+        rows = self.model.rows(self._offset, self._offset + page)
+        for item, values in zip(self._items, rows):
+            self.tree.item(item, values=values)
+        for item in self._items[len(rows):]:
+            self.tree.item(item, values=())
+        if total:
+            self._scroll.set(self._offset / total, min(1.0, (self._offset + page) / total))
+        else:
+            self._scroll.set(0.0, 1.0)
+        self._count.configure(text=f"{total} / {self.model.n_rows} rows")
+
+    def _scroll_to(self, offset: int) -> None:
+        self._offset = offset
+        self._render()
+
+    def _on_scrollbar(self, action: str, value: str, unit: Optional[str] = None) -> None:
+        if action == "moveto":
+            self._scroll_to(int(float(value) * len(self.model)))
+        elif action == "scroll":
+            step = len(self._items) if unit == "pages" else 1
+            self._scroll_to(self._offset + int(value) * step)
+
+    def _on_wheel(self, event) -> str:
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self._offset - 3)
+        else:
+            self._scroll_to(self._offset + 3)
+        return "break"
+
+    def _on_key(self, delta) -> str:
+        page = len(self._items)
+        step = {"page": page, "-page": -page}.get(delta, delta)
+        self._scroll_to(self._offset + step)
+        return "break"
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Surveillance d'un dossier de logs : analyse incrémentale des nouveaux fichiers.
+
+Les enregistreurs des bancs déposent leurs MF4 dans un dossier partagé tout
+au long de la journée. ``FolderWatcher`` les analyse au fil de l'eau :
+
+* détection par inotify (paquet optionnel ``inotify_simple``, Linux) avec
+  repli sur un balayage périodique (partages réseau, autres systèmes) ;
+* anti-rebond : un fichier n'est pris que lorsque sa taille et son mtime
+  n'ont plus bougé depuis ``settle_s`` secondes (écriture terminée) ;
+* analyse sur le pool de workers chauds (``eva_workers``), concurrence bornée
+  par le nombre de workers ; rapport HTML dans ``out_dir`` et lignes dans le
+  magasin de résultats (``eva_store``) ;
+* contre-pression : au plus ``max_pending`` fichiers confiés au pool. Au-delà
+  ils restent sur disque (le dossier sert de file d'attente) et sont pris,
+  plus anciens d'abord, à mesure que les workers se libèrent ;
+* incrémental : un fichier déjà présent dans le magasin, inchangé et analysé
+  avec la même configuration, n'est pas réanalysé (redémarrage du démon).
+
+``name_pattern`` (expression régulière à groupes nommés ``vin`` / ``swid``)
+extrait l'identité du véhicule du nom de fichier pour les rapports de flotte.
+
+Exemple :
+    python eva_watch.py /bancs/logs --out /bancs/rapports --workers 2
+    python eva_watch.py /bancs/logs --once          # traite l'arriéré puis s'arrête
+"""
+from __future__ import annotations
+import argparse, re, threading, time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from eva_chunks import CSV_SUFFIXES, MDF_SUFFIXES
+from eva_detecteur import CONFIG
+from eva_perf import config_hash
+from eva_store import ResultsStore
+from eva_workers import WorkerPool
+
+try:
+    from inotify_simple import INotify, flags as _inotify_flags  # type: ignore
+    _INOTIFY_AVAILABLE = True
+except Exception:
+    INotify = None  # type: ignore
+    _INOTIFY_AVAILABLE = False
+
+LOG_SUFFIXES = tuple(MDF_SUFFIXES) + tuple(CSV_SUFFIXES)
+DEFAULT_SETTLE_S = 5.0
+DEFAULT_POLL_S = 2.0
+
+Stat = Tuple[int, int]
+
+
+class FolderWatcher:
+    """Démon d'analyse d'un dossier (voir le module)."""
+
+    def __init__(self, folder: Path, out_dir: Path, store: ResultsStore, pool: WorkerPool,
+                 settle_s: float = DEFAULT_SETTLE_S, poll_s: float = DEFAULT_POLL_S,
+                 max_pending: Optional[int] = None, name_pattern: Optional[str] = None,
+                 recursive: bool = False, use_inotify: bool = True):
+        self.folder = Path(folder)
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.store = store
+        self.pool = pool
+        self.settle_s = settle_s
+        self.poll_s = poll_s
+        self.max_pending = max_pending or 2 * pool.workers
+        self.name_pattern = re.compile(name_pattern) if name_pattern else None
+        self.recursive = recursive
+        self.stats = {"analyzed": 0, "failed": 0}
+        self._seen: Dict[Path, Stat] = {}
+        self._pending: Dict[Path, Future] = {}
+        self._failed: Dict[Path, Stat] = {}  # pas de nouvel essai tant que le fichier ne change pas
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._inotify = None
+        if use_inotify and _INOTIFY_AVAILABLE:
+            try:
+                self._inotify = INotify()
+                self._inotify.add_watch(str(self.folder), _inotify_flags.CLOSE_WRITE | _inotify_flags.MOVED_TO)
+            except OSError:
+                self._inotify = None  # limite de watches atteinte, système de fichiers non supporté...
+
+    @staticmethod
+    def _config() -> str:
+        """Empreinte des classeurs : une configuration modifiée fait réanalyser les fichiers."""
+        return config_hash(CONFIG[p] for p in ("labels_xlsx", "flux_xlsx", "pval_xlsm"))
+
+    # ---------- détection ----------
+    def _files(self) -> List[Path]:
+        pattern = "**/*" if self.recursive else "*"
+        return [p for p in self.folder.glob(pattern) if p.suffix.lower() in LOG_SUFFIXES and p.is_file()]
+
+    def scan(self) -> List[Path]:
+        """Fichiers prêts (écriture terminée, pas encore analysés ni en cours), plus anciens d'abord."""
+        now = time.time()
+        config = self._config()
+        ready: List[Tuple[int, Path]] = []
+        for path in self._files():
+            try:
+                st = path.stat()
+            except OSError:
+                continue  # supprimé entre-temps
+            current = (st.st_size, st.st_mtime_ns)
+            previous = self._seen.get(path)
+            self._seen[path] = current
+            if previous is not None and previous != current:
+                continue  # encore en cours d'écriture
+            if now - st.st_mtime < self.settle_s or st.st_size == 0:
+                continue
+            with self._lock:
+                if path in self._pending or self._failed.get(path) == current:
+                    continue
+            if self.store.lookup(path, config) is not None:
+                continue
+            ready.append((st.st_mtime_ns, path))
+        return [p for _, p in sorted(ready)]
+
+    @property
+    def backlog(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # ---------- analyse ----------
+    def _tags(self, path: Path) -> Dict[str, Optional[str]]:
+        match = self.name_pattern.search(path.name) if self.name_pattern else None
+        groups = match.groupdict() if match else {}
+        return {"vin": groups.get("vin"), "swid": groups.get("swid")}
+
+    def submit(self, path: Path) -> Future:
+        report = self.out_dir / f"{path.stem}.html"
+        config = self._config()
+        started = time.perf_counter()
+        future = self.pool.submit(path, report_path=report)
+        with self._lock:
+            self._pending[path] = future
+        future.add_done_callback(lambda f: self._done(path, f, report, config, time.perf_counter() - started))
+        return future
+
+    def _done(self, path: Path, future: Future, report: Path, config: str, elapsed_s: float) -> None:
+        try:
+            self.store.record(path, future.result(), config, report=report, elapsed_s=elapsed_s, **self._tags(path))
+        except Exception as e:
+            self.stats["failed"] += 1
+            try:
+                st = path.stat()
+                with self._lock:
+                    self._failed[path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                pass
+            print(f"❌ {path.name}: {e}")
+        else:
+            self.stats["analyzed"] += 1
+            print(f"✅ {path.name} ({elapsed_s:.1f} s) -> {report}")
+        finally:
+            with self._lock:
+                self._pending.pop(path, None)
+            self._wake.set()  # une place s'est libérée
+
+    def step(self) -> int:
+        """Un passage : confie au pool les fichiers prêts dans la limite de ``max_pending``."""
+        free = self.max_pending - self.backlog
+        if free <= 0:
+            return 0
+        ready = self.scan()
+        for path in ready[:free]:
+            self.submit(path)
+        return min(free, len(ready))
+
+    def _wait(self) -> None:
+        """Attend un événement inotify, une place libre dans le pool ou le prochain balayage."""
+        if self._inotify is not None:
+            if self._inotify.read(timeout=int(self.poll_s * 1000)):
+                time.sleep(min(self.settle_s, self.poll_s))  # laisser passer l'anti-rebond
+        else:
+            self._wake.wait(self.poll_s)
+        self._wake.clear()
+
+    def run(self) -> None:
+        """Boucle du démon, jusqu'à ``stop()``."""
+        print(f"👀 Surveillance de {self.folder} ({'inotify' if self._inotify else f'balayage {self.poll_s:g} s'}, "
+              f"{self.pool.workers} worker(s), {self.max_pending} en attente max)")
+        while not self._stop.is_set():
+            self.step()
+            self._wait()
+
+    def drain(self) -> Dict[str, int]:
+        """Traite l'arriéré du dossier puis rend la main (mode ``--once``)."""
+        while not self._stop.is_set():
+            submitted = self.step()
+            if not submitted and not self.backlog and not self._unsettled():
+                break
+            self._wake.wait(min(self.poll_s, 0.2))
+            self._wake.clear()
+        return self.stats
+
+    def _unsettled(self) -> bool:
+        now = time.time()
+        for path in self._files():
+            try:
+                if now - path.stat().st_mtime < self.settle_s:
+                    return True
+            except OSError:
+                pass
+        return False
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Analyse automatique des logs déposés dans un dossier")
+    ap.add_argument("folder", type=Path)
+    ap.add_argument("--out", type=Path, default=Path("rapports"), help="Répertoire des rapports HTML")
+    ap.add_argument("--store", type=Path, default=None, help="Magasin de résultats SQLite (défaut: EVA_STORE)")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--max_pending", type=int, default=None, help="Fichiers confiés au pool au plus (défaut: 2 × workers)")
+    ap.add_argument("--settle", type=float, default=DEFAULT_SETTLE_S, help="Secondes sans écriture avant analyse")
+    ap.add_argument("--poll", type=float, default=DEFAULT_POLL_S, help="Période de balayage sans inotify")
+    ap.add_argument("--name_pattern", default=None, help="Regex à groupes nommés vin / swid sur le nom de fichier")
+    ap.add_argument("--recursive", action="store_true")
+    ap.add_argument("--once", action="store_true", help="Traiter les fichiers présents puis s'arrêter")
+    args = ap.parse_args(argv)
+
+    store = ResultsStore(args.store)
+    with WorkerPool(args.workers) as pool:
+        watcher = FolderWatcher(args.folder, args.out, store, pool, args.settle, args.poll,
+                                args.max_pending, args.name_pattern, args.recursive)
+        try:
+            watcher.drain() if args.once else watcher.run()
+        except KeyboardInterrupt:
+            watcher.stop()
+    print(f"\n{watcher.stats['analyzed']} analysé(s), {watcher.stats['failed']} en échec")
+    store.close()
+    return watcher.stats
+
+
+if __name__ == "__main__":
+    main()
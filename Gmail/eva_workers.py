@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Pool de workers chauds pour les analyses en lot et le service HTTP.
+
+Un processus d'analyse neuf paie l'import de pandas / asammdf (plusieurs
+centaines de ms) et la lecture des trois classeurs Excel (plusieurs
+secondes). Les workers de ``WorkerPool`` sont persistants :
+
+* ils importent le cœur d'analyse une seule fois, à leur démarrage ;
+* ils gardent la configuration compilée (``WarmConfig``) : table Feuil3 et
+  table UC, mappings SWEET des deux modes, identifiants DOORS du PVAL. Elle
+  est fournie à chaque run (``PipelineRun.provide``) et recompilée seulement
+  si un classeur change (chemin, taille, mtime) ;
+* l'index des canaux des derniers fichiers reste en mémoire (cache LRU de
+  ``eva_index``).
+
+Chaque tâche ne transporte que ``(fichier, options)`` ; pour un petit log le
+surcoût par fichier tombe à quelques dizaines de millisecondes.
+
+Exemple :
+    python eva_workers.py --workers 2 --out rapports logs/*.mf4
+    python eva_workers.py --profile sample --out rapports logs/*.mf4   # profil par fichier
+"""
+from __future__ import annotations
+import argparse, multiprocessing, os, queue, threading, time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from eva_detecteur import CONFIG, DEFAULT_WINDOW_S, PIPELINE, analyser_et_generer_rapport, pipeline_run
+from eva_perf import PROFILE_MODES
+from eva_pipeline import PipelineRun
+
+SWEET_MODES = ("sweet400", "sweet500")
+CONFIG_PARAMS = ("labels_xlsx", "flux_xlsx", "pval_xlsm")
+# Sorties du pipeline qui ne dépendent que des classeurs
+CONFIG_STAGES = ("feuil3", "uc_map", "pval_requirements")
+
+def _ident(path: Any) -> Hashable:
+    try:
+        st = Path(path).stat()
+    except (OSError, TypeError):
+        return str(path)
+    return (str(Path(path).resolve()), st.st_size, st.st_mtime_ns)
+
+
+class WarmConfig:
+    """Configuration compilée, par jeu de classeurs (les derniers ``keep`` utilisés)."""
+
+    def __init__(self, keep: int = 4):
+        self.keep = keep
+        self._compiled: "OrderedDict[Hashable, Dict[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compile(self, labels_xlsx: Path, flux_xlsx: Path, pval_xlsm: Path) -> Dict[Any, Any]:
+        """Sorties de configuration ``{étape: valeur}`` ; ``("flux_mapping", mode)`` pour chaque mode SWEET.
+
+        Une sortie impossible à calculer (classeur absent, onglet introuvable)
+        est omise : le run de l'analyse la recalculera et signalera l'erreur.
+        """
+        key = tuple(_ident(p) for p in (labels_xlsx, flux_xlsx, pval_xlsm))
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                return compiled
+            compiled = {}
+            run = PIPELINE.run(labels_xlsx=labels_xlsx, flux_xlsx=flux_xlsx, pval_xlsm=pval_xlsm, mode=SWEET_MODES[0])
+            for name in CONFIG_STAGES:
+                try:
+                    compiled[name] = run.get(name)
+                except Exception:
+                    pass
+            for mode in SWEET_MODES:
+                try:
+                    compiled[("flux_mapping", mode)] = run.derive(mode=mode).get("flux_mapping")
+                except Exception:
+                    pass
+            self._compiled[key] = compiled
+            while len(self._compiled) > self.keep:
+                self._compiled.popitem(last=False)
+            return compiled
+
+    def provide(self, run: PipelineRun) -> PipelineRun:
+        """Fournit au run les sorties de configuration déjà compilées pour ses classeurs."""
+        params = run.params
+        compiled = self.compile(*(params.get(p) for p in CONFIG_PARAMS))
+        for name in CONFIG_STAGES:
+            if name in compiled:
+                run.provide(name, compiled[name])
+        flux = compiled.get(("flux_mapping", params.get("mode")))
+        if flux is not None:
+            run.provide("flux_mapping", flux)
+        return run
+
+
+# ---------- côté worker ----------
+
+WARM = WarmConfig()
+_events = None
+
+
+def init_worker(events=None) -> None:
+    """Initialisation d'un worker : canal d'avancement et compilation de la configuration par défaut."""
+    global _events
+    _events = events
+    try:
+        WARM.compile(*(CONFIG[p] for p in CONFIG_PARAMS))
+    except Exception:
+        pass  # configuration illisible : chaque analyse le signalera
+
+
+def progress_sender(job_id: Hashable) -> Callable[[float, str], None]:
+    """Rappel d'avancement transmis au processus principal (un message par point de pourcentage)."""
+    last = [-1]
+
+    def send(fraction: float, message: str) -> None:
+        percent = int(fraction * 100)
+        if _events is not None and percent != last[0]:
+            last[0] = percent
+            _events.put((job_id, fraction, message))
+    return send
+
+
+class AnalysisFailed(RuntimeError):
+    """Analyse terminée sur un résultat d'erreur (``{"Erreur": {"status": "error", ...}}``)."""
+
+
+def analysis_error(results: Any) -> Optional[str]:
+    """Message d'un résultat d'analyse en échec, ``None`` si l'analyse a abouti."""
+    if not isinstance(results, dict):
+        return None
+    if results.get("status") == "error":
+        return str(results.get("message") or results.get("error") or "erreur")
+    entry = results.get("Erreur")
+    if isinstance(entry, dict) and entry.get("status") == "error":
+        return str(entry.get("message") or "erreur")
+    return None
+
+
+def analyze_file(job_id: Hashable, path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Tâche d'un worker : analyse de ``path`` avec la configuration chaude.
+
+    Un résultat d'erreur lève ``AnalysisFailed`` : l'appelant (service, lot,
+    surveillance de dossier) le traite en échec, sans le mettre en cache.
+    """
+    run = pipeline_run(Path(path), window_s=options.get("window_s", DEFAULT_WINDOW_S))
+    WARM.provide(run)
+    results = analyser_et_generer_rapport(path, progress=progress_sender(job_id), run=run, **options)
+    error = analysis_error(results)
+    if error is not None:
+        raise AnalysisFailed(error)
+    return results
+
+
+# ---------- côté appelant ----------
+
+class WorkerPool:
+    """Workers persistants (processus, ou threads avec ``processes=False``) initialisés par ``init_worker``.
+
+    ``on_progress(job_id, fraction, message)`` est appelé depuis un thread
+    de relais pour chaque avancement remonté par les workers.
+    """
+
+    def __init__(self, workers: Optional[int] = None, processes: bool = True,
+                 on_progress: Optional[Callable[[Hashable, float, str], None]] = None):
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+        self.processes = processes
+        self.on_progress = on_progress
+        if processes:
+            # spawn : les workers n'héritent ni des threads ni des verrous de l'appelant
+            self._context = multiprocessing.get_context("spawn")
+            self.events = self._context.Queue()
+        else:
+            self.events = queue.Queue()
+        self._executor = self._make_executor()
+        self._relay = threading.Thread(target=self._relay_progress, name="eva-workers-progress", daemon=True)
+        self._relay.start()
+
+    def _make_executor(self):
+        if self.processes:
+            return ProcessPoolExecutor(self.workers, mp_context=self._context,
+                                       initializer=init_worker, initargs=(self.events,))
+        return ThreadPoolExecutor(self.workers, thread_name_prefix="eva-worker",
+                                  initializer=init_worker, initargs=(self.events,))
+
+    def _relay_progress(self) -> None:
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+            if self.on_progress is not None:
+                self.on_progress(*event)
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Exécute ``fn(*args)`` sur un worker (``fn`` doit être une fonction de module)."""
+        try:
+            return self._executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # Un worker est mort (p.ex. sur un fichier corrompu) : nouveau pool
+            self._executor = self._make_executor()
+            return self._executor.submit(fn, *args)
+
+    def submit(self, path: Any, job_id: Optional[Hashable] = None, **options: Any) -> Future:
+        """Analyse de ``path`` (options de ``analyser_et_generer_rapport``)."""
+        return self.run(analyze_file, job_id if job_id is not None else str(path), str(path), options)
+
+    def close(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self.events.put(None)
+        if wait:
+            self._relay.join(5)  # derniers avancements relayés
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close(wait=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Analyse en lot sur un pool de workers chauds")
+    ap.add_argument("files", nargs="+", type=Path)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--out", type=Path, default=Path("rapports"), help="Répertoire des rapports HTML")
+    ap.add_argument("--chunked", action="store_true", help="Mode fenêtré (logs plus gros que la RAM)")
+    ap.add_argument("--profile", nargs="?", const="cprofile", choices=PROFILE_MODES, default=None,
+                    help="Profiler chaque fichier (.prof + piles repliées .folded à côté de son rapport)")
+    args = ap.parse_args(argv)
+    args.out.mkdir(parents=True, exist_ok=True)
+
+    with WorkerPool(args.workers) as pool:
+        pool.run(time.sleep, 0).result()  # workers démarrés, configuration compilée
+        t0 = time.perf_counter()
+        # Profil pris dans le worker, autour de l'analyse du fichier (profile_run, étapes en série)
+        futures = [(path, pool.submit(path, report_path=args.out / f"{path.stem}.html", chunked=args.chunked,
+                                      profile=args.profile))
+                   for path in args.files]
+        rows = []
+        for path, future in futures:
+            error = future.exception()
+            rows.append((path, error))
+            print(f"{path.name:<40} {'ERREUR: ' + str(error) if error else 'OK'}")
+            if error is None:
+                for written in future.result().get("_profile", {}).values():
+                    print(f"    Profil écrit: {written}")
+        elapsed = time.perf_counter() - t0
+    print(f"\n{len(rows)} fichier(s) en {elapsed:.2f} s ({elapsed * 1000 / max(1, len(rows)):.1f} ms/fichier)")
+    return rows
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
 from pathlib import Path
-import threading
 import webbrowser
 import os
 from typing import Optional
@@ -13,6 +12,7 @@ from eva_detecteur import (
     verifier_presence_mapping_0p01s,
     CONFIG,
 )
+from eva_jobs import JobExecutor, job_key
 
 # ====== Logos (your absolute paths) ======
 LOGO_RENAULT = Path(r"C:\Users\p131242\OneDrive - Alliance\EVA\icons\renault.png")
@@ -119,6 +119,9 @@ class EVAApp:
         self.selected_sweet = tk.StringVar(value=self.T["sweet400"]) 
         self.status_text = tk.StringVar(value=self.T["status_ready"]) 
 
+        # Travaux d'arrière-plan : file d'attente, dédoublonnage, résultats partagés
+        self.jobs = JobExecutor(dispatch=lambda fn: self.root.after(0, fn))
+
         self._init_styles()
         self._build_header()
         self._build_body()
@@ -535,34 +538,43 @@ class EVAApp:
             messagebox.showerror(self.T["file_err"], self.T["select_first"])
             return
 
-        self.btn_start.config(state="disabled")
-        self._update_progress(5)
-        self._show_loading(True, self.T["analyzing"]) 
-
         # "Auto" peut être FR/EN
         myf_val = self.selected_myf.get()
         is_auto = myf_val.lower().startswith("auto") or myf_val == LANG["fr"]["auto"] or myf_val == LANG["en"]["auto"]
         myf_choice = None if is_auto else myf_val
+        lang = self.lang_var.get()
+
+        # Une analyse identique déjà en cours n'est pas relancée
+        key = job_key("analysis", self.selected_file, lang=lang, myf=myf_choice)
+        if self.jobs.running(key):
+            return
+
+        self.btn_start.config(state="disabled")
+        self._update_progress(0)
+        self._show_loading(True, self.T["analyzing"]) 
+
+        def on_progress(fraction, message):
+            # Appelé depuis les threads d'analyse : la détection occupe 0-50 %, la vérification SWEET la suite
+            self.root.after(0, self._update_progress, int(fraction * 50))
 
         def run_analysis():
             try:
-                try:
-                    result = analyser_et_generer_rapport(self.selected_file, lang=self.lang_var.get(), myf=myf_choice)
-                except TypeError:
-                    CONFIG["myf"] = myf_choice
-                    result = analyser_et_generer_rapport(self.selected_file, lang=self.lang_var.get())
-
-                found = [uc for uc, info in result.items() if info.get("status") == "detected"]
-                uc = found[0] if found else ("Non détecté" if self.lang_var.get() == "fr" else "Not detected")
+                return analyser_et_generer_rapport(self.selected_file, lang=lang, myf=myf_choice, progress=on_progress)
+            except TypeError:
+                CONFIG["myf"] = myf_choice
+                return analyser_et_generer_rapport(self.selected_file, lang=lang)
 
-                self.root.after(0, lambda: self._handle_analysis_result(uc))
+        def on_done(result):
+            self.btn_start.config(state="normal")
+            found = [uc for uc, info in result.items()
+                     if not uc.startswith("_") and isinstance(info, dict) and info.get("status") == "detected"]
+            self._handle_analysis_result(found[0] if found else ("Non détecté" if lang == "fr" else "Not detected"))
 
-            except Exception as e:
-                self.root.after(0, lambda: self._handle_error(e))
-            finally:
-                self.root.after(0, lambda: self.btn_start.config(state="normal"))
+        def on_error(e):
+            self.btn_start.config(state="normal")
+            self._handle_error(e)
 
-        threading.Thread(target=run_analysis, daemon=True).start()
+        self.jobs.submit(key, run_analysis, on_done=on_done, on_error=on_error)
 
     def _handle_analysis_result(self, uc_text: str):
         self.detected_uc = uc_text
@@ -580,28 +592,26 @@ class EVAApp:
 
         def run_sweet_verification():
             try:
-                try:
-                    df = verifier_presence_mapping_0p01s(
-                        self.selected_file, mode=sweet_mode, uc_id=uc_id, myf=myf_choice
-                    )
-                except TypeError:
-                    CONFIG["myf"] = myf_choice
-                    df = verifier_presence_mapping_0p01s(self.selected_file, mode=sweet_mode, uc_id=uc_id)
-
-                html = Path(f"verification_{sweet_mode}.html")
-                html.write_text(df.to_html(index=False), encoding="utf-8")
-
-                col = "Statut" if "Statut" in df.columns else ("Status" if "Status" in df.columns else None)
-                ok = (df[col] == "OK").all() if col else False
-                version = "400" if sweet_mode.endswith("400") else "500"
-                label = f"SWEET {version} - {'OK' if ok else 'NOK'}"
-
-                self.root.after(0, lambda: self._handle_sweet_result(html, label, ok))
-
-            except Exception as e:
-                self.root.after(0, lambda: self._handle_error(e))
-
-        threading.Thread(target=run_sweet_verification, daemon=True).start()
+                df = verifier_presence_mapping_0p01s(
+                    self.selected_file, mode=sweet_mode, uc_id=uc_id, myf=myf_choice
+                )
+            except TypeError:
+                CONFIG["myf"] = myf_choice
+                df = verifier_presence_mapping_0p01s(self.selected_file, mode=sweet_mode, uc_id=uc_id)
+
+            html = Path(f"verification_{sweet_mode}.html")
+            html.write_text(df.to_html(index=False), encoding="utf-8")
+
+            col = "Statut" if "Statut" in df.columns else ("Status" if "Status" in df.columns else None)
+            ok = (df[col] == "OK").all() if col else False
+            version = "400" if sweet_mode.endswith("400") else "500"
+            label = f"SWEET {version} - {'OK' if ok else 'NOK'}"
+            return html, label, ok
+
+        # Même fichier (inchangé) et mêmes options : le résultat précédent est réutilisé
+        self.jobs.submit(job_key("sweet", self.selected_file, mode=sweet_mode, uc_id=uc_id, myf=myf_choice),
+                         run_sweet_verification, reuse=True,
+                         on_done=lambda r: self._handle_sweet_result(*r), on_error=self._handle_error)
 
     def _handle_sweet_result(self, html_path: Path, label: str, ok: bool):
         self._update_progress(100)
@@ -632,7 +642,6 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
 from pathlib import Path
-import threading
 import webbrowser
 import os
 from typing import Optional
@@ -643,6 +652,7 @@ from eva_detecteur import (
     verifier_presence_mapping_0p01s,
     CONFIG,
 )
+from eva_jobs import JobExecutor, job_key
 
 # ====== Logos (your absolute paths) ======
 LOGO_RENAULT = Path(r"C:\Users\p131242\OneDrive - Alliance\EVA\icons\renault.png")
@@ -749,6 +759,9 @@ class EVAApp:
         self.selected_sweet = tk.StringVar(value=self.T["sweet400"]) 
         self.status_text = tk.StringVar(value=self.T["status_ready"]) 
 
+        # Travaux d'arrière-plan : file d'attente, dédoublonnage, résultats partagés
+        self.jobs = JobExecutor(dispatch=lambda fn: self.root.after(0, fn))
+
         self._init_styles()
         self._build_header()
         self._build_body()
@@ -1165,34 +1178,43 @@ class EVAApp:
             messagebox.showerror(self.T["file_err"], self.T["select_first"])
             return
 
-        self.btn_start.config(state="disabled")
-        self._update_progress(5)
-        self._show_loading(True, self.T["analyzing"]) 
-
         # "Auto" peut être FR/EN
         myf_val = self.selected_myf.get()
         is_auto = myf_val.lower().startswith("auto") or myf_val == LANG["fr"]["auto"] or myf_val == LANG["en"]["auto"]
         myf_choice = None if is_auto else myf_val
+        lang = self.lang_var.get()
+
+        # Une analyse identique déjà en cours n'est pas relancée
+        key = job_key("analysis", self.selected_file, lang=lang, myf=myf_choice)
+        if self.jobs.running(key):
+            return
+
+        self.btn_start.config(state="disabled")
+        self._update_progress(0)
+        self._show_loading(True, self.T["analyzing"]) 
+
+        def on_progress(fraction, message):
+            # Appelé depuis les threads d'analyse : la détection occupe 0-50 %, la vérification SWEET la suite
+            self.root.after(0, self._update_progress, int(fraction * 50))
 
         def run_analysis():
             try:
-                try:
-                    result = analyser_et_generer_rapport(self.selected_file, lang=self.lang_var.get(), myf=myf_choice)
-                except TypeError:
-                    CONFIG["myf"] = myf_choice
-                    result = analyser_et_generer_rapport(self.selected_file, lang=self.lang_var.get())
-
-                found = [uc for uc, info in result.items() if info.get("status") == "detected"]
-                uc = found[0] if found else ("Non détecté" if self.lang_var.get() == "fr" else "Not detected")
+                return analyser_et_generer_rapport(self.selected_file, lang=lang, myf=myf_choice, progress=on_progress)
+            except TypeError:
+                CONFIG["myf"] = myf_choice
+                return analyser_et_generer_rapport(self.selected_file, lang=lang)
 
-                self.root.after(0, lambda: self._handle_analysis_result(uc))
+        def on_done(result):
+            self.btn_start.config(state="normal")
+            found = [uc for uc, info in result.items()
+                     if not uc.startswith("_") and isinstance(info, dict) and info.get("status") == "detected"]
+            self._handle_analysis_result(found[0] if found else ("Non détecté" if lang == "fr" else "Not detected"))
 
-            except Exception as e:
-                self.root.after(0, lambda: self._handle_error(e))
-            finally:
-                self.root.after(0, lambda: self.btn_start.config(state="normal"))
+        def on_error(e):
+            self.btn_start.config(state="normal")
+            self._handle_error(e)
 
-        threading.Thread(target=run_analysis, daemon=True).start()
+        self.jobs.submit(key, run_analysis, on_done=on_done, on_error=on_error)
 
     def _handle_analysis_result(self, uc_text: str):
         self.detected_uc = uc_text
@@ -1210,28 +1232,26 @@ class EVAApp:
 
         def run_sweet_verification():
             try:
-                try:
-                    df = verifier_presence_mapping_0p01s(
-                        self.selected_file, mode=sweet_mode, uc_id=uc_id, myf=myf_choice
-                    )
-                except TypeError:
-                    CONFIG["myf"] = myf_choice
-                    df = verifier_presence_mapping_0p01s(self.selected_file, mode=sweet_mode, uc_id=uc_id)
-
-                html = Path(f"verification_{sweet_mode}.html")
-                html.write_text(df.to_html(index=False), encoding="utf-8")
-
-                col = "Statut" if "Statut" in df.columns else ("Status" if "Status" in df.columns else None)
-                ok = (df[col] == "OK").all() if col else False
-                version = "400" if sweet_mode.endswith("400") else "500"
-                label = f"SWEET {version} - {'OK' if ok else 'NOK'}"
-
-                self.root.after(0, lambda: self._handle_sweet_result(html, label, ok))
-
-            except Exception as e:
-                self.root.after(0, lambda: self._handle_error(e))
-
-        threading.Thread(target=run_sweet_verification, daemon=True).start()
+                df = verifier_presence_mapping_0p01s(
+                    self.selected_file, mode=sweet_mode, uc_id=uc_id, myf=myf_choice
+                )
+            except TypeError:
+                CONFIG["myf"] = myf_choice
+                df = verifier_presence_mapping_0p01s(self.selected_file, mode=sweet_mode, uc_id=uc_id)
+
+            html = Path(f"verification_{sweet_mode}.html")
+            html.write_text(df.to_html(index=False), encoding="utf-8")
+
+            col = "Statut" if "Statut" in df.columns else ("Status" if "Status" in df.columns else None)
+            ok = (df[col] == "OK").all() if col else False
+            version = "400" if sweet_mode.endswith("400") else "500"
+            label = f"SWEET {version} - {'OK' if ok else 'NOK'}"
+            return html, label, ok
+
+        # Même fichier (inchangé) et mêmes options : le résultat précédent est réutilisé
+        self.jobs.submit(job_key("sweet", self.selected_file, mode=sweet_mode, uc_id=uc_id, myf=myf_choice),
+                         run_sweet_verification, reuse=True,
+                         on_done=lambda r: self._handle_sweet_result(*r), on_error=self._handle_error)
 
     def _handle_sweet_result(self, html_path: Path, label: str, ok: bool):
         self._update_progress(100)
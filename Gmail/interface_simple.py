@@ -1,7 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
-import threading
 import webbrowser
 import os
 from typing import Optional
@@ -12,6 +11,7 @@ from eva_detecteur import (
     verifier_presence_mapping_0p01s,
     CONFIG,
 )
+from eva_jobs import JobExecutor, job_key
 
 # ====== Interface simplifiée ======
 class EVAApp:
@@ -24,6 +24,9 @@ class EVAApp:
         self.selected_file: Optional[str] = None
         self.detected_uc: str = "Non détecté"
         
+        # Travaux d'arrière-plan : file d'attente et dédoublonnage
+        self.jobs = JobExecutor(dispatch=lambda fn: self.root.after(0, fn))
+        
         self._build_interface()
 
     def _build_interface(self):
@@ -120,51 +123,54 @@ class EVAApp:
             messagebox.showerror("Erreur", "Aucun fichier sélectionné")
             return
         
+        key = job_key("analysis", self.selected_file)
+        if self.jobs.running(key):
+            self._log("⏳ Analyse déjà en cours pour ce fichier")
+            return
+        
         self.btn_analyze.config(state="disabled")
-        self._update_progress(10)
+        self._update_progress(0)
         self._log("🔄 Démarrage de l'analyse...")
         
         def analyze():
-            try:
-                # Analyse principale
-                self._log("📖 Lecture des fichiers de configuration...")
-                self._update_progress(30)
-                
-                results = analyser_et_generer_rapport(self.selected_file)
-                
-                self._log("✅ Analyse terminée")
-                self._update_progress(80)
-                
-                # Traitement des résultats
-                detected_ucs = [uc for uc, info in results.items() 
-                              if info.get("status") == "detected"]
-                
-                if detected_ucs:
-                    self.detected_uc = detected_ucs[0]
-                    self._log(f"🎯 Use Case détecté: {self.detected_uc}")
-                else:
-                    self.detected_uc = "Aucun UC détecté"
-                    self._log("⚠️ Aucun Use Case détecté")
-                
-                # Exigences
-                if "_requirements" in results:
-                    req_info = results["_requirements"]
-                    self._log(f"📋 Exigences vérifiées: {req_info['total']}")
-                    self._log(f"   - OK: {req_info['ok']}")
-                    self._log(f"   - NOK: {req_info['nok']}")
-                    self._log(f"   - Erreur: {req_info['error']}")
-                
-                self._update_progress(100)
-                
-                # Mettre à jour l'interface
-                self.root.after(0, self._update_results)
-                
-            except Exception as e:
-                self.root.after(0, lambda: self._log(f"❌ Erreur: {str(e)}"))
-            finally:
-                self.root.after(0, lambda: self.btn_analyze.config(state="normal"))
-        
-        threading.Thread(target=analyze, daemon=True).start()
+            # Analyse principale (avancement réel remonté par le cœur d'analyse)
+            self._log("📖 Lecture des fichiers de configuration...")
+            results = analyser_et_generer_rapport(
+                self.selected_file, progress=lambda f, msg: self._update_progress(int(f * 100)))
+            
+            self._log("✅ Analyse terminée")
+            
+            # Traitement des résultats
+            detected_ucs = [uc for uc, info in results.items() 
+                          if not uc.startswith("_") and isinstance(info, dict)
+                          and info.get("status") == "detected"]
+            
+            if detected_ucs:
+                self.detected_uc = detected_ucs[0]
+                self._log(f"🎯 Use Case détecté: {self.detected_uc}")
+            else:
+                self.detected_uc = "Aucun UC détecté"
+                self._log("⚠️ Aucun Use Case détecté")
+            
+            # Exigences
+            if "_requirements" in results:
+                req_info = results["_requirements"]
+                self._log(f"📋 Exigences vérifiées: {req_info['total']}")
+                self._log(f"   - OK: {req_info['ok']}")
+                self._log(f"   - NOK: {req_info['nok']}")
+                self._log(f"   - Erreur: {req_info['error']}")
+            
+            self._update_progress(100)
+        
+        def on_done(_):
+            self.btn_analyze.config(state="normal")
+            self._update_results()
+        
+        def on_error(e):
+            self.btn_analyze.config(state="normal")
+            self._log(f"❌ Erreur: {str(e)}")
+        
+        self.jobs.submit(key, analyze, on_done=on_done, on_error=on_error)
 
     def _update_results(self):
         """Mettre à jour l'affichage des résultats."""
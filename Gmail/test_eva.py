@@ -96,6 +96,888 @@ def test_requirements_verification():
         if test_csv.exists():
             test_csv.unlink()
 
+def test_chunked_requirements():
+    """Le mode fenêtré doit donner les mêmes verdicts que le mode en mémoire."""
+    print("\n=== Test mode fenêtré ===")
+    
+    import numpy as np
+    import pandas as pd
+    t = np.arange(0, 300, 0.01)
+    test_data = pd.DataFrame({
+        "Time": t,
+        "SOC_BMS": 80 + np.sin(t),
+        "SOC_Affiche": 81 + np.cos(t),
+        "Temperature_Battery": 25 + 5 * np.sin(t / 10),
+        "Battery_Voltage": 350 + 0.01 * t,
+    })
+    
+    test_csv = Path("test_data_chunked.csv")
+    test_data.to_csv(test_csv, index=False)
+    
+    try:
+        full = verify_all_requirements(test_csv)
+        chunked = verify_all_requirements(test_csv, chunked=True, window_s=7.0)
+        print(chunked.to_string(index=False))
+        assert full.equals(chunked)
+    finally:
+        if test_csv.exists():
+            test_csv.unlink()
+
+def test_csv_single_read():
+    """Un CSV n'est parcouru qu'une fois pour tous les signaux ; une colonne vide est absente."""
+    print("\n=== Test lecture CSV unique ===")
+
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    import eva_chunks, eva_signals
+    from eva_chunks import iter_windows
+    t = np.arange(0, 30, 0.01)
+    data = pd.DataFrame({"Time": t, "SOC_BMS": 80 + np.sin(t), "SOC_Affiche": 81 + np.cos(t), "Vide": np.nan})
+    reads = []
+    real_read_csv = pd.read_csv
+    def counting_read_csv(*args, **kwargs):
+        if kwargs.get("nrows") != 0:
+            reads.append(kwargs.get("usecols"))
+        return real_read_csv(*args, **kwargs)
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "log.csv"
+        data.to_csv(log, index=False)
+        eva_signals.pd.read_csv = eva_chunks.pd.read_csv = counting_read_csv  # même module pandas
+        try:
+            signals = read_signal_data(log, ["SOC_BMS", "SOC_Affiche", "Vide", "Absent"])
+            assert [signals[s].present for s in ("SOC_BMS", "SOC_Affiche", "Vide", "Absent")] == [True, True, False, False]
+            assert np.allclose(signals["SOC_Affiche"].samples, data["SOC_Affiche"])
+            assert np.allclose(signals["SOC_BMS"].timestamps, t)
+            assert len(reads) == 1
+            reads.clear()
+            windows = list(iter_windows(log, ["SOC_BMS", "SOC_Affiche"], window_s=7.0))
+            assert len(reads) == 1
+        finally:
+            pd.read_csv = real_read_csv
+    assert [w[0] for w in windows] == [0.0, 7.0, 14.0, 21.0, 28.0]
+    for name in ("SOC_BMS", "SOC_Affiche"):
+        assert np.allclose(np.concatenate([w[2][name][1] for w in windows]), data[name])
+        assert np.allclose(np.concatenate([w[2][name][0] for w in windows]), t)
+    assert all(w[2]["SOC_BMS"][0].max() < w[1] for w in windows)
+
+def test_bench_regression_gate():
+    """La comparaison à la référence signale les étapes trop lentes ou trop gourmandes."""
+    print("\n=== Test seuil de régression ===")
+    
+    from eva_bench import compare_reports
+    run = {"scale": "1MB", "format": "mf4", "channels": 10, "groups": 1, "compression": 0, "file": "log.mf4"}
+    baseline = {"runs": [{**run, "stages": {
+        "render": {"wall_s": 1.0, "peak_bytes": 10 * 1024**2},
+        "plots": {"wall_s": 1.0, "peak_bytes": 10 * 1024**2},
+        "tiny": {"wall_s": 0.001, "peak_bytes": 100}}}]}
+    current = {"runs": [{**run, "stages": {
+        "render": {"wall_s": 1.1, "peak_bytes": 10 * 1024**2},
+        "plots": {"wall_s": 1.0, "peak_bytes": 20 * 1024**2},
+        "tiny": {"wall_s": 0.004, "peak_bytes": 400},
+        "new": {"wall_s": 1.0, "peak_bytes": 0}}}]}
+    status = {r["stage"]: r["status"] for r in compare_reports(current, baseline, max_slowdown=0.15)}
+    assert status == {"render": "OK", "plots": "REGRESSION", "tiny": "OK", "new": "NEW"}
+    assert compare_reports(current, baseline, max_slowdown=0.05)[0]["status"] == "REGRESSION"
+
+def test_bench_log_generator():
+    """Logs synthétiques écrits par morceaux : base de temps continue, cadences et taille respectées."""
+    print("\n=== Test générateur de logs ===")
+
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from asammdf import MDF
+    import eva_bench
+    from eva_bench import _group_layout, default_channel_names, duration_for_size, generate_log
+    names = default_channel_names(5)
+    padded = default_channel_names(60, extra_names=["Extra_SWEET"])
+    assert len(names) == 5 and "SOC_BMS" in names and padded[:5] == names
+    assert len(set(padded)) == 60 and "Extra_SWEET" in padded and padded[-1].startswith("Sig_")
+    rates = (0.03, 0.1, 1.0)  # 0.03 n'est pas exact en binaire : les raccords de morceaux doivent tomber juste
+    chunk_s, eva_bench.GEN_CHUNK_S = eva_bench.GEN_CHUNK_S, 7.0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = generate_log(Path(tmp) / "raw.mf4", 30.0, names, rates=rates, groups=3, seed=1)
+            packed = generate_log(Path(tmp) / "packed.mf4", 30.0, names, rates=rates, groups=3, compression=2, seed=1)
+            with MDF(str(raw)) as mdf, MDF(str(packed)) as mdf_packed:
+                assert len(mdf.groups) == 3
+                for g, (rate, channels) in enumerate(_group_layout(names, rates, 3)):
+                    t = mdf.get_master(g)
+                    assert len(t) == round(30.0 / rate) and np.allclose(t, np.arange(len(t)) * rate)
+                    assert {c.name for c in mdf.groups[g].channels} >= set(channels)
+                soc = mdf.get("SOC_BMS")
+                assert abs(soc.samples.mean() - 80.0) < 6.0
+                assert np.array_equal(soc.samples, mdf_packed.get("SOC_BMS").samples)
+
+            csv = generate_log(Path(tmp) / "log.csv", 30.0, names, rates=rates, seed=1)
+            df = pd.read_csv(csv)
+            assert list(df.columns) == ["Time", *names] and len(df) == 1000
+            assert np.allclose(df["Time"], np.arange(1000) * 0.03)
+            target = 200 * 1024
+            sized = generate_log(Path(tmp) / "sized.csv", duration_for_size(target, 5, rates, fmt="csv"), names, rates=rates)
+            assert 0.5 < sized.stat().st_size / target < 1.5
+    finally:
+        eva_bench.GEN_CHUNK_S = chunk_s
+
+def test_channel_index_cache():
+    """L'index persistant est réutilisé tant que le fichier ne change pas."""
+    print("\n=== Test index des canaux ===")
+    
+    import os, tempfile
+    from eva_index import IndexCache
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "log.csv"
+        log.write_text("Time,SOC_BMS\n0,80\n", encoding="utf-8")
+        first = IndexCache(Path(tmp) / "index").get(log)
+        assert first.names == {"Time", "SOC_BMS"}
+        # Nouveau cache mémoire : l'index vient du disque
+        assert IndexCache(Path(tmp) / "index")._load_disk(first.key) is not None
+        log.write_text("Time,SOC_BMS,SOC_Affiche\n0,80,81\n", encoding="utf-8")
+        os.utime(log, ns=(first.mtime_ns + 10**9, first.mtime_ns + 10**9))
+        assert "SOC_Affiche" in IndexCache(Path(tmp) / "index").get(log)
+
+def test_config_workbooks():
+    """Classeurs lus en un passage : mêmes tables qu'avec read_excel ; openpyxl si calamine est inutilisable."""
+    print("\n=== Test lecture des classeurs ===")
+
+    import sys
+    import pandas as pd
+    import eva_detecteur
+    from eva_detecteur import _categorize_mapping, _excel_file
+    labels, flux, pval = (CONFIG[p] for p in ("labels_xlsx", "flux_xlsx", "pval_xlsm"))
+    feuil3 = pd.read_excel(labels, sheet_name="Feuil3", engine="openpyxl")
+    feuil3.columns = [str(c).strip() for c in feuil3.columns]
+    mapping = pd.read_excel(flux, sheet_name="SYNTH_EVA Sweet 400", engine="openpyxl")
+    mapping.columns = [str(c).strip() for c in mapping.columns]
+    if "Signal SWEET" not in mapping.columns:  # onglet SYNTH : mêmes adaptations que read_flux_mapping
+        mapping = mapping.rename(columns=dict(zip(mapping.columns[:2], ["Signal SWEET", "Signal MDF trouvé"])))
+        for col in MAPPING_CATEGORICAL_COLUMNS:
+            if col not in mapping.columns:
+                mapping[col] = "N/A"
+    mapping = _categorize_mapping(mapping.drop_duplicates().reset_index(drop=True))
+    req = pd.read_excel(pval, sheet_name="REQ", engine="openpyxl")
+    doors = set(req["DOORS Id"].dropna().astype(str).str.strip())
+
+    def check():
+        pd.testing.assert_frame_equal(read_feuil3(labels), feuil3)
+        pd.testing.assert_frame_equal(read_flux_mapping(flux, "sweet400"), mapping)
+        assert read_pval_requirements(pval) == doors
+
+    check()
+    available, calamine = eva_detecteur._CALAMINE_AVAILABLE, sys.modules.get("python_calamine")
+    eva_detecteur._CALAMINE_AVAILABLE, sys.modules["python_calamine"] = True, None  # import impossible
+    try:
+        with _excel_file(labels) as xl:
+            assert xl.engine == "openpyxl"
+        check()
+    finally:
+        eva_detecteur._CALAMINE_AVAILABLE = available
+        if calamine is None:
+            del sys.modules["python_calamine"]
+        else:
+            sys.modules["python_calamine"] = calamine
+
+def test_result_records():
+    """Statuts SWEET codés = statuts ligne à ligne d'origine ; enregistrements lisibles comme des dicts."""
+    print("\n=== Test enregistrements de résultats ===")
+
+    import numpy as np
+    import pandas as pd
+    from eva_records import SWEET_STATUSES, RequirementVerdict, UCResult
+    mapping = read_flux_mapping(CONFIG["flux_xlsx"], "sweet400")
+    found = mapping["Signal MDF trouvé"].dropna().astype(str).unique()
+    channels = set(found[::2]) | {"CAN_Repli"}
+    # L'exemple n'a aucun repli CAN : lignes ajoutées pour le repli, les blancs et les vides
+    extra = mapping.head(4).astype(object)
+    extra["Signal MDF trouvé"] = [found[1], f"  {found[0]} ", None, ""]
+    extra["CAN Fallback"] = ["CAN_Repli", "N/A", " CAN_Repli", None]
+    extended = pd.concat([mapping, extra], ignore_index=True)
+
+    def row_status(row) -> str:  # ancien compute_sweet_status (df.apply ligne par ligne)
+        sig = str(row.get("Signal MDF trouvé", "")).strip(); fb = str(row.get("CAN Fallback", "")).strip()
+        if sig and sig in channels: return "OK"
+        if fb and fb in channels: return "Fallback"
+        return "NOK"
+
+    for df in (mapping, extended):
+        expected = df.apply(row_status, axis=1).tolist()
+        table = sweet_table(df, channels)
+        assert table.codes.dtype == np.int8 and table.mapping is df
+        assert [SWEET_STATUSES[c] for c in table.codes] == expected
+        assert table.counts() == {s: expected.count(s) for s in SWEET_STATUSES}
+        frame = table.to_frame()
+        assert frame["Statut"].astype(str).tolist() == expected and frame.drop(columns="Statut").equals(df)
+        assert compute_sweet_status(df, channels)["Statut"].astype(str).tolist() == expected
+        assert [row["status"] for row in table] == expected
+        assert [r["Statut"] for r in table.to_records()] == expected
+    assert expected[-4:] == ["Fallback", "OK", "Fallback", "NOK"]
+
+    uc = UCResult("PARTIEL", 3, 2, "B_Pres", ["a", "b"])
+    assert uc["status"] == "PARTIEL" and uc.get("missing") == "B_Pres" and uc.get("absent", "-") == "-"
+    assert dict(uc.items()) == uc.to_dict() and list(uc.keys()) == ["status", "required", "present", "missing", "signals"]
+    assert uc == UCResult("PARTIEL", 3, 2, "B_Pres", ["a", "b"]) and uc != UCResult("PARTIEL", 3, 1)
+    try:
+        uc["absent"]
+        assert False, "clé inconnue acceptée"
+    except KeyError:
+        pass
+    verdict = RequirementVerdict("REQ_1", "SOC", "OK", "ok")
+    assert {k: verdict[k] for k in verdict.keys()} == verdict.to_dict() and verdict.get("signals_nok") == ""
+
+def test_mmap_matches_asammdf():
+    """Les vues mappées (conversion, plusieurs blocs DT, tranches, fenêtres) donnent les valeurs d'asammdf."""
+    print("\n=== Test lecture mappée MF4 ===")
+
+    import tempfile
+    import numpy as np
+    from asammdf import MDF, Signal
+    from eva_mmap import MdfMapper
+    with tempfile.TemporaryDirectory() as tmp:
+        t = np.arange(20000) * 0.01
+        log = Path(tmp) / "log.mf4"
+        source = MDF(version="4.10")
+        source.configure(write_fragment_size=64 * 1024)  # plusieurs blocs DT par groupe
+        source.append([Signal((np.arange(20000) % 1000).astype(np.int16), t, name="Brut",
+                              conversion={"a": 0.5, "b": -10.0}),
+                       Signal(np.sin(t), t, name="Reel")])
+        source.save(str(log), overwrite=True, compression=0)
+        source.close()
+
+        mdf = MDF(str(log))
+        try:
+            mapper = MdfMapper(log, mdf)
+            for name in ("Brut", "Reel"):
+                mapped, expected = mapper.channel(name), mdf.get(name)
+                assert mapped is not None and len(mapped.raw_blocks) > 1
+                assert np.array_equal(mapped.samples, expected.samples)
+                assert np.array_equal(mapped.timestamps, expected.timestamps)
+                chunks = list(mapped.iter_chunks(3000))
+                assert max(len(xc) for _, xc in chunks) <= 3000
+                assert np.array_equal(np.concatenate([tc for tc, _ in chunks]), expected.timestamps)
+                assert np.array_equal(np.concatenate([xc for _, xc in chunks]), expected.samples)
+                block_start = len(mapped.raw_blocks[0]) * 0.01
+                for t0, t1 in [(12.345, 15.0), (block_start - 0.5, block_start + 0.5), (block_start, block_start),
+                               (-5.0, 0.0), (-5.0, 1000.0), (199.99, 300.0), (250.0, 300.0), (10.0, 9.0)]:
+                    keep = (expected.timestamps >= t0) & (expected.timestamps <= t1)
+                    tw, xw = mapped.window(t0, t1)
+                    assert np.array_equal(tw, expected.timestamps[keep]), (name, t0, t1)
+                    assert np.array_equal(xw, expected.samples[keep]), (name, t0, t1)
+        finally:
+            mdf.close()
+
+def test_sweet_categorical_mapping():
+    """Mapping en catégories : mêmes statuts SWEET et mêmes filtres PVAL / MyF qu'en texte."""
+    print("\n=== Test mapping SWEET catégoriel ===")
+
+    import numpy as np
+    import pandas as pd
+    from eva_detecteur import _categorize_mapping, _codes_mask
+    text = pd.DataFrame({"Signal SWEET": ["S1", "S2", "S3", "S4", "S5"],
+                         "Signal MDF trouvé": [" A ", "B", np.nan, "", "C"],
+                         "CAN Fallback": ["X", np.nan, "Y", "Y", ""],
+                         "Exigence": ["R1", "R2", "R1", np.nan, "R3"],
+                         "MyF3": ["1", "0", "1", "1", np.nan]})
+    cat = _categorize_mapping(text.copy())
+    cat["CAN Fallback"] = cat["CAN Fallback"].cat.add_categories(["Inutilisée"])
+    assert isinstance(cat["Exigence"].dtype, pd.CategoricalDtype)
+
+    channels = {"A", "Y", ""}  # une cellule vide ne correspond jamais à un canal
+    expected = [SWEET_OK, SWEET_NOK, SWEET_FALLBACK, SWEET_FALLBACK, SWEET_NOK]
+    assert list(sweet_table(cat, channels).codes) == list(sweet_table(text, channels).codes) == expected
+    assert list(_codes_mask(cat["Exigence"], {"R2", "Inconnue"})) == [False, True, False, False, False]
+    assert not _codes_mask(cat["CAN Fallback"], {"Inutilisée"}).any()
+
+    for df in (text, cat):
+        pval = filter_mapping_by_pval(df.copy(), {"R1", "R3"})
+        assert list(pval["Signal SWEET"]) == ["S1", "S3", "S5"] and pval["_pval_present"].all()
+        assert list(filter_mapping_by_myf(df, "MyF3")["Signal SWEET"]) == ["S1", "S3", "S4"]
+        assert list(filter_mapping_by_myf(df, ["MyF3", "MyF9"])["Signal SWEET"]) == ["S1", "S3", "S4"]
+        assert filter_mapping_by_myf(df, "All MyF versions") is df and filter_mapping_by_myf(df, None) is df
+
+def test_pipeline_memoization():
+    """Chaque étape s'exécute une seule fois par run, les étapes indépendantes en parallèle."""
+    print("\n=== Test pipeline ===")
+    
+    import threading
+    from eva_pipeline import Pipeline, Stage
+    calls = []
+    barrier = threading.Barrier(2, timeout=5)
+    
+    def slow(name):
+        def fn(x):
+            calls.append(name)
+            barrier.wait()  # bloque si a et b ne tournent pas en même temps
+            return x + 1
+        return fn
+    
+    pipeline = Pipeline([Stage("a", slow("a"), ["x"]), Stage("b", slow("b"), ["x"]),
+                         Stage("c", lambda a, b: calls.append("c") or a + b, ["a", "b"])])
+    run = pipeline.run(x=1)
+    assert run.get("c") == 4
+    assert run.get("a", "c") == (2, 4)
+    assert sorted(calls) == ["a", "b", "c"]
+
+def test_stage_recorder_memory():
+    """Pic tracemalloc par étape en série ; laissé vide pour des étapes concurrentes (pic global au processus)."""
+    print("\n=== Test mesures par étape ===")
+    
+    import threading
+    from eva_perf import StageRecorder
+    
+    rec = StageRecorder(trace_memory=True)
+    try:
+        with rec.stage("serial"):
+            block = bytearray(4 * 1024**2)
+        inside, release = threading.Event(), threading.Event()
+        
+        def worker():
+            with rec.stage("worker"):
+                inside.set()
+                release.wait(5)
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        inside.wait(5)
+        with rec.stage("concurrent"):
+            release.set()
+            thread.join()
+    finally:
+        rec.close()
+    peaks = {r["name"]: r["tracemalloc_peak_bytes"] for r in rec.to_dict()}
+    assert peaks["serial"] >= len(block) and peaks["worker"] is None and peaks["concurrent"] is None
+
+def test_profile_outputs():
+    """Fichiers de profil lisibles (pstats, piles repliées) ; les étapes profilées tournent dans le thread suivi."""
+    print("\n=== Test profilage ===")
+
+    import pstats, re, tempfile, time
+    import numpy as np
+    import pandas as pd
+    from eva_perf import profile_run, profiling
+
+    def busy():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with profile_run(Path(tmp) / "cp", "cprofile", interval_s=0.001) as written:
+            assert profiling()
+            busy()
+        assert not profiling()
+        assert {k: p.name for k, p in written.items()} == {"folded": "cp.folded", "prof": "cp.prof", "summary": "cp.prof.txt"}
+        assert any(func == "busy" for _, _, func in pstats.Stats(str(written["prof"])).stats)
+        assert "busy" in written["summary"].read_text(encoding="utf-8")
+        lines = written["folded"].read_text(encoding="utf-8").splitlines()
+        assert lines and all(re.fullmatch(r"\S.* \d+", line) for line in lines)
+        busy_stacks = [line for line in lines if ":busy" in line]
+        assert busy_stacks and all(s.index("test_profile_outputs") < s.index(":busy") for s in busy_stacks)  # racine d'abord
+
+        with profile_run(Path(tmp) / "sp", "sample", interval_s=0.001) as written:
+            busy()
+        assert set(written) == {"folded"} and not (Path(tmp) / "sp.prof").exists()
+        try:
+            with profile_run(Path(tmp) / "x", "inconnu"):
+                pass
+            assert False, "mode inconnu accepté"
+        except ValueError:
+            pass
+
+        t = np.arange(0, 20, 0.01)
+        log = Path(tmp) / "log.csv"
+        pd.DataFrame({"Time": t, "SOC_BMS": 80 + np.sin(t), "SOC_Affiche": 81 + np.cos(t)}).to_csv(log, index=False)
+        results = analyser_et_generer_rapport(str(log), profile="sample", report_path=Path(tmp) / "r.html")
+        assert results["_profile"] == {"folded": str(Path(tmp) / "r.folded")}
+        stacks = Path(results["_profile"]["folded"]).read_text(encoding="utf-8")
+        assert "eva_detecteur.py:read_flux_mapping" in stacks  # étape exécutée dans le thread échantillonné
+
+        # Lot (eva_workers --profile) : profil pris dans le worker, à côté du rapport de chaque fichier
+        from eva_workers import WorkerPool
+        with WorkerPool(1, processes=False) as pool:
+            results = pool.submit(log, report_path=Path(tmp) / "lot" / "log.html", profile="cprofile").result(60)
+        assert set(results["_profile"]) == {"folded", "prof", "summary"}
+        assert all(Path(p).parent == Path(tmp) / "lot" and Path(p).exists() for p in results["_profile"].values())
+        assert "read_signal_data" in Path(results["_profile"]["summary"]).read_text(encoding="utf-8")
+
+def test_progress_cancel():
+    """L'avancement est réel et croissant ; une annulation interrompt le décodage fenêtré."""
+    print("\n=== Test avancement / annulation ===")
+    
+    import numpy as np
+    import pandas as pd
+    from eva_progress import AnalysisCancelled, CancelToken, Progress
+    t = np.arange(0, 300, 0.01)
+    test_csv = Path("test_data_progress.csv")
+    pd.DataFrame({"Time": t, "SOC_BMS": 80 + np.sin(t), "SOC_Affiche": 81 + np.cos(t)}).to_csv(test_csv, index=False)
+    
+    try:
+        seen = []
+        progress = Progress(lambda f, msg: seen.append(f))
+        verify_all_requirements(test_csv, chunked=True, window_s=7.0, progress=progress.stage("requirements"))
+        assert len(seen) > 2 and seen == sorted(seen) and seen[-1] == 1.0
+        
+        token = CancelToken()
+        calls = []
+        progress = Progress(lambda f, msg: calls.append(f) or token.cancel(), token)
+        try:
+            verify_all_requirements(test_csv, chunked=True, window_s=7.0, progress=progress.stage("requirements"))
+        except AnalysisCancelled:
+            pass
+        else:
+            raise AssertionError("l'annulation n'a pas interrompu l'analyse")
+        assert len(calls) == 1  # arrêt dès la première fenêtre
+    finally:
+        if test_csv.exists():
+            test_csv.unlink()
+
+def test_job_executor_dedup():
+    """Une requête identique en cours est rattachée au travail existant ; le résultat est partagé."""
+    print("\n=== Test file de travaux ===")
+    
+    import threading
+    from concurrent.futures import Future
+    from eva_jobs import JobExecutor, job_key
+    release, notified = threading.Event(), threading.Event()
+    calls, done = [], []
+    
+    def on_done(result):
+        done.append(result)
+        if len(done) == 2:
+            notified.set()
+    
+    def work(x):
+        calls.append(x)
+        release.wait(5)
+        return x * 2
+    
+    jobs = JobExecutor()
+    key = job_key("analysis", __file__, mode="sweet400")
+    assert key == job_key("analysis", __file__, mode="sweet400")
+    assert key != job_key("analysis", __file__, mode="sweet500")
+    first = jobs.submit(key, work, 21, on_done=on_done)
+    second = jobs.submit(key, work, 21, on_done=on_done)
+    assert first is second and jobs.running(key)
+    release.set()
+    assert notified.wait(5) and not jobs.running(key)
+    third = jobs.submit(key, work, 21, reuse=True, on_done=on_done)
+    assert third.result(5) == 42 and jobs.result(key) == 42
+    assert calls == [21] and done == [42, 42, 42]
+    jobs.shutdown(wait=True)
+    
+    # Travail déjà terminé au moment de l'enregistrement des rappels : pas d'interblocage
+    class InlinePool:
+        def submit(self, fn, *args, **kwargs):
+            future = Future()
+            future.set_result(fn(*args, **kwargs))
+            return future
+    
+    jobs = JobExecutor()
+    jobs._pool = InlinePool()
+    submitter = threading.Thread(target=lambda: jobs.submit(key, lambda: 7), daemon=True)
+    submitter.start()
+    submitter.join(5)
+    assert not submitter.is_alive() and jobs.result(key) == 7 and not jobs.running(key)
+
+def test_table_model():
+    """Filtre par statut et tri se font sur les colonnes ; seules les lignes demandées sont converties."""
+    print("\n=== Test tableau virtualisé ===")
+    
+    import numpy as np
+    import pandas as pd
+    from eva_records import SweetTable
+    from eva_table import TableModel
+    n = 100_000
+    mapping = pd.DataFrame({"Signal": [f"S{i:06d}" for i in range(n)][::-1], "Valeur": np.arange(n)})
+    df = SweetTable(mapping, (np.arange(n) % 3).astype(np.int8)).to_frame()
+    
+    model = TableModel(df, status_column="Statut")
+    assert len(model) == n and model.counts() == {"OK": 33334, "Fallback": 33333, "NOK": 33333}
+    model.filter_status(["NOK"])
+    assert len(model) == 33333 and all(r[-1] == "NOK" for r in model.rows(0, 50))
+    model.sort("Signal")
+    first, second = model.rows(0, 2)
+    assert first[0] < second[0]
+    model.sort("Signal")  # 2e clic : ordre décroissant
+    first, second = model.rows(0, 2)
+    assert first[0] > second[0]
+    model.filter_status(None)
+    assert len(model) == n and model.rows(n - 1, n + 5)[0][0] == "S000000"
+
+def test_gui_startup_is_lazy():
+    """Importer une interface ne charge ni pandas ni asammdf ni le cœur d'analyse."""
+    print("\n=== Test démarrage des interfaces ===")
+    
+    from eva_startup_bench import bench_startup, check_budget
+    rows = bench_startup(["eva_professional_fixed"], repeat=1, paint=False)
+    print(rows)
+    assert rows[0]["heavy"] == []
+    assert not [f for f in check_budget(rows) if "lourds" in f]
+
+def test_prewarm_reuse():
+    """Le préchauffage est repris par l'analyse ; changer d'option ne refait que les étapes touchées."""
+    print("\n=== Test préchauffage ===")
+    
+    from eva_pipeline import Pipeline, Stage
+    from eva_prewarm import Prewarmer
+    calls = []
+    
+    def stage(name):
+        def fn(*args):
+            calls.append(name)
+            return (name,) + args
+        return fn
+    
+    pipeline = Pipeline([
+        Stage("channels", stage("channels"), ["mdf_path"]),
+        Stage("mapping", stage("mapping"), ["mode"]),
+        Stage("sweet", stage("sweet"), ["mapping", "channels"]),
+    ])
+    assert pipeline.affected(["mode"]) == {"mapping", "sweet"}
+    prewarmer = Prewarmer(lambda path, progress=None, **params: pipeline.run(mdf_path=path, progress=progress, **params),
+                          ("sweet",))
+    prewarmer.start(__file__, mode="sweet400")
+    prewarmer.start(__file__, mode="sweet400")  # déjà en cours : rien de relancé
+    run = prewarmer.take(__file__, mode="sweet400")
+    assert run.get("sweet")[0] == "sweet" and sorted(calls) == ["channels", "mapping", "sweet"]
+    assert prewarmer.take(__file__, mode="sweet400") is None  # remis une seule fois
+    
+    calls.clear()
+    prewarmer.start(__file__, mode="sweet400")
+    first = prewarmer.take(__file__, mode="sweet400")
+    first.get("sweet")
+    derived = first.derive(mode="sweet500")
+    assert derived.get("mapping") == ("mapping", "sweet500")
+    assert "channels" in derived._results and calls.count("channels") == 1
+    assert prewarmer.take(__file__, mode="sweet500") is None
+    
+    # Option changée pendant qu'une étape non touchée est encore en cours : elle est attendue, pas refaite
+    import threading
+    started, release = threading.Event(), threading.Event()
+    
+    def slow_channels(path):
+        calls.append("channels")
+        started.set()
+        release.wait(5)
+        return ("channels", path)
+    
+    pipeline.stages["channels"] = Stage("channels", slow_channels, ["mdf_path"])
+    calls.clear()
+    prewarmer.start(__file__, mode="sweet400")
+    assert started.wait(5)
+    prewarmer.start(__file__, mode="sweet500")
+    release.set()
+    run = prewarmer.take(__file__, mode="sweet500")
+    assert run.get("sweet")[1] == ("mapping", "sweet500") and calls.count("channels") == 1, calls
+
+def test_warm_worker_pool():
+    """Les workers chauds fournissent la configuration compilée : aucun classeur n'est relu par fichier."""
+    print("\n=== Test pool de workers chauds ===")
+    
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from eva_workers import CONFIG_STAGES, WARM, AnalysisFailed, WorkerPool
+    t = np.arange(0, 20, 0.01)
+    test_csv = Path("test_data_workers.csv")
+    pd.DataFrame({"Time": t, "SOC_BMS": 80 + np.sin(t), "SOC_Affiche": 81 + np.cos(t)}).to_csv(test_csv, index=False)
+    
+    try:
+        events = []
+        with tempfile.TemporaryDirectory() as out, WorkerPool(1, processes=False,
+                                                             on_progress=lambda *e: events.append(e)) as pool:
+            for i in range(2):
+                results = pool.submit(test_csv, job_id=i, report_path=Path(out) / f"{i}.html").result(60)
+                executed = {stage["name"] for stage in results["_perf"]}
+                assert "_requirements" in results and not executed & set(CONFIG_STAGES + ("flux_mapping",)), executed
+            # Résultat d'erreur de l'analyse (rapport impossible à écrire) : échec, pas un succès
+            failed = pool.submit(test_csv, job_id=2, report_path=Path(out) / "absent" / "r.html")
+            assert isinstance(failed.exception(60), AnalysisFailed)
+        compiled = WARM.compile(*(CONFIG[p] for p in ("labels_xlsx", "flux_xlsx", "pval_xlsm")))
+        assert ("flux_mapping", "sweet400") in compiled and ("flux_mapping", "sweet500") in compiled
+        assert {0, 1} <= {e[0] for e in events}
+    finally:
+        if test_csv.exists():
+            test_csv.unlink()
+
+def test_session_stitching():
+    """Roulage en deux segments : intervalle UC et statistiques continus à la coupure."""
+    print("\n=== Test session multi-segments ===")
+    
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from eva_chunks import detect_uc_intervals, scan_signals
+    from eva_session import Session
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        t = np.arange(0, 10, 0.01)  # chaque segment repart de 0 (pas d'en-tête horaire en CSV)
+        paths = []
+        for i, flag in enumerate([t >= 8, t < 2]):
+            path = Path(tmp) / f"drive_{i}.csv"
+            pd.DataFrame({"Time": t, "SOC_BMS": 80.0 + i, "B_Pres_Sig_UC_X": flag.astype(int)}).to_csv(path, index=False)
+            paths.append(path)
+        session = Session(paths)
+        
+        intervals = detect_uc_intervals(session, {"UC X": [("SOC_BMS", "B_Pres_Sig_UC_X")]}, window_s=3.0)
+        assert len(intervals) == 1, intervals  # une seule occurrence, à cheval sur la coupure
+        assert np.isclose(intervals.TSTART[0], 8.0) and np.isclose(intervals.TEND[0], 11.99)
+        assert session.offsets[1] is not None and np.isclose(session.offsets[1], 10.0)
+        
+        stats, _ = scan_signals(session, ["SOC_BMS"], window_s=3.0)
+        assert stats["SOC_BMS"].count == 2 * len(t) and np.isclose(stats["SOC_BMS"].mean, 80.5)
+        assert "B_Pres_Sig_UC_X" in session.channels()
+
+def test_results_store_and_watch():
+    """Magasin de résultats (remplacement, relecture) et dossier surveillé incrémental."""
+    print("\n=== Test magasin de résultats / dossier surveillé ===")
+    
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from eva_records import SweetTable, UCResult
+    from eva_store import ResultsStore
+    from eva_watch import FolderWatcher
+    from eva_workers import WorkerPool
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        logs = tmp / "logs"
+        logs.mkdir()
+        t = np.arange(0, 20, 0.01)
+        log = logs / "VF1TEST0000000001_SW42_run.csv"
+        pd.DataFrame({"Time": t, "SOC_BMS": 80 + np.sin(t), "SOC_Affiche": 81 + np.cos(t)}).to_csv(log, index=False)
+        
+        store = ResultsStore(tmp / "results.sqlite")
+        sweet = SweetTable(pd.DataFrame({"Signal SWEET": ["A", "B", "C"]}), np.array([0, 2, 1]))
+        requirements = pd.DataFrame({"Exigence": ["R1", "R2"], "Status": ["OK", "NOK"], "Message": ["", "x"]})
+        results = {"UC 1": UCResult("detected", 3, 3), "_tables": {"requirements": requirements, "sweet": sweet}}
+        store.record(log, results, "cfg", vin="V1")
+        second = store.record(log, results, "cfg", vin="V1")  # même fichier, même config : remplacé
+        assert store.lookup(log, "cfg") == second and store.lookup(log, "autre") is None
+        assert len(store.frame("analyses")) == 1
+        detail = store.results(second)
+        assert detail["sweet"]["signal"].tolist() == ["A", "B", "C"] and detail["sweet"]["status"].tolist() == [0, 2, 1]
+        assert detail["requirements"]["status"].tolist() == ["OK", "NOK"] and detail["uc"]["uc"].tolist() == ["UC 1"]
+        
+        with WorkerPool(1, processes=False) as pool:
+            watcher = FolderWatcher(logs, tmp / "out", store, pool, settle_s=0, poll_s=0.05, use_inotify=False,
+                                    name_pattern=r"(?P<vin>[A-Z0-9]{17})_(?P<swid>[^_]+)")
+            assert watcher.drain()["analyzed"] == 1
+            assert watcher.drain()["analyzed"] == 1  # déjà dans le magasin : pas réanalysé
+        analyses = store.frame("analyses", "WHERE config_hash != 'cfg'")
+        assert analyses[["vin", "swid", "status"]].values.tolist() == [["VF1TEST0000000001", "SW42", "ok"]]
+        assert (tmp / "out" / "VF1TEST0000000001_SW42_run.html").exists()
+        store.close()
+
+def test_fleet_aggregation():
+    """Agrégats de flotte depuis le magasin : taux par SWID, carte SWEET, comptage UC."""
+    print("\n=== Test rapport de flotte ===")
+    
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from eva_fleet import Fleet, render_fleet
+    from eva_records import SweetTable, UCResult
+    from eva_store import ResultsStore
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        store = ResultsStore(tmp / "results.sqlite")
+        runs = [("V1", "SW1", ["OK", "NOK"], ["A", "B"], [0, 2]),
+                ("V1", "SW2", ["OK", "OK"], ["A", "B"], [1, 0]),
+                ("V2", "SW2", ["NOK", "OK"], ["A", "C"], [2, 0])]  # autre mapping : B absent, C en plus
+        for i, (vin, swid, statuses, signals, codes) in enumerate(runs):
+            log = tmp / f"log{i}.csv"
+            log.write_text("Time\n0\n")
+            results = {"UC 1": UCResult("detected" if i else "not_detected", 1, i and 1),
+                       "_tables": {"requirements": pd.DataFrame({"Exigence": ["R1", "R2"], "Status": statuses,
+                                                                 "Message": ""}),
+                                   "sweet": SweetTable(pd.DataFrame({"Signal SWEET": signals}), np.array(codes))}}
+            store.record(log, results, "cfg", vin=vin, swid=swid)
+        
+        fleet = Fleet.load(store)
+        rates = fleet.requirement_rates(["swid"]).set_index(["swid", "requirement"])["rate"]
+        assert rates[("SW1", "R2")] == 0 and rates[("SW2", "R1")] == 0.5 and rates[("SW2", "R2")] == 1
+        heat = fleet.sweet_availability("vin")
+        assert heat.loc["A", "V1"] == 1 and heat.loc["B", "V1"] == 0.5 and np.isnan(heat.loc["B", "V2"])
+        assert heat.loc["C", "V2"] == 1
+        uc = fleet.uc_counts(["swid"]).set_index("swid")
+        assert uc.loc["SW1", "detected"] == 0 and uc.loc["SW2", "detected"] == 2
+        assert len(Fleet.load(store, swid="SW2")) == 2
+        assert "Rapport de flotte" in render_fleet(tmp / "flotte.html", fleet).read_text(encoding="utf-8")
+        store.close()
+
+def test_run_diff():
+    """Diff de deux analyses en cache : SWEET, exigences, UC, statistiques hors tolérance."""
+    print("\n=== Test diff run à run ===")
+    
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from eva_diff import Snapshot, diff_runs, load_snapshot
+    from eva_records import SweetTable, UCResult
+    from eva_store import ResultsStore
+    
+    def results(statuses, ucs, signals, codes, mean):
+        return {**{uc: UCResult(status, 1, 1) for uc, status in ucs.items()},
+                "_tables": {"requirements": pd.DataFrame({"Exigence": ["R1", "R2"], "Status": statuses, "Message": ""}),
+                            "sweet": SweetTable(pd.DataFrame({"Signal SWEET": signals}), np.array(codes)),
+                            "stats": pd.DataFrame({"Signal": ["SOC_BMS"], "Count": [100], "Mean": [mean], "Std": [1.0],
+                                                   "Min": [70.0], "Max": [90.0]})}}
+    
+    old = results(["OK", "OK"], {"UC 1": "detected", "UC 2": "not_detected"}, ["A", "B", "C", "C"], [0, 0, 2, 0], 80.0)
+    new = results(["OK", "NOK"], {"UC 1": "not_detected", "UC 2": "detected"}, ["A", "B", "D"], [1, 0, 0], 80.2)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(Path(tmp) / "results.sqlite")
+        ids = []
+        for i, (res, swid) in enumerate([(old, "SW1"), (new, "SW2")]):
+            log = Path(tmp) / f"log{i}.csv"
+            log.write_text("Time\n0\n")
+            ids.append(store.record(log, res, "cfg", vin="V1", swid=swid))
+        assert store.previous_swid(ids[1]) == ids[0] and store.latest(Path(tmp) / "log1.csv") == ids[1]
+        
+        diff = diff_runs(load_snapshot(ids[0], store), load_snapshot(str(Path(tmp) / "log1.csv"), store))
+        sweet = diff.sweet.set_index("signal")
+        assert sweet["change"].to_dict() == {"A": "dégradé", "C": "retiré", "D": "ajouté"}  # C : meilleur statut (OK)
+        assert diff.requirements.values.tolist() == [["R2", "OK", "NOK"]]
+        assert diff.uc_appeared == ["UC 2"] and diff.uc_disappeared == ["UC 1"]
+        assert diff.stats.empty  # 0,2 % de la moyenne : sous la tolérance
+        assert diff_runs(Snapshot.from_results(old), Snapshot.from_results(new), tolerance=0.001).stats["stat"].tolist() == ["Mean"]
+        assert not diff_runs(Snapshot.from_results(new), load_snapshot(ids[1], store))
+        store.close()
+
+def test_export_tables():
+    """Export de toutes les tables (résultat en mémoire et magasin) en NDJSON, XLSX et CSV."""
+    print("\n=== Test export ===")
+    
+    import json, tempfile
+    import numpy as np
+    import pandas as pd
+    from openpyxl import load_workbook
+    from eva_export import export_results, export_tables, store_tables
+    from eva_records import SweetTable, UCResult
+    from eva_store import ResultsStore
+    
+    violations = pd.DataFrame({"Exigence": ["R1"], "Signaux": ["SOC_BMS"], "TSTART": [30.0], "TEND": [40.0], "Duration": [10.0]})
+    results = {"UC 1": UCResult("detected", 2, 2),
+               "_tables": {"uc": pd.DataFrame({"UC": ["UC 1"], "Status": ["detected"]}),
+                           "sweet": SweetTable(pd.DataFrame({"Signal SWEET": ["A", "B"]}), np.array([0, 2])),
+                           "requirements": pd.DataFrame({"Exigence": ["R1"], "Status": ["NOK"], "Message": [""]}),
+                           "violations": violations}}
+    with tempfile.TemporaryDirectory() as tmp:
+        lines = [json.loads(l) for l in export_results(results, Path(tmp) / "r.ndjson")[0].read_text().splitlines()]
+        assert [l["table"] for l in lines] == ["uc", "sweet", "sweet", "requirements", "violations"]
+        assert lines[2]["Statut"] == "NOK" and lines[4]["TSTART"] == 30.0
+        workbook = load_workbook(export_results(results, Path(tmp) / "r.xlsx")[0], read_only=True)
+        assert workbook.sheetnames == ["uc", "sweet", "requirements", "violations"]
+        
+        log = Path(tmp) / "log.csv"
+        log.write_text("Time\n0\n")
+        store = ResultsStore(Path(tmp) / "results.sqlite")
+        store.record(log, results, "cfg")
+        written = export_tables(store_tables(store, batch_rows=1), Path(tmp) / "flotte.csv")
+        assert {p.name for p in written} >= {"flotte.sweet.csv", "flotte.violations.csv"}
+        sweet = pd.read_csv(Path(tmp) / "flotte.sweet.csv")
+        assert sweet[["signal", "Statut"]].values.tolist() == [["A", "OK"], ["B", "NOK"]]
+        assert pd.read_csv(Path(tmp) / "flotte.violations.csv")[["tstart", "tend"]].values.tolist() == [[30.0, 40.0]]
+        store.close()
+
+def test_violation_extract():
+    """Fenêtres de violation élargies et fusionnées, extraites en MF4 (signaux de l'exigence seulement)."""
+    print("\n=== Test extraction des violations ===")
+    
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from asammdf import MDF, Signal
+    from eva_extract import extract_windows, violation_windows
+    
+    violations = pd.DataFrame({"Exigence": ["R1", "R1", "R2"], "Signaux": ["SOC_BMS, Absent"] * 2 + ["Other"],
+                               "TSTART": [30.0, 36.0, 90.0], "TEND": [34.0, 40.0, 95.0]})
+    windows = violation_windows(violations, padding_s=2.0, requirements=["R1"])
+    assert windows == [("R1", ["SOC_BMS", "Absent"], 28.0, 42.0)]  # recouvrement après élargissement : fusion
+    with tempfile.TemporaryDirectory() as tmp:
+        t = np.arange(0, 120, 0.01)
+        log = Path(tmp) / "log.mf4"
+        source = MDF(version="4.10")
+        source.append([Signal(t % 50, t, name="SOC_BMS"), Signal(-t, t, name="Other")])
+        source.save(str(log), overwrite=True)
+        source.close()
+        
+        written = extract_windows(log, windows, Path(tmp) / "extraits")
+        assert [p.name for p in written] == ["log_R1_28.0s.mf4"]
+        extract = MDF(str(written[0]))
+        try:
+            assert "Other" not in extract.channels_db
+            signal = extract.get("SOC_BMS")
+            assert np.isclose(signal.timestamps[0], 28.0) and np.isclose(signal.timestamps[-1], 42.0)
+            assert np.allclose(signal.samples, signal.timestamps % 50)
+        finally:
+            extract.close()
+
+def test_analysis_service():
+    """Service HTTP local : soumission, suivi, résultats JSON / rapport HTML, requête répétée servie du cache."""
+    print("\n=== Test service d'analyse ===")
+    
+    import asyncio, json, sys, tempfile, urllib.error, urllib.request
+    import numpy as np
+    import pandas as pd
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from eva_service import AnalysisService
+    t = np.arange(0, 20, 0.01)
+    test_csv = Path("test_data_service.csv")
+    pd.DataFrame({"Time": t, "SOC_BMS": 80 + np.sin(t), "SOC_Affiche": 81 + np.cos(t)}).to_csv(test_csv, index=False)
+    
+    def call(port, method, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as r:
+                return r.status, r.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+    
+    async def scenario(out):
+        service = AnalysisService(out, workers=1, processes=False)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        http = lambda *a: asyncio.get_running_loop().run_in_executor(None, call, port, *a)
+        try:
+            status, body = await http("POST", "/jobs", {"path": str(test_csv)})
+            job = json.loads(body)
+            assert status == 202 and not job["cached"]
+            while job["status"] not in ("done", "error"):
+                await asyncio.sleep(0.05)
+                job = json.loads((await http("GET", f"/jobs/{job['id']}"))[1])
+            assert job["status"] == "done" and job["progress"] == 1.0, job
+            status, body = await http("GET", f"/jobs/{job['id']}/result")
+            assert status == 200 and "_requirements" in json.loads(body)
+            status, body = await http("GET", f"/jobs/{job['id']}/report")
+            assert status == 200 and body.lstrip().lower().startswith(b"<!doctype html")
+            status, body = await http("POST", "/jobs", {"path": str(test_csv)})
+            assert status == 200 and json.loads(body)["cached"] and json.loads(body)["id"] == job["id"]
+            assert (await http("POST", "/jobs", {"path": str(test_csv), "options": {"bogus": 1}}))[0] == 400
+            assert (await http("GET", "/jobs/0123"))[0] == 404
+            status, body = await http("GET", f"/diff/{job['id']}/{job['id']}")
+            assert status == 200 and json.loads(body)["sweet"] == [] and json.loads(body)["requirements"] == []
+            service.jobs.clear()  # job sorti de la mémoire (keep) : servi depuis le disque
+            status, body = await http("GET", f"/jobs/{job['id']}")
+            assert status == 200 and json.loads(body)["status"] == "done" and json.loads(body)["engine"] == "detector"
+            status, body = await http("GET", f"/jobs/{job['id']}/result")
+            assert status == 200 and "_requirements" in json.loads(body)
+            assert (await http("GET", f"/jobs/{job['id']}/report"))[0] == 200
+        finally:
+            server.close()
+            service.close()
+    
+    try:
+        with tempfile.TemporaryDirectory() as out:
+            asyncio.run(scenario(Path(out)))
+    finally:
+        if test_csv.exists():
+            test_csv.unlink()
+
 if __name__ == "__main__":
     print("🔬 Test du système EVA")
     print("=" * 50)
@@ -104,6 +986,31 @@ if __name__ == "__main__":
     test_with_sample_data()
     test_mdf_files()
     test_requirements_verification()
+    test_chunked_requirements()
+    test_csv_single_read()
+    test_bench_regression_gate()
+    test_bench_log_generator()
+    test_channel_index_cache()
+    test_config_workbooks()
+    test_result_records()
+    test_mmap_matches_asammdf()
+    test_sweet_categorical_mapping()
+    test_pipeline_memoization()
+    test_stage_recorder_memory()
+    test_profile_outputs()
+    test_progress_cancel()
+    test_job_executor_dedup()
+    test_table_model()
+    test_gui_startup_is_lazy()
+    test_prewarm_reuse()
+    test_warm_worker_pool()
+    test_session_stitching()
+    test_results_store_and_watch()
+    test_fleet_aggregation()
+    test_run_diff()
+    test_export_tables()
+    test_violation_extract()
+    test_analysis_service()
     
     print("\n" + "=" * 50)
     print("🎯 Tests terminés!")
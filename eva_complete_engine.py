@@ -9,40 +9,36 @@ import numpy as np
 from pathlib import Path
 import sys
 from typing import Dict, List, Optional, Any, Tuple
+import contextlib
 import datetime
 
-# Add Gmail directory to path
-sys.path.append('Gmail')
+# Analysis core (Gmail/), whatever the working directory
+sys.path.append(str(Path(__file__).resolve().parent / 'Gmail'))
 
-try:
-    from eva_detecteur import (
-        analyser_et_generer_rapport,
-        verifier_presence_mapping_0p01s,
-        CONFIG,
-        read_feuil3,
-        uc_signals_from_feuil3,
-        detect_from_presence,
-        read_flux_mapping,
-        read_pval_requirements,
-        filter_mapping_by_pval,
-        compute_sweet_status
-    )
-except ImportError:
-    # Fallback functions if modules not found
-    def read_feuil3(*args, **kwargs):
-        return pd.DataFrame()
-    def uc_signals_from_feuil3(*args, **kwargs):
-        return {}
-    def detect_from_presence(*args, **kwargs):
-        return pd.DataFrame()
-    def read_flux_mapping(*args, **kwargs):
-        return pd.DataFrame()
-    def read_pval_requirements(*args, **kwargs):
-        return set()
-    def filter_mapping_by_pval(*args, **kwargs):
-        return pd.DataFrame()
-    def compute_sweet_status(*args, **kwargs):
-        return pd.DataFrame()
+from eva_detecteur import (
+    analyser_et_generer_rapport,
+    verifier_presence_mapping_0p01s,
+    CONFIG,
+    read_feuil3,
+    uc_signals_from_feuil3,
+    detect_from_presence,
+    read_flux_mapping,
+    read_pval_requirements,
+    filter_mapping_by_myf,
+    filter_mapping_by_pval,
+    compute_sweet_status,
+    list_mdf_channels,
+    make_progress,
+    pipeline_run,
+    sweet_table
+)
+from eva_records import RequirementVerdict, UCResult
+from eva_perf import StageRecorder
+
+# Engine stages, in order (also the units of progress reporting)
+ENGINE_STAGES = ("load_excel_data", "mdf_channels", "use_cases", "sweet_compliance", "requirements", "timing")
+# Pipeline outputs the engine reads; they are computed ahead of time once a file is picked
+PREWARM_TARGETS = ("channels", "uc_map", "flux_mapping", "pval_requirements", "sweet")
 
 class EVACompleteEngine:
     """Complete EVA analysis engine with Excel integration"""
@@ -58,29 +54,41 @@ class EVACompleteEngine:
         self.pval_requirements = None
         self.uc_mappings = {}
         
-    def load_excel_data(self, sweet_version: str = "sweet400"):
-        """Load all required Excel data"""
+    def load_excel_data(self, sweet_version: str = "sweet400", run=None):
+        """Load all required Excel data
+        
+        The workbooks are read through the shared analysis pipeline, in parallel
+        with each other and with the MDF channel index when the run has one.
+        """
         try:
+            if run is None:
+                run = self._pipeline_run(None, sweet_version)
+            sources = {"uc_map": self.labels_file, "flux_mapping": self.flux_file, "pval_requirements": self.pval_file}
+            wanted = [name for name, path in sources.items() if path.exists()]
+            if wanted and run.params.get("mdf_path") is not None:
+                wanted.append("channels")
+            loaded = run.results(*wanted) if wanted else {}
+            
             # Load Feuil3 data
-            if self.labels_file.exists():
-                self.feuil3_data = read_feuil3(self.labels_file)
-                self.uc_mappings = uc_signals_from_feuil3(self.feuil3_data)
+            if "uc_map" in loaded:
+                self.uc_mappings = loaded["uc_map"]
+                self.feuil3_data = run.get("feuil3")
                 print(f"✅ Loaded Feuil3 data: {len(self.uc_mappings)} UC mappings")
             else:
                 print("⚠️ Labels file not found, using default mappings")
                 self.uc_mappings = self._create_default_uc_mappings()
             
             # Load flux mapping
-            if self.flux_file.exists():
-                self.flux_mapping = read_flux_mapping(self.flux_file, sweet_version)
+            if "flux_mapping" in loaded:
+                self.flux_mapping = loaded["flux_mapping"]
                 print(f"✅ Loaded flux mapping: {len(self.flux_mapping)} signals")
             else:
                 print("⚠️ Flux file not found, using default mapping")
                 self.flux_mapping = self._create_default_flux_mapping()
             
             # Load PVAL requirements
-            if self.pval_file.exists():
-                self.pval_requirements = read_pval_requirements(self.pval_file)
+            if "pval_requirements" in loaded:
+                self.pval_requirements = loaded["pval_requirements"]
                 print(f"✅ Loaded PVAL requirements: {len(self.pval_requirements)} requirements")
             else:
                 print("⚠️ PVAL file not found, using default requirements")
@@ -89,6 +97,25 @@ class EVACompleteEngine:
         except Exception as e:
             print(f"❌ Error loading Excel data: {e}")
             self._create_default_data()
+        
+        if run is not None:
+            # Defaults stand in for missing workbooks in the rest of the run
+            run.provide("uc_map", self.uc_mappings)
+            run.provide("flux_mapping", self.flux_mapping)
+            run.provide("pval_requirements", self.pval_requirements)
+    
+    def _pipeline_run(self, mdf_path: Optional[str], sweet_version: str = "sweet400",
+                      myf_versions: Optional[List[str]] = None, recorder=None, progress=None):
+        """Shared pipeline run configured with this engine's workbooks"""
+        return pipeline_run(mdf_path, recorder, labels_xlsx=self.labels_file, flux_xlsx=self.flux_file,
+                            pval_xlsm=self.pval_file, mode=sweet_version, myf=myf_versions, progress=progress)
+    
+    def prepare_run(self, mdf_path: str, progress=None, mode: str = "sweet400", myf: Optional[List[str]] = None):
+        """Pipeline run for a later analyze_mdf_file(run=...), e.g. to pre-warm it in the background
+        
+        Keyword names are the pipeline parameters, so the run can be derived for new options.
+        """
+        return self._pipeline_run(mdf_path, mode, myf, progress=progress)
     
     def _create_default_uc_mappings(self) -> Dict:
         """Create default UC mappings"""
@@ -143,26 +170,60 @@ class EVACompleteEngine:
         self.pval_requirements = self._create_default_pval_requirements()
     
     def analyze_mdf_file(self, mdf_path: str, sweet_version: str = "sweet400", 
-                        myf_versions: List[str] = None) -> Dict[str, Any]:
-        """Complete MDF file analysis"""
-        
-        # Load Excel data
-        self.load_excel_data(sweet_version)
-        
-        # Get MDF channels
-        mdf_channels = self._get_mdf_channels(mdf_path)
-        
-        # Analyze use cases
-        uc_results = self._analyze_use_cases(mdf_channels)
-        
-        # Analyze SWEET compliance
-        sweet_results = self._analyze_sweet_compliance(mdf_channels, sweet_version, myf_versions)
-        
-        # Analyze requirements
-        requirements_results = self._analyze_requirements(mdf_channels)
+                        myf_versions: List[str] = None, trace_memory: bool = False,
+                        trace_path: Optional[str] = None, progress=None, cancel=None, run=None) -> Dict[str, Any]:
+        """Complete MDF file analysis
+        
+        Every stage is timed; the measurements are returned under "performance"
+        and, if trace_path is given, written as a Chrome trace JSON file.
+        progress(fraction, message) is called from the calling thread and the
+        pipeline workers; cancel (a CancelToken) stops the analysis between
+        stages by raising AnalysisCancelled.
+        run is a pipeline run already started for this file and these options
+        (see prepare_run and eva_prewarm): the analysis joins it instead of
+        starting from scratch.
+        """
+        recorder = StageRecorder(trace_memory=trace_memory)
+        tracker = make_progress(progress, cancel)
+        if run is not None:
+            run.attach(tracker, recorder)
+            if trace_memory:
+                run.max_workers = 1  # per-stage memory peaks need serial stages
+        else:
+            run = self._pipeline_run(mdf_path, sweet_version, myf_versions, recorder, tracker)
+        if tracker is not None:
+            tracker.plan((*run.pending(*PREWARM_TARGETS), *ENGINE_STAGES))
+        try:
+            # Load Excel data (the MDF channel index is built concurrently)
+            with self._stage(recorder, tracker, "load_excel_data", sweet_version=sweet_version):
+                self.load_excel_data(sweet_version, run)
+            
+            # Get MDF channels
+            with self._stage(recorder, tracker, "mdf_channels", file=Path(mdf_path).name):
+                mdf_channels = run.get("channels")
+            
+            # Analyze use cases
+            with self._stage(recorder, tracker, "use_cases"):
+                uc_results = self._analyze_use_cases(mdf_channels)
+            
+            # Analyze SWEET compliance
+            with self._stage(recorder, tracker, "sweet_compliance"):
+                sweet_results = self._analyze_sweet_compliance(mdf_channels, sweet_version, myf_versions, run)
+            
+            # Analyze requirements
+            with self._stage(recorder, tracker, "requirements"):
+                requirements_results = self._analyze_requirements(mdf_channels)
+            
+            # Generate timing data
+            with self._stage(recorder, tracker, "timing"):
+                timing_data = self._generate_timing_data(uc_results)
+        finally:
+            recorder.close()
+        if tracker is not None:
+            tracker.finish("Analysis complete")
         
-        # Generate timing data
-        timing_data = self._generate_timing_data(uc_results)
+        if trace_path:
+            recorder.write_chrome_trace(Path(trace_path))
         
         return {
             "use_cases": uc_results,
@@ -170,33 +231,19 @@ class EVACompleteEngine:
             "requirements": requirements_results,
             "timing": timing_data,
             "channels": list(mdf_channels),
-            "analysis_time": datetime.datetime.now().isoformat()
+            "analysis_time": datetime.datetime.now().isoformat(),
+            "performance": recorder.to_dict()
         }
     
-    def _get_mdf_channels(self, mdf_path: str) -> set:
-        """Get available channels from MDF file"""
-        try:
-            # This would use asammdf to read the actual MDF file
-            # For now, return a set of common signal names
-            return {
-                "BCM_WakeupSleepCommand",
-                "PowerRelayState_BLMS", 
-                "BMS_HVNetworkVoltage_BLMS",
-                "BMS_HVNetworkVoltage_v2",
-                "ME_InverterHVNetworkVoltage_BLMS",
-                "TractionCommand",
-                "MotorSpeed",
-                "BatteryCurrent",
-                "StopCommand",
-                "SleepCommand",
-                "SOC_BMS",
-                "SOC_Affiche",
-                "Temperature_Battery",
-                "Battery_Voltage"
-            }
-        except Exception as e:
-            print(f"Error reading MDF channels: {e}")
-            return set()
+    @contextlib.contextmanager
+    def _stage(self, recorder, tracker, name: str, **args):
+        """Timed engine stage, reported to the progress tracker once done"""
+        if tracker is not None:
+            tracker.check()
+        with recorder.stage(name, **args):
+            yield
+        if tracker is not None:
+            tracker.stage(name).done()
     
     def _analyze_use_cases(self, channels: set) -> Dict[str, Dict]:
         """Analyze use case detection"""
@@ -235,41 +282,26 @@ class EVACompleteEngine:
             else:
                 status = "not_detected"
             
-            results[uc_name] = {
-                "status": status,
-                "required": len(required_signals),
-                "present": len(present_signals),
-                "missing": ", ".join(missing_signals),
-                "signals": signal_list
-            }
+            results[uc_name] = UCResult(status, len(required_signals), len(present_signals),
+                                        ", ".join(missing_signals), signal_list)
         
         return results
     
     def _analyze_sweet_compliance(self, channels: set, sweet_version: str, 
-                                myf_versions: List[str]) -> Dict[str, Any]:
+                                myf_versions: List[str], run=None) -> Dict[str, Any]:
         """Analyze SWEET compliance"""
         
-        # Filter mapping by MyF versions
-        if myf_versions and "All MyF versions" not in myf_versions:
-            filtered_mapping = self.flux_mapping.copy()
-            # Filter by selected MyF versions
-            for myf in myf_versions:
-                if myf in filtered_mapping.columns:
-                    filtered_mapping = filtered_mapping[filtered_mapping[myf] == "1"]
+        if run is not None:
+            # MyF + PVAL filtering and SWEET status codes come from the shared pipeline
+            table = run.get("sweet")
         else:
-            filtered_mapping = self.flux_mapping
-        
-        # Filter by PVAL requirements
-        filtered_mapping = filter_mapping_by_pval(filtered_mapping, self.pval_requirements)
-        
-        # Compute SWEET status
-        sweet_status = compute_sweet_status(filtered_mapping, channels)
-        
-        # Calculate statistics
-        total_signals = len(sweet_status)
-        ok_signals = len(sweet_status[sweet_status.get('Statut', '') == 'OK'])
-        fallback_signals = len(sweet_status[sweet_status.get('Statut', '') == 'Fallback'])
-        nok_signals = len(sweet_status[sweet_status.get('Statut', '') == 'NOK'])
+            mapping = filter_mapping_by_myf(self.flux_mapping, myf_versions)
+            table = sweet_table(filter_mapping_by_pval(mapping, self.pval_requirements), channels)
+        counts = table.counts()
+        total_signals = len(table)
+        ok_signals = counts["OK"]
+        fallback_signals = counts["Fallback"]
+        nok_signals = counts["NOK"]
         
         return {
             "total_signals": total_signals,
@@ -277,7 +309,8 @@ class EVACompleteEngine:
             "fallback_signals": fallback_signals,
             "nok_signals": nok_signals,
             "success_rate": (ok_signals + fallback_signals) / total_signals * 100 if total_signals > 0 else 0,
-            "detailed_results": sweet_status.to_dict('records')
+            "sweet_version": sweet_version,
+            "detailed_results": table
         }
     
     def _analyze_requirements(self, channels: set) -> Dict[str, Any]:
@@ -314,18 +347,15 @@ class EVACompleteEngine:
         for req_id, req_info in requirement_checks.items():
             if req_id in self.pval_requirements:
                 result = self._check_requirement(req_info, channels)
-                requirements_results.append({
-                    "id": req_id,
-                    "description": req_info["description"],
-                    "result": result["status"],
-                    "message": result["message"],
-                    "signals_nok": result.get("missing_signals", "")
-                })
+                requirements_results.append(RequirementVerdict(
+                    req_id, req_info["description"], result["status"],
+                    result["message"], result.get("missing_signals", "")
+                ))
         
         return {
             "total_requirements": len(requirements_results),
-            "passed_requirements": len([r for r in requirements_results if r["result"] == "OK"]),
-            "failed_requirements": len([r for r in requirements_results if r["result"] == "NOK"]),
+            "passed_requirements": sum(r.result == "OK" for r in requirements_results),
+            "failed_requirements": sum(r.result == "NOK" for r in requirements_results),
             "requirements": requirements_results
         }
     
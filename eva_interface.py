@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
 from pathlib import Path
-import threading
 import webbrowser
 import os
 import sys
@@ -10,25 +9,33 @@ from typing import Optional
 import datetime
 
 # Add the Gmail directory to the path to import the existing modules
-sys.path.append('Gmail')
+sys.path.append(str(Path(__file__).resolve().parent / 'Gmail'))
 
-# Import the existing backend modules
-try:
-    from eva_detecteur import (
-        analyser_et_generer_rapport,
-        verifier_presence_mapping_0p01s,
-        CONFIG,
-    )
-except ImportError:
-    # Fallback if modules not found
-    def analyser_et_generer_rapport(*args, **kwargs):
-        return {"Test": {"status": "detected", "required": 5, "present": 3, "missing": "signal1, signal2"}}
-    
-    def verifier_presence_mapping_0p01s(*args, **kwargs):
-        import pandas as pd
-        return pd.DataFrame({"Signal": ["Test1", "Test2"], "Status": ["OK", "NOK"]})
-    
-    CONFIG = {"myf": None}
+# Lightweight job helpers (standard library only)
+from eva_jobs import JobExecutor, job_key
+from eva_prewarm import Prewarmer
+from eva_progress import AnalysisCancelled, CancelToken
+
+# Backend modules (pandas, asammdf, analysis core) load on first use or in the
+# background once the window is up, so the window paints first
+from eva_lazy import lazy_attr, preload
+
+def _fallback_analyser(*args, **kwargs):
+    return {"Test": {"status": "detected", "required": 5, "present": 3, "missing": "signal1, signal2"}}
+
+def _fallback_sweet_check(*args, **kwargs):
+    import pandas as pd
+    return pd.DataFrame({"Signal": ["Test1", "Test2"], "Status": ["OK", "NOK"]})
+
+analyser_et_generer_rapport = lazy_attr("eva_detecteur", "analyser_et_generer_rapport", lambda: _fallback_analyser)
+verifier_presence_mapping_0p01s = lazy_attr("eva_detecteur", "verifier_presence_mapping_0p01s",
+                                            lambda: _fallback_sweet_check)
+CONFIG = lazy_attr("eva_detecteur", "CONFIG", lambda: {"myf": None})
+pipeline_run = lazy_attr("eva_detecteur", "pipeline_run", lambda: (lambda *args, **kwargs: None))
+PREWARM_TARGETS = lazy_attr("eva_detecteur", "PREWARM_TARGETS", tuple)
+
+# Imported in the background after the first paint
+PRELOAD_MODULES = ("pandas", "eva_detecteur")
 
 # ====== Modern Color Palette ======
 PRIMARY_BG = "#1a1a2e"        # Dark blue background
@@ -64,6 +71,8 @@ LANG = {
         "sweet500": "SWEET 500",
         "start": "Lancer l'analyse",
         "analyzing": "Analyse en cours...",
+        "cancel": "Annuler",
+        "cancelled": "Analyse annulée",
         "checking": "Vérification SWEET...",
         "success": "Analyse terminée avec succès",
         "file_err": "Erreur de fichier",
@@ -94,6 +103,8 @@ LANG = {
         "sweet500": "SWEET 500",
         "start": "Start analysis",
         "analyzing": "Analyzing...",
+        "cancel": "Cancel",
+        "cancelled": "Analysis cancelled",
         "checking": "Checking SWEET...",
         "success": "Analysis completed successfully",
         "file_err": "File error",
@@ -161,6 +172,16 @@ class EVAModernApp:
         self.selected_sweet = tk.StringVar(value=self.T["sweet400"])
         self.status_text = tk.StringVar(value=self.T["status_ready"])
         self.analysis_results = {}
+        self.cancel_token = None
+        
+        # Background jobs: queued, de-duplicated, results shared between actions
+        self.jobs = JobExecutor(dispatch=lambda fn: self.root.after(0, fn))
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        
+        # Picking a file starts the channel index, Excel config and signal
+        # decoding in the background; Analyze joins that work
+        self.prewarmer = Prewarmer(lambda path, progress=None: pipeline_run(path, progress=progress),
+                                   PREWARM_TARGETS)
         
         # Build the interface
         self._init_styles()
@@ -170,6 +191,9 @@ class EVAModernApp:
         
         # Apply dark theme
         self._apply_dark_theme()
+        
+        # Warm up the analysis core while the user picks a file
+        self.root.after(100, lambda: preload(PRELOAD_MODULES))
     
     def center_window(self):
         """Center the window on screen"""
@@ -455,6 +479,7 @@ class EVAModernApp:
             self.selected_file = path
             self.file_label.config(text=os.path.basename(path))
             self.btn_start.config(state="normal")
+            self.prewarmer.start(path)
             self.detected_uc = "Not detected"
             self._update_status(self.detected_uc)
             self._update_progress(0)
@@ -472,30 +497,46 @@ class EVAModernApp:
             messagebox.showerror(self.T["file_err"], self.T["select_first"])
             return
         
-        self.btn_start.config(state="disabled")
-        self._update_progress(5)
-        self._show_loading(True, self.T["analyzing"])
-        
         # Get options
         myf_val = self.selected_myf.get()
         is_auto = myf_val.lower().startswith("auto") or myf_val == LANG["fr"]["auto"] or myf_val == LANG["en"]["auto"]
         myf_choice = None if is_auto else myf_val
+        lang = self.lang_var.get()
+        
+        key = job_key("analysis", self.selected_file, lang=lang, myf=myf_choice)
+        if self.jobs.running(key):
+            return
+        
+        self.btn_start.config(state="disabled")
+        self._update_progress(0)
+        self.cancel_token = CancelToken()
+        self._show_loading(True, self.T["analyzing"], on_cancel=self._cancel_analysis)
         
-        def run_analysis():
-            try:
-                result = analyser_et_generer_rapport(self.selected_file, lang=self.lang_var.get(), myf=myf_choice)
-                
-                found = [uc for uc, info in result.items() if info.get("status") == "detected"]
-                uc = found[0] if found else "Not detected"
-                
-                self.root.after(0, lambda: self._handle_analysis_result(uc, result))
-                
-            except Exception as e:
-                self.root.after(0, lambda: self._handle_error(e))
-            finally:
-                self.root.after(0, lambda: self.btn_start.config(state="normal"))
-        
-        threading.Thread(target=run_analysis, daemon=True).start()
+        def on_progress(fraction, message):
+            # Called from the analysis threads: hand over to the Tk loop
+            self.root.after(0, self._on_progress, fraction, message)
+        
+        def on_done(result):
+            self.btn_start.config(state="normal")
+            found = [uc for uc, info in result.items()
+                     if not uc.startswith("_") and isinstance(info, dict) and info.get("status") == "detected"]
+            self._handle_analysis_result(found[0] if found else "Not detected", result)
+        
+        def on_error(error):
+            self.btn_start.config(state="normal")
+            if isinstance(error, AnalysisCancelled):
+                self._handle_cancelled()
+            else:
+                self._handle_error(error)
+        
+        mdf_file, cancel = self.selected_file, self.cancel_token
+        
+        def analyze():
+            # Join the background pre-warm for this file, if any
+            return analyser_et_generer_rapport(mdf_file, lang=lang, myf=myf_choice, progress=on_progress,
+                                               cancel=cancel, run=self.prewarmer.take(mdf_file))
+        
+        self.jobs.submit(key, analyze, on_done=on_done, on_error=on_error)
     
     def _handle_analysis_result(self, uc_text, results):
         """Handle analysis results"""
@@ -511,6 +552,30 @@ class EVAModernApp:
         
         self._show_toast(self.T["success"])
     
+    def _on_progress(self, fraction, message):
+        """Relay core progress to the progress bar and loading overlay"""
+        self._update_progress(int(fraction * 100))
+        if message and hasattr(self, "_loading_detail") and self._loading_detail.winfo_exists():
+            self._loading_detail.config(text=message)
+    
+    def _cancel_analysis(self):
+        """Ask the running analysis to stop at its next checkpoint"""
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+    
+    def _on_close(self):
+        """Stop a running analysis at its next checkpoint, then close"""
+        self._cancel_analysis()
+        self.prewarmer.cancel()
+        self.jobs.shutdown(wait=False)
+        self.root.destroy()
+    
+    def _handle_cancelled(self):
+        """Handle a cancelled analysis"""
+        self._show_loading(False)
+        self._update_progress(0)
+        self._update_status(self.T["cancelled"], "warning")
+    
     def _handle_error(self, e):
         """Handle analysis error"""
         self._show_loading(False)
@@ -524,15 +589,18 @@ class EVAModernApp:
             messagebox.showwarning("Warning", "No analysis results available")
             return
         
-        try:
-            report_path = self._create_comprehensive_report()
+        def on_done(report_path):
             self._show_toast(self.T["report_generated"])
             messagebox.showinfo("Success", f"Report generated: {report_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
+        
+        # Tk variables are read here, on the Tk thread; the job only gets plain values
+        options = {"lang": self.lang_var.get(), "myf": self.selected_myf.get(), "sweet": self.selected_sweet.get()}
+        self.jobs.submit(job_key("report", self.selected_file, results=id(self.analysis_results), **options),
+                         self._create_comprehensive_report, options, on_done=on_done,
+                         on_error=lambda e: messagebox.showerror("Error", f"Failed to generate report: {str(e)}"))
     
-    def _create_comprehensive_report(self):
-        """Create a comprehensive HTML report"""
+    def _create_comprehensive_report(self, options):
+        """Create a comprehensive HTML report (job thread: settings come in options, not from Tk variables)"""
         report_path = Path("eva_comprehensive_report.html")
         
         # Get current timestamp
@@ -541,7 +609,7 @@ class EVAModernApp:
         # Create comprehensive HTML content
         html_content = f"""
 <!DOCTYPE html>
-<html lang="{self.lang_var.get()}">
+<html lang="{options['lang']}">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
@@ -752,11 +820,11 @@ class EVAModernApp:
                 </div>
                 <div class="info-item">
                     <strong>MyF Version:</strong>
-                    <span>{self.selected_myf.get()}</span>
+                    <span>{options['myf']}</span>
                 </div>
                 <div class="info-item">
                     <strong>SWEET Version:</strong>
-                    <span>{self.selected_sweet.get()}</span>
+                    <span>{options['sweet']}</span>
                 </div>
             </div>
         </div>
@@ -779,7 +847,7 @@ class EVAModernApp:
             <div class="info-grid">
                 <div class="info-item">
                     <strong>Language:</strong>
-                    <span>{self.lang_var.get().upper()}</span>
+                    <span>{options['lang'].upper()}</span>
                 </div>
                 <div class="info-item">
                     <strong>File Path:</strong>
@@ -892,8 +960,8 @@ class EVAModernApp:
         
         toast.after(duration, toast.destroy)
     
-    def _show_loading(self, show, text=None):
-        """Show/hide loading overlay"""
+    def _show_loading(self, show, text=None, on_cancel=None):
+        """Show/hide loading overlay (with a cancel button when ``on_cancel`` is given)"""
         if show:
             if hasattr(self, "_loading") and self._loading.winfo_exists():
                 return
@@ -906,6 +974,13 @@ class EVAModernApp:
             if text:
                 tk.Label(self._loading, text=text, font=FONT_H3, fg=TEXT_PRIMARY, bg=PRIMARY_BG, padx=40, pady=30).pack()
             
+            self._loading_detail = tk.Label(self._loading, text="", font=FONT_BODY, fg=TEXT_PRIMARY, bg=PRIMARY_BG)
+            self._loading_detail.pack()
+            
+            if on_cancel is not None:
+                ModernButton(self._loading, text=self.T["cancel"], bg=ACCENT_COLOR, fg=TEXT_PRIMARY,
+                             command=on_cancel).pack(pady=20)
+            
             self._loading.geometry(
                 f"{self.root.winfo_width()}x{self.root.winfo_height()}+{self.root.winfo_x()}+{self.root.winfo_y()}"
             )
@@ -1,25 +1,54 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
-import threading
 import webbrowser
 import os
 import datetime
 from pathlib import Path
-import pandas as pd
 import sys
 
 # Add Gmail directory to path
-sys.path.append('Gmail')
+sys.path.append(str(Path(__file__).resolve().parent / 'Gmail'))
 
-try:
-    from eva_detecteur import analyser_et_generer_rapport, verifier_presence_mapping_0p01s, CONFIG
-except ImportError:
-    def analyser_et_generer_rapport(*args, **kwargs):
-        return {"UC 1.1": {"status": "detected", "required": 5, "present": 5, "missing": ""}}
-    def verifier_presence_mapping_0p01s(*args, **kwargs):
-        return pd.DataFrame({"Signal": ["Test"], "Status": ["OK"]})
-    CONFIG = {"myf": None}
+# Lightweight job helpers (standard library only)
+from eva_jobs import JobExecutor, job_key
+from eva_prewarm import Prewarmer
+from eva_progress import AnalysisCancelled, CancelToken
+
+# Heavy modules (pandas, asammdf, analysis core) load on first use or in the
+# background once the window is up, so the window paints first
+from eva_lazy import lazy_attr, lazy_import, preload
+
+pd = lazy_import("pandas")
+eva_table = lazy_import("eva_table")
+
+def _fallback_analyser(*args, **kwargs):
+    return {"UC 1.1": {"status": "detected", "required": 5, "present": 5, "missing": ""}}
+
+def _fallback_sweet_check(*args, **kwargs):
+    return pd.DataFrame({"Signal": ["Test"], "Status": ["OK"]})
+
+def _fallback_export(results, export_path):
+    rows = [{"Use Case": uc, "Status": info.get("status", "unknown"), "Required": info.get("required", 0),
+             "Present": info.get("present", 0), "Missing": info.get("missing", "")}
+            for uc, info in results.items() if not uc.startswith("_") and isinstance(info, dict)]
+    df = pd.DataFrame(rows)
+    if str(export_path).endswith(".csv"):
+        df.to_csv(export_path, index=False)
+    else:
+        df.to_excel(export_path, index=False)
+    return [export_path]
+
+analyser_et_generer_rapport = lazy_attr("eva_detecteur", "analyser_et_generer_rapport", lambda: _fallback_analyser)
+verifier_presence_mapping_0p01s = lazy_attr("eva_detecteur", "verifier_presence_mapping_0p01s",
+                                            lambda: _fallback_sweet_check)
+CONFIG = lazy_attr("eva_detecteur", "CONFIG", lambda: {"myf": None})
+export_results = lazy_attr("eva_export", "export_results", lambda: _fallback_export)
+pipeline_run = lazy_attr("eva_detecteur", "pipeline_run", lambda: (lambda *args, **kwargs: None))
+PREWARM_TARGETS = lazy_attr("eva_detecteur", "PREWARM_TARGETS", tuple)
+
+# Imported in the background after the first paint
+PRELOAD_MODULES = ("pandas", "eva_detecteur", "eva_table")
 
 class ProfessionalEVAInterface:
     def __init__(self, root):
@@ -38,9 +67,22 @@ class ProfessionalEVAInterface:
             "MyF4": tk.BooleanVar(),
             "MyF5": tk.BooleanVar()
         }
+        self.cancel_token = None
+        
+        # Background jobs: queued, de-duplicated, results shared between actions
+        self.jobs = JobExecutor(dispatch=lambda fn: self.root.after(0, fn))
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Picking a file starts the channel index, Excel config and signal
+        # decoding in the background; Analyze joins that work
+        self.prewarmer = Prewarmer(lambda path, progress=None: pipeline_run(path, progress=progress),
+                                   PREWARM_TARGETS)
         
         self.setup_ui()
         
+        # Warm up the analysis core while the user picks a file
+        self.root.after(100, lambda: preload(PRELOAD_MODULES))
+        
     def setup_ui(self):
         # Main container with scrollbar
         main_canvas = tk.Canvas(self.root, bg="#1e1e2e", highlightthickness=0)
@@ -185,6 +227,13 @@ class ProfessionalEVAInterface:
                                    relief="flat", bd=0, padx=30, pady=15)
         self.analyze_btn.pack(pady=10)
         
+        self.cancel_btn = tk.Button(analysis_card, text="✖ Cancel", 
+                                  command=self.cancel_analysis,
+                                  bg="#f44336", fg="white", 
+                                  font=("Segoe UI", 10, "bold"),
+                                  relief="flat", bd=0, padx=15, pady=5, state="disabled")
+        self.cancel_btn.pack(pady=(0, 5))
+        
         # Progress bar
         self.progress = ttk.Progressbar(analysis_card, mode='determinate', length=350)
         self.progress.pack(pady=10, padx=15)
@@ -289,6 +338,10 @@ class ProfessionalEVAInterface:
         scrollbar.pack(side="right", fill="y")
         self.results_text.configure(yscrollcommand=scrollbar.set)
         
+        # Large SWEET tables: virtualized view, created on first use
+        self.results_parent = results_card
+        self.sweet_table = None
+        
     def select_file(self):
         file_path = filedialog.askopenfilename(
             title="Select MDF File",
@@ -299,40 +352,59 @@ class ProfessionalEVAInterface:
             self.mdf_file = file_path
             self.file_label.config(text=os.path.basename(file_path))
             self.analyze_btn.config(state="normal")
+            self.prewarmer.start(file_path)
             
     def start_analysis(self):
         if not self.mdf_file:
             messagebox.showerror("Error", "Please select an MDF file first")
             return
             
+        key = job_key("analysis", self.mdf_file)
+        if self.jobs.running(key):
+            self.status_label.config(text="Analysis already running for this file")
+            return
+            
         self.analyze_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
         self.progress["value"] = 0
         self.status_label.config(text="Analyzing...")
+        self.cancel_token = CancelToken()
         
-        # Get selected MyF versions
-        selected_myf = [myf for myf, var in self.myf_vars.items() if var.get()]
-        if not selected_myf:
-            selected_myf = ["All MyF versions"]
+        def on_progress(fraction, message):
+            # Called from the analysis threads: hand over to the Tk loop
+            self.root.after(0, self.update_progress, fraction, message)
             
-        def run_analysis():
-            try:
-                # Simulate analysis
-                import time
-                for i in range(5):
-                    time.sleep(0.5)
-                    self.root.after(0, lambda: self.progress.config(value=(i+1)*20))
-                
-                # Get results
-                results = analyser_et_generer_rapport(self.mdf_file)
-                
-                self.root.after(0, lambda: self.display_results(results))
+        def on_error(error):
+            self.analysis_finished()
+            if isinstance(error, AnalysisCancelled):
+                self.show_cancelled()
+            else:
+                self.show_error(str(error))
                 
-            except Exception as e:
-                self.root.after(0, lambda: self.show_error(str(e)))
-            finally:
-                self.root.after(0, lambda: self.analyze_btn.config(state="normal"))
-                
-        threading.Thread(target=run_analysis, daemon=True).start()
+        def on_done(results):
+            self.analysis_finished()
+            self.display_results(results)
+            
+        mdf_file, cancel = self.mdf_file, self.cancel_token
+        
+        def analyze():
+            # Join the background pre-warm for this file, if any
+            return analyser_et_generer_rapport(mdf_file, progress=on_progress, cancel=cancel,
+                                               run=self.prewarmer.take(mdf_file))
+            
+        self.jobs.submit(key, analyze, on_done=on_done, on_error=on_error)
+        
+    def analysis_finished(self):
+        self.analyze_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
+        
+    def on_close(self):
+        # Stop a running analysis at its next checkpoint so the worker can exit
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+        self.prewarmer.cancel()
+        self.jobs.shutdown(wait=False)
+        self.root.destroy()
         
     def display_results(self, results):
         self.progress["value"] = 100
@@ -369,6 +441,20 @@ DETECTED USE CASES:
                 
         self.results_text.insert(1.0, output)
         
+    def update_progress(self, fraction, message):
+        self.progress["value"] = int(fraction * 100)
+        self.status_label.config(text=f"{message} ({fraction:.0%})" if message else f"Analyzing... {fraction:.0%}")
+        
+    def cancel_analysis(self):
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+            self.cancel_btn.config(state="disabled")
+            self.status_label.config(text="Cancelling...")
+        
+    def show_cancelled(self):
+        self.status_label.config(text="Analysis cancelled")
+        self.progress["value"] = 0
+        
     def show_error(self, error_msg):
         self.status_label.config(text="Analysis failed")
         messagebox.showerror("Analysis Error", error_msg)
@@ -378,13 +464,16 @@ DETECTED USE CASES:
             messagebox.showwarning("Warning", "No analysis results to report")
             return
             
-        try:
-            self.report_path = self.create_professional_report()
+        def on_done(report_path):
+            self.report_path = report_path
             messagebox.showinfo("Success", f"Report generated: {self.report_path}")
             self.view_btn.config(state="normal")
             self.download_btn.config(state="normal")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
+            
+        options = self.report_options()  # Tk variables are read here, on the Tk thread
+        self.jobs.submit(job_key("report", self.mdf_file, results=id(self.last_results), **options),
+                         self.create_professional_report, options, on_done=on_done,
+                         on_error=lambda e: messagebox.showerror("Error", f"Failed to generate report: {str(e)}"))
             
     def view_report(self):
         if hasattr(self, 'report_path') and os.path.exists(self.report_path):
@@ -406,14 +495,18 @@ DETECTED USE CASES:
         else:
             messagebox.showwarning("Warning", "No report available. Please generate a report first.")
             
-    def create_professional_report(self):
+    def report_options(self):
+        """Report settings as plain values (Tk variables must only be read on the Tk thread)"""
+        selected_myf = [myf for myf, var in self.myf_vars.items() if var.get()]
+        return {"language": self.language.get(), "sweet_version": self.sweet_version.get(),
+                "myf": selected_myf or ["All MyF versions"]}
+            
+    def create_professional_report(self, options):
+        """Write the HTML report; runs on the job thread, so it only uses the plain values in options"""
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         report_path = f"eva_report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
         
-        # Get selected MyF versions
-        selected_myf = [myf for myf, var in self.myf_vars.items() if var.get()]
-        if not selected_myf:
-            selected_myf = ["All MyF versions"]
+        selected_myf = options["myf"]
         
         # Generate use cases data (example)
         use_cases = [
@@ -436,7 +529,7 @@ DETECTED USE CASES:
         
         html_content = f"""
 <!DOCTYPE html>
-<html lang="{self.language.get().lower()}">
+<html lang="{options['language'].lower()}">
 <head>
     <meta charset="UTF-8">
     <title>Rapport de Dépouillement Automatique EVA</title>
@@ -592,13 +685,13 @@ DETECTED USE CASES:
                     <strong>File:</strong> {os.path.basename(self.mdf_file)}
                 </div>
                 <div class="info-card">
-                    <strong>SWEET Version:</strong> {self.sweet_version.get()}
+                    <strong>SWEET Version:</strong> {options['sweet_version']}
                 </div>
                 <div class="info-card">
                     <strong>MyF Versions:</strong> {', '.join(selected_myf)}
                 </div>
                 <div class="info-card">
-                    <strong>Language:</strong> {self.language.get()}
+                    <strong>Language:</strong> {options['language']}
                 </div>
             </div>
         </div>
@@ -744,18 +837,34 @@ DETECTED USE CASES:
             messagebox.showerror("Error", "Please select an MDF file first")
             return
             
-        try:
-            sweet_mode = "sweet400" if "400" in self.sweet_version.get() else "sweet500"
-            df = verifier_presence_mapping_0p01s(self.mdf_file, mode=sweet_mode)
-            
-            # Display results
-            self.results_text.delete(1.0, tk.END)
-            self.results_text.insert(1.0, f"SWEET VERIFICATION RESULTS\n{'='*50}\n\n{df.to_string()}")
-            
+        sweet_mode = "sweet400" if "400" in self.sweet_version.get() else "sweet500"
+        
+        def on_done(df):
+            self.show_sweet_table(df)
             messagebox.showinfo("Success", "SWEET verification completed")
             
-        except Exception as e:
-            messagebox.showerror("Error", f"SWEET verification failed: {str(e)}")
+        self.jobs.submit(job_key("sweet", self.mdf_file, mode=sweet_mode), verifier_presence_mapping_0p01s,
+                         self.mdf_file, mode=sweet_mode, reuse=True, on_done=on_done,
+                         on_error=lambda e: messagebox.showerror("Error", f"SWEET verification failed: {str(e)}"))
+            
+    def show_sweet_table(self, df):
+        """Display SWEET results: summary in the text area, rows in the virtualized table"""
+        self.results_text.delete(1.0, tk.END)
+        if self.sweet_table is None:
+            try:
+                self.sweet_table = eva_table.VirtualTable(self.results_parent)
+            except ImportError:
+                pass
+        if self.sweet_table is None:
+            self.results_text.insert(1.0, f"SWEET VERIFICATION RESULTS\n{'='*50}\n\n{df.to_string()}")
+            return
+        counts = df["Statut"].value_counts().to_dict() if "Statut" in df.columns else {}
+        summary = ", ".join(f"{status}: {count}" for status, count in counts.items())
+        self.results_text.insert(1.0, f"SWEET VERIFICATION RESULTS\n{'='*50}\n\n{len(df)} signals  {summary}")
+        self.results_text.configure(height=6)
+        self.results_text.pack_configure(expand=False)
+        self.sweet_table.pack(fill="both", expand=True, padx=15, pady=(0, 10))
+        self.sweet_table.load(df)
             
     def run_requirements_check(self):
         """Run requirements check"""
@@ -779,40 +888,23 @@ DETECTED USE CASES:
             messagebox.showwarning("Warning", "No analysis results to export")
             return
             
-        try:
-            export_path = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("All files", "*.*")],
-                title="Export Data As"
-            )
+        export_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("Parquet files", "*.parquet"),
+                       ("Arrow IPC files", "*.arrow"), ("NDJSON files", "*.ndjson"), ("All files", "*.*")],
+            title="Export Data As"
+        )
+        
+        if export_path:
+            self.jobs.submit(job_key("export", self.mdf_file, path=export_path), self.write_export,
+                             self.last_results, export_path,
+                             on_done=lambda path: messagebox.showinfo("Success", f"Data exported to: {path}"),
+                             on_error=lambda e: messagebox.showerror("Error", f"Export failed: {str(e)}"))
             
-            if export_path:
-                # Export results to CSV/Excel
-                import pandas as pd
-                
-                # Convert results to DataFrame
-                data = []
-                for uc, info in self.last_results.items():
-                    if not uc.startswith('_'):
-                        data.append({
-                            'Use Case': uc,
-                            'Status': info.get('status', 'unknown'),
-                            'Required': info.get('required', 0),
-                            'Present': info.get('present', 0),
-                            'Missing': info.get('missing', '')
-                        })
-                
-                df = pd.DataFrame(data)
-                
-                if export_path.endswith('.csv'):
-                    df.to_csv(export_path, index=False)
-                else:
-                    df.to_excel(export_path, index=False)
-                    
-                messagebox.showinfo("Success", f"Data exported to: {export_path}")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Export failed: {str(e)}")
+    @staticmethod
+    def write_export(results, export_path):
+        """Export every result table; the file extension picks the format"""
+        return ", ".join(str(p) for p in export_results(results, export_path))
             
     def open_settings(self):
         """Open settings window"""
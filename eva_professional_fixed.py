@@ -1,37 +1,63 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import threading
 import webbrowser
 import os
 import datetime
 from pathlib import Path
-import pandas as pd
 import sys
 
 # Add Gmail directory to path
-sys.path.append('Gmail')
+sys.path.append(str(Path(__file__).resolve().parent / 'Gmail'))
 
-try:
-    from eva_detecteur import analyser_et_generer_rapport, verifier_presence_mapping_0p01s, CONFIG
-except ImportError:
-    def analyser_et_generer_rapport(*args, **kwargs):
-        return {"UC 1.1": {"status": "detected", "required": 5, "present": 5, "missing": ""}}
-    def verifier_presence_mapping_0p01s(*args, **kwargs):
-        return pd.DataFrame({"Signal": ["Test"], "Status": ["OK"]})
-    CONFIG = {"myf": None}
+# Lightweight job helpers (standard library only)
+from eva_jobs import JobExecutor, job_key
+from eva_prewarm import Prewarmer
+from eva_progress import AnalysisCancelled, CancelToken
 
-# Import complete engine
-try:
-    from eva_complete_engine import eva_engine
-except ImportError:
-    # Create a simple fallback engine
-    class SimpleEngine:
-        def analyze_mdf_file(self, *args, **kwargs):
-            return {"use_cases": {"UC 1.1": {"status": "detected", "required": 3, "present": 3, "missing": ""}}}
-        def generate_comprehensive_report_data(self, *args, **kwargs):
-            return {"company_info": {"parent_company": "RENAULT GROUP"}}
-    
-    eva_engine = SimpleEngine()
+# Heavy modules (pandas, asammdf, analysis core) load on first use or in the
+# background once the window is up, so the window paints first
+from eva_lazy import lazy_attr, lazy_import, preload
+
+pd = lazy_import("pandas")
+eva_table = lazy_import("eva_table")
+
+def _fallback_analyser(*args, **kwargs):
+    return {"UC 1.1": {"status": "detected", "required": 5, "present": 5, "missing": ""}}
+
+def _fallback_sweet_check(*args, **kwargs):
+    return pd.DataFrame({"Signal": ["Test"], "Status": ["OK"]})
+
+def _fallback_export(results, export_path):
+    rows = [{"Use Case": uc, "Status": info.get("status", "unknown"), "Required": info.get("required", 0),
+             "Present": info.get("present", 0), "Missing": info.get("missing", "")}
+            for uc, info in results.items() if not uc.startswith("_") and isinstance(info, dict)]
+    df = pd.DataFrame(rows)
+    if str(export_path).endswith(".csv"):
+        df.to_csv(export_path, index=False)
+    else:
+        df.to_excel(export_path, index=False)
+    return [export_path]
+
+analyser_et_generer_rapport = lazy_attr("eva_detecteur", "analyser_et_generer_rapport", lambda: _fallback_analyser)
+verifier_presence_mapping_0p01s = lazy_attr("eva_detecteur", "verifier_presence_mapping_0p01s",
+                                            lambda: _fallback_sweet_check)
+CONFIG = lazy_attr("eva_detecteur", "CONFIG", lambda: {"myf": None})
+export_results = lazy_attr("eva_export", "export_results", lambda: _fallback_export)
+
+# Complete engine (built on first use)
+class SimpleEngine:
+    """Fallback engine when the analysis core is not available"""
+    def analyze_mdf_file(self, *args, **kwargs):
+        return {"use_cases": {"UC 1.1": {"status": "detected", "required": 3, "present": 3, "missing": ""}}}
+    def prepare_run(self, *args, **kwargs):
+        return None
+    def generate_comprehensive_report_data(self, *args, **kwargs):
+        return {"company_info": {"parent_company": "RENAULT GROUP"}}
+
+eva_engine = lazy_attr("eva_complete_engine", "eva_engine", SimpleEngine)
+
+# Imported in the background after the first paint
+PRELOAD_MODULES = ("pandas", "eva_detecteur", "eva_complete_engine", "eva_table")
 
 class EVAInterface:
     def __init__(self, root):
@@ -52,9 +78,25 @@ class EVAInterface:
         }
         self.last_results = None
         self.report_path = None
+        self.cancel_token = None
+        
+        # Background jobs: queued, de-duplicated, results shared between actions
+        self.jobs = JobExecutor(dispatch=lambda fn: self.root.after(0, fn))
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Picking a file starts the channel index, Excel config and SWEET check
+        # in the background; changing options only redoes the affected stages
+        self.prewarmer = Prewarmer(lambda path, **params: eva_engine.prepare_run(path, **params),
+                                   lazy_attr("eva_complete_engine", "PREWARM_TARGETS", tuple))
+        self.sweet_version.trace_add("write", lambda *args: self.prewarm())
+        for var in self.myf_vars.values():
+            var.trace_add("write", lambda *args: self.prewarm())
         
         self.setup_ui()
         
+        # Warm up the analysis core while the user picks a file
+        self.root.after(100, lambda: preload(PRELOAD_MODULES))
+        
     def setup_ui(self):
         # Create notebook for tabs
         notebook = ttk.Notebook(self.root)
@@ -157,7 +199,12 @@ class EVAInterface:
                                    bg="#27ae60", fg="white", 
                                    font=("Arial", 14, "bold"),
                                    padx=30, pady=15, state="disabled")
-        self.analyze_btn.pack(pady=(0, 15))
+        self.analyze_btn.pack(pady=(0, 5))
+        
+        self.cancel_btn = tk.Button(parent, text="✖ CANCEL", command=self.cancel_analysis,
+                                  bg="#c0392b", fg="white", font=("Arial", 10, "bold"),
+                                  padx=10, pady=5, state="disabled")
+        self.cancel_btn.pack(pady=(0, 15))
         
         # Progress section
         progress_frame = tk.Frame(parent, bg="#34495e")
@@ -239,6 +286,10 @@ class EVAInterface:
         self.results_text.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
+        # Large SWEET tables: virtualized view, created on first use
+        self.results_parent = parent
+        self.sweet_table = None
+        
     def select_file(self):
         file_path = filedialog.askopenfilename(
             title="Select MDF File",
@@ -249,46 +300,76 @@ class EVAInterface:
             self.mdf_file = file_path
             self.file_label.config(text=f"Selected: {os.path.basename(file_path)}")
             self.analyze_btn.config(state="normal")
+            self.prewarm()
+            
+    def analysis_options(self):
+        """Pipeline parameters for the current SWEET / MyF choice"""
+        selected_myf = [myf for myf, var in self.myf_vars.items() if var.get()]
+        if not selected_myf:
+            selected_myf = ["All MyF versions"]
+        sweet_mode = "sweet400" if "400" in self.sweet_version.get() else "sweet500"
+        return {"mode": sweet_mode, "myf": selected_myf}
+        
+    def prewarm(self):
+        if self.mdf_file:
+            self.prewarmer.start(self.mdf_file, **self.analysis_options())
             
     def start_analysis(self):
         if not self.mdf_file:
             messagebox.showerror("Error", "Please select an MDF file first")
             return
             
+        # Get selected SWEET / MyF versions
+        options = self.analysis_options()
+        sweet_mode, selected_myf = options["mode"], options["myf"]
+        
+        key = job_key("analysis", self.mdf_file, sweet_version=sweet_mode, myf_versions=selected_myf)
+        if self.jobs.running(key):
+            self.status_label.config(text="Analysis already running for this file")
+            return
+            
         self.analyze_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
         self.progress["value"] = 0
         self.status_label.config(text="Starting analysis...")
+        self.cancel_token = CancelToken()
         
-        def run_analysis():
-            try:
-                # Progress updates
-                for i in range(1, 6):
-                    self.root.after(0, lambda v=i*20: self.progress.config(value=v))
-                    self.root.after(0, lambda: self.status_label.config(text=f"Analyzing... {i*20}%"))
-                    import time
-                    time.sleep(0.5)
-                
-                # Get selected MyF versions
-                selected_myf = [myf for myf, var in self.myf_vars.items() if var.get()]
-                if not selected_myf:
-                    selected_myf = ["All MyF versions"]
-                
-                # Run complete analysis
-                sweet_mode = "sweet400" if "400" in self.sweet_version.get() else "sweet500"
-                analysis_results = eva_engine.analyze_mdf_file(
-                    self.mdf_file, 
-                    sweet_version=sweet_mode,
-                    myf_versions=selected_myf
-                )
-                
-                self.root.after(0, lambda: self.display_complete_results(analysis_results))
-                
-            except Exception as e:
-                self.root.after(0, lambda: self.show_error(str(e)))
-            finally:
-                self.root.after(0, lambda: self.analyze_btn.config(state="normal"))
-                
-        threading.Thread(target=run_analysis, daemon=True).start()
+        def on_progress(fraction, message):
+            # Called from the analysis threads: hand over to the Tk loop
+            self.root.after(0, self.update_progress, fraction, message)
+        
+        def on_error(error):
+            self.analysis_finished()
+            if isinstance(error, AnalysisCancelled):
+                self.show_cancelled()
+            else:
+                self.show_error(str(error))
+        
+        def on_done(analysis_results):
+            self.analysis_finished()
+            self.display_complete_results(analysis_results)
+        
+        mdf_file, cancel = self.mdf_file, self.cancel_token
+        
+        def analyze():
+            # Join the background pre-warm for this file and options, if any
+            return eva_engine.analyze_mdf_file(mdf_file, sweet_version=sweet_mode, myf_versions=selected_myf,
+                                               progress=on_progress, cancel=cancel,
+                                               run=self.prewarmer.take(mdf_file, **options))
+        
+        self.jobs.submit(key, analyze, on_done=on_done, on_error=on_error)
+        
+    def analysis_finished(self):
+        self.analyze_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
+        
+    def on_close(self):
+        # Stop a running analysis at its next checkpoint so the worker can exit
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+        self.prewarmer.cancel()
+        self.jobs.shutdown(wait=False)
+        self.root.destroy()
         
     def display_complete_results(self, analysis_results):
         self.last_results = analysis_results
@@ -358,6 +439,20 @@ REQUIREMENTS CHECK:
         self.results_text.insert(1.0, output)
         messagebox.showinfo("Success", "Complete analysis finished successfully!")
         
+    def update_progress(self, fraction, message):
+        self.progress["value"] = int(fraction * 100)
+        self.status_label.config(text=f"{message} ({fraction:.0%})" if message else f"Analyzing... {fraction:.0%}")
+        
+    def cancel_analysis(self):
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+            self.cancel_btn.config(state="disabled")
+            self.status_label.config(text="Cancelling...")
+        
+    def show_cancelled(self):
+        self.status_label.config(text="Analysis cancelled")
+        self.progress["value"] = 0
+        
     def show_error(self, error_msg):
         self.status_label.config(text="Analysis failed")
         self.progress["value"] = 0
@@ -368,11 +463,15 @@ REQUIREMENTS CHECK:
             messagebox.showwarning("Warning", "No analysis results available")
             return
             
-        try:
-            self.report_path = self.create_html_report()
+        def on_done(report_path):
+            self.report_path = report_path
             messagebox.showinfo("Success", f"Report generated: {self.report_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
+            
+        options = self.report_options()  # Tk variables are read here, on the Tk thread
+        self.jobs.submit(job_key("report", self.mdf_file, results=id(self.last_results), **options),
+                         self.create_html_report, options,
+                         on_done=on_done,
+                         on_error=lambda e: messagebox.showerror("Error", f"Failed to generate report: {str(e)}"))
             
     def view_report(self):
         if self.report_path and os.path.exists(self.report_path):
@@ -399,68 +498,86 @@ REQUIREMENTS CHECK:
             messagebox.showerror("Error", "Please select an MDF file first")
             return
             
-        try:
-            sweet_mode = "sweet400" if "400" in self.sweet_version.get() else "sweet500"
-            df = verifier_presence_mapping_0p01s(self.mdf_file, mode=sweet_mode)
-            
-            self.results_text.delete(1.0, tk.END)
-            self.results_text.insert(1.0, f"SWEET VERIFICATION RESULTS\n{'='*50}\n\n{df.to_string()}")
-            
+        sweet_mode = "sweet400" if "400" in self.sweet_version.get() else "sweet500"
+        
+        def on_done(df):
+            self.show_sweet_table(df)
             messagebox.showinfo("Success", "SWEET verification completed")
             
-        except Exception as e:
-            messagebox.showerror("Error", f"SWEET verification failed: {str(e)}")
+        self.status_label.config(text="Running SWEET verification...")
+        self.jobs.submit(job_key("sweet", self.mdf_file, mode=sweet_mode), self.sweet_frame, self.mdf_file, sweet_mode,
+                         reuse=True, on_done=on_done,
+                         on_error=lambda e: messagebox.showerror("Error", f"SWEET verification failed: {str(e)}"))
+        
+    def show_sweet_table(self, df):
+        self.results_text.delete(1.0, tk.END)
+        if self.sweet_table is None:
+            try:
+                self.sweet_table = eva_table.VirtualTable(self.results_parent)
+            except ImportError:
+                pass
+        if self.sweet_table is None:
+            self.results_text.insert(1.0, f"SWEET VERIFICATION RESULTS\n{'='*50}\n\n{df.to_string()}")
+            return
+        # Summary in the text area, rows in the virtualized table
+        counts = df["Statut"].value_counts().to_dict() if "Statut" in df.columns else {}
+        summary = ", ".join(f"{status}: {count}" for status, count in counts.items())
+        self.results_text.insert(1.0, f"SWEET VERIFICATION RESULTS\n{'='*50}\n\n{len(df)} signals  {summary}")
+        self.results_text.configure(height=6)
+        self.results_text.master.pack_configure(expand=False)
+        self.sweet_table.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.sweet_table.load(df)
+        
+    def sweet_frame(self, mdf_file, sweet_mode):
+        """SWEET table, taken from a finished unfiltered analysis of the same file when there is one"""
+        analysis = self.jobs.result(job_key("analysis", mdf_file, sweet_version=sweet_mode,
+                                            myf_versions=["All MyF versions"]))
+        table = (analysis or {}).get("sweet_compliance", {}).get("detailed_results")
+        if table is not None and hasattr(table, "to_frame"):
+            return table.to_frame()
+        return verifier_presence_mapping_0p01s(mdf_file, mode=sweet_mode)
             
     def export_data(self):
         if not self.last_results:
             messagebox.showwarning("Warning", "No analysis results to export")
             return
             
-        try:
-            export_path = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx")],
-                title="Export Data As"
-            )
+        export_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("Parquet files", "*.parquet"),
+                       ("Arrow IPC files", "*.arrow"), ("NDJSON files", "*.ndjson")],
+            title="Export Data As"
+        )
+        
+        if export_path:
+            self.jobs.submit(job_key("export", self.mdf_file, path=export_path), self.write_export,
+                             self.last_results, export_path,
+                             on_done=lambda path: messagebox.showinfo("Success", f"Data exported to: {path}"),
+                             on_error=lambda e: messagebox.showerror("Error", f"Export failed: {str(e)}"))
             
-            if export_path:
-                data = []
-                for uc, info in self.last_results.items():
-                    if not uc.startswith('_'):
-                        data.append({
-                            'Use Case': uc,
-                            'Status': info.get('status', 'unknown'),
-                            'Required': info.get('required', 0),
-                            'Present': info.get('present', 0),
-                            'Missing': info.get('missing', '')
-                        })
-                
-                df = pd.DataFrame(data)
-                
-                if export_path.endswith('.csv'):
-                    df.to_csv(export_path, index=False)
-                else:
-                    df.to_excel(export_path, index=False)
-                    
-                messagebox.showinfo("Success", f"Data exported to: {export_path}")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Export failed: {str(e)}")
+    @staticmethod
+    def write_export(results, export_path):
+        """Export every result table; the file extension picks the format"""
+        return ", ".join(str(p) for p in export_results(results, export_path))
+            
+    def report_options(self):
+        """Report settings as plain values (Tk variables must only be read on the Tk thread)"""
+        selected_myf = [myf for myf, var in self.myf_vars.items() if var.get()]
+        return {"language": self.language.get(), "sweet_version": self.sweet_version.get(),
+                "myf": selected_myf or ["All MyF versions"]}
             
-    def create_html_report(self):
+    def create_html_report(self, options):
+        """Write the HTML report; runs on the job thread, so it only uses the plain values in options"""
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         report_path = f"eva_report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
         
         # Generate comprehensive report data
         report_data = eva_engine.generate_comprehensive_report_data(self.last_results)
         
-        # Get selected MyF versions
-        selected_myf = [myf for myf, var in self.myf_vars.items() if var.get()]
-        if not selected_myf:
-            selected_myf = ["All MyF versions"]
+        selected_myf = options["myf"]
             
         html_content = f"""<!DOCTYPE html>
-<html lang="{self.language.get().lower()}">
+<html lang="{options['language'].lower()}">
 <head>
     <meta charset="UTF-8">
     <title>Rapport de Dépouillement Automatique EVA</title>
@@ -616,13 +733,13 @@ REQUIREMENTS CHECK:
                     <strong>File:</strong> {os.path.basename(self.mdf_file)}
                 </div>
                 <div class="info-card">
-                    <strong>SWEET Version:</strong> {self.sweet_version.get()}
+                    <strong>SWEET Version:</strong> {options['sweet_version']}
                 </div>
                 <div class="info-card">
                     <strong>MyF Versions:</strong> {', '.join(selected_myf)}
                 </div>
                 <div class="info-card">
-                    <strong>Language:</strong> {self.language.get()}
+                    <strong>Language:</strong> {options['language']}
                 </div>
             </div>
         </div>
@@ -19,6 +19,8 @@ try:
     from eva_detecteur import (
         analyser_et_generer_rapport,
         verifier_presence_mapping_0p01s,
+        pipeline_run,
+        sweet_summary,
         CONFIG,
     )
 except ImportError:
@@ -30,6 +32,8 @@ except ImportError:
         import pandas as pd
         return pd.DataFrame({"Signal": ["Test1", "Test2"], "Status": ["OK", "NOK"]})
     
+    pipeline_run = sweet_summary = None
+    
     CONFIG = {"myf": None}
 
 class EVAReportGenerator:
@@ -65,8 +69,8 @@ class EVAReportGenerator:
             'file_info': self._get_file_info(mdf_path),
             'analysis_summary': self._create_analysis_summary(analysis_results),
             'detailed_results': self._create_detailed_results(analysis_results),
-            'sweet_verification': self._create_sweet_verification(mdf_path, options),
-            'requirements_check': self._create_requirements_check(mdf_path),
+            'sweet_verification': self._create_sweet_verification(mdf_path, options, analysis_results),
+            'requirements_check': self._create_requirements_check(mdf_path, analysis_results),
             'charts_and_graphs': self._create_charts_section(),
             'recommendations': self._create_recommendations(analysis_results)
         }
@@ -146,17 +150,30 @@ class EVAReportGenerator:
         
         return detailed
     
-    def _create_sweet_verification(self, mdf_path: str, options: Dict) -> Dict[str, Any]:
-        """Create SWEET verification results"""
+    def _create_sweet_verification(self, mdf_path: str, options: Dict,
+                                   results: Optional[Dict] = None) -> Dict[str, Any]:
+        """Create SWEET verification results
+        
+        Reuses the SWEET summary computed by the analysis when it matches the
+        requested mode; otherwise runs the SWEET stage of the shared pipeline.
+        """
         try:
             sweet_mode = "sweet400" if "400" in options.get('sweet', 'sweet400') else "sweet500"
-            df = verifier_presence_mapping_0p01s(mdf_path, mode=sweet_mode)
+            summary = (results or {}).get('_sweet')
+            if not summary or summary.get('mode') != sweet_mode:
+                if pipeline_run is not None:
+                    summary = sweet_summary(pipeline_run(mdf_path, mode=sweet_mode).get("sweet"), sweet_mode)
+                else:
+                    df = verifier_presence_mapping_0p01s(mdf_path, mode=sweet_mode)
+                    status = df.get('Statut', df.get('Status'))
+                    ok = int((status == 'OK').sum()) if status is not None else 0
+                    summary = {'mode': sweet_mode, 'total': len(df), 'ok': ok}
             
-            if df.empty:
+            total_signals = summary['total']
+            if not total_signals:
                 return {'status': 'No data', 'total_signals': 0, 'ok_signals': 0, 'nok_signals': 0}
             
-            total_signals = len(df)
-            ok_signals = len(df[df.get('Statut', df.get('Status', '')) == 'OK']) if 'Statut' in df.columns or 'Status' in df.columns else 0
+            ok_signals = summary['ok']
             nok_signals = total_signals - ok_signals
             
             return {
@@ -170,18 +187,22 @@ class EVAReportGenerator:
         except Exception as e:
             return {'status': f'Error: {str(e)}', 'total_signals': 0, 'ok_signals': 0, 'nok_signals': 0}
     
-    def _create_requirements_check(self, mdf_path: str) -> Dict[str, Any]:
-        """Create requirements verification results"""
-        try:
-            # This would integrate with the requirements verification from eva_detecteur
+    def _create_requirements_check(self, mdf_path: str, results: Optional[Dict] = None) -> Dict[str, Any]:
+        """Create requirements verification results from the analysis results"""
+        summary = (results or {}).get('_requirements')
+        if not summary:
             return {
-                'status': 'Not implemented',
+                'status': 'Not available',
                 'total_requirements': 0,
                 'passed_requirements': 0,
                 'failed_requirements': 0
             }
-        except Exception as e:
-            return {'status': f'Error: {str(e)}', 'total_requirements': 0, 'passed_requirements': 0, 'failed_requirements': 0}
+        return {
+            'status': 'Completed',
+            'total_requirements': summary['total'],
+            'passed_requirements': summary['ok'],
+            'failed_requirements': summary['nok'] + summary.get('error', 0)
+        }
     
     def _create_charts_section(self) -> Dict[str, Any]:
         """Create charts and graphs section"""
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+EVA Analysis Service
+Local HTTP API around the analysis pipeline, for scripts, CI rigs and dashboards
+
+Endpoints (JSON unless noted):
+    GET  /health               service status
+    POST /jobs                 {"path": ..., "engine": "detector" | "complete", "options": {...}}
+    GET  /jobs                 all known jobs
+    GET  /jobs/<id>            status and progress of one job
+    GET  /jobs/<id>/result     analysis results (202 while running)
+    GET  /jobs/<id>/report     HTML report (detector engine only)
+    GET  /diff/<a>/<b>         what changed from job a to job b (SWEET, requirements, UCs, statistics)
+
+Analyses run on a warm worker pool (eva_workers): each worker imports the
+analysis core once and keeps the compiled Excel config resident, so only the
+MDF-dependent stages run per job.
+A job id is derived from the file identity (path, size, mtime), the engine,
+the options and the config hash: repeat requests are served from the result
+cache (in memory, then <out>/<id>.json on disk) without re-running anything.
+
+The service binds to localhost and needs no external service:
+    python eva_service.py --port 8765 --workers 2
+    curl -X POST localhost:8765/jobs -d '{"path": "log.mf4"}'
+"""
+
+import argparse
+import asyncio
+import datetime
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Add Gmail directory to path
+sys.path.append(str(Path(__file__).resolve().parent / "Gmail"))
+
+from eva_jobs import job_key
+from eva_workers import CONFIG_PARAMS, WARM, AnalysisFailed, WorkerPool, analysis_error, analyze_file, progress_sender
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+ENGINES = ("detector", "complete")
+# Options accepted per engine (keyword arguments of the analysis entry point)
+ENGINE_OPTIONS = {
+    "detector": ("lang", "myf", "chunked", "window_s"),
+    "complete": ("sweet_version", "myf_versions"),
+}
+MAX_BODY = 1 << 20
+
+
+def to_json(value: Any) -> Any:
+    """Analysis results as plain JSON data (records, tables, numpy values, paths)"""
+    if isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_json(v) for v in value]
+    if isinstance(value, float):
+        return None if math.isnan(value) or math.isinf(value) else value
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    if hasattr(value, "to_frame"):          # SweetTable
+        value = value.to_frame()
+    if hasattr(value, "to_dict") and hasattr(value, "columns"):  # DataFrame
+        return to_json(value.to_dict("records"))
+    if hasattr(value, "to_dict"):           # UCResult, RequirementVerdict...
+        return to_json(value.to_dict())
+    if hasattr(value, "tolist"):            # numpy arrays and scalars
+        return to_json(value.tolist())
+    if isinstance(value, (Path, datetime.date)):
+        return str(value)
+    return str(value)
+
+
+# ---------- worker side (runs in the warm pool processes) ----------
+
+def _run_job(job_id: str, path: str, engine: str, options: Dict[str, Any], out_dir: str) -> Dict[str, Any]:
+    """Analyze one file; writes <out>/<id>.json (and .html) and returns the JSON results
+
+    An error result raises AnalysisFailed: the job ends in "error" and nothing
+    is written, so a transient failure (file still being copied) is retried.
+    """
+    out = Path(out_dir)
+    if engine == "complete":
+        from eva_complete_engine import eva_engine
+        run = eva_engine.prepare_run(path, mode=options.get("sweet_version", "sweet400"),
+                                     myf=options.get("myf_versions"))
+        if run is not None:
+            WARM.provide(run)
+        results = eva_engine.analyze_mdf_file(path, progress=progress_sender(job_id), run=run, **options)
+    else:
+        results = analyze_file(job_id, path, {**options, "report_path": out / f"{job_id}.html"})
+    error = analysis_error(results)
+    if error is not None:
+        raise AnalysisFailed(error)
+    data = to_json(results)
+    (out / f"{job_id}.json").write_text(json.dumps(data), encoding="utf-8")
+    return data
+
+
+# ---------- service side ----------
+
+class Job:
+    """One analysis request and its state"""
+    __slots__ = ("id", "path", "engine", "options", "status", "progress", "message", "error",
+                 "result", "submitted", "finished", "cached")
+
+    def __init__(self, job_id: str, path: Optional[str], engine: str, options: Dict[str, Any]):
+        self.id = job_id
+        self.path = path
+        self.engine = engine
+        self.options = options
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.error = None
+        self.result = None
+        self.submitted = datetime.datetime.now().isoformat()
+        self.finished = None
+        self.cached = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "path": self.path, "engine": self.engine, "options": self.options,
+                "status": self.status, "progress": round(self.progress, 4), "message": self.message,
+                "error": self.error, "submitted": self.submitted, "finished": self.finished,
+                "cached": self.cached}
+
+
+class AnalysisService:
+    """Job table + worker pool + result cache; serve() exposes it over HTTP"""
+
+    def __init__(self, out_dir: Path = Path("eva_service_out"), workers: Optional[int] = None,
+                 processes: bool = True, keep: int = 64):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.keep = keep
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = WorkerPool(workers or max(1, min(2, os.cpu_count() or 1)), processes,
+                                on_progress=self._on_progress)
+
+    # ----- jobs -----
+    def job_id(self, path: str, engine: str, options: Dict[str, Any]) -> str:
+        key = job_key("analysis", path, engine=engine, config=self._config_hash(engine), **options)
+        return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _config_hash(engine: str) -> str:
+        from eva_perf import config_hash
+        if engine == "complete":
+            from eva_complete_engine import eva_engine
+            paths = (eva_engine.labels_file, eva_engine.flux_file, eva_engine.pval_file)
+        else:
+            from eva_detecteur import CONFIG
+            paths = tuple(CONFIG[p] for p in CONFIG_PARAMS)
+        return config_hash(paths)
+
+    def submit(self, path: str, engine: str = "detector", options: Optional[Dict[str, Any]] = None) -> Job:
+        """Queue an analysis, or return the running / cached job for the same request"""
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine} (expected one of {', '.join(ENGINES)})")
+        options = dict(options or {})
+        unknown = sorted(set(options) - set(ENGINE_OPTIONS[engine]))
+        if unknown:
+            raise ValueError(f"Unknown option(s) for {engine}: {', '.join(unknown)}")
+        if not Path(path).is_file():
+            raise FileNotFoundError(path)
+        job_id = self.job_id(path, engine, options)
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is not None and job.status != "error":
+                job.cached = job.status == "done"
+                return job
+            job = Job(job_id, str(path), engine, options)
+            self._load_stored(job)
+            self._remember(job)
+        if job.status == "queued":
+            future = self._pool.run(_run_job, job_id, str(path), engine, options, str(self.out_dir))
+            future.add_done_callback(lambda f, j=job: self._finished(j, f))
+        return job
+
+    def _load_stored(self, job: Job) -> bool:
+        """Mark the job done with the results stored in <out>/<id>.json, if any"""
+        stored = self.out_dir / f"{job.id}.json"
+        if not stored.exists():
+            return False
+        job.result = json.loads(stored.read_text(encoding="utf-8"))
+        job.status, job.progress, job.cached = "done", 1.0, True
+        job.finished = datetime.datetime.fromtimestamp(stored.stat().st_mtime).isoformat()
+        return True
+
+    def _remember(self, job: Job) -> None:
+        self.jobs[job.id] = job
+        self.jobs.move_to_end(job.id)
+        finished = [j for j in self.jobs.values() if j.status in ("done", "error")]
+        for old in finished[:max(0, len(self.jobs) - self.keep)]:
+            del self.jobs[old.id]  # results stay available from disk
+
+    def _finished(self, job: Job, future) -> None:
+        try:
+            job.result = future.result()
+        except Exception as e:
+            job.status, job.error = "error", f"{type(e).__name__}: {e}"
+        else:
+            job.status, job.progress = "done", 1.0
+        job.finished = datetime.datetime.now().isoformat()
+
+    def _on_progress(self, job_id: str, fraction: float, message: str) -> None:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is not None and job.status in ("queued", "running"):
+                job.status, job.progress, job.message = "running", fraction, message
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def find(self, job_id: str) -> Optional[Job]:
+        """Job from memory, or a finished job rebuilt from <out>/<id>.json once it was dropped"""
+        job = self.get(job_id)
+        if job is not None:
+            return job
+        # Only the detector engine writes an HTML report; the request path and options are not stored
+        engine = "detector" if (self.out_dir / f"{job_id}.html").exists() else "complete"
+        job = Job(job_id, None, engine, {})
+        return job if self._load_stored(job) else None
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Results of a finished job, from memory or from <out>/<id>.json"""
+        job = self.get(job_id)
+        if job is not None and job.status == "done":
+            return job.result
+        stored = self.out_dir / f"{job_id}.json"
+        return json.loads(stored.read_text(encoding="utf-8")) if stored.exists() else None
+
+    def diff(self, before: str, after: str) -> Optional[Dict[str, Any]]:
+        """Run-to-run diff of two cached jobs (no re-analysis); None if one is not available"""
+        from eva_diff import Snapshot, diff_runs
+        results = [self.result(job_id) for job_id in (before, after)]
+        if any(r is None for r in results):
+            return None
+        snapshots = [Snapshot.from_results(r, job_id) for r, job_id in zip(results, (before, after))]
+        return diff_runs(*snapshots).to_dict()
+
+    def close(self) -> None:
+        self._pool.close(wait=False)
+
+    # ----- HTTP -----
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        server = await self.start(host, port)
+        print(f"EVA analysis service on http://{host}:{server.sockets[0].getsockname()[1]}")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, target, body = await self._read_request(reader)
+            status, content_type, payload = await self._route(method, target.split("?", 1)[0], body)
+        except ValueError as e:
+            status, content_type, payload = 400, "application/json", {"error": str(e)}
+        except Exception as e:
+            status, content_type, payload = 500, "application/json", {"error": f"{type(e).__name__}: {e}"}
+        if content_type == "application/json":
+            payload = json.dumps(payload).encode("utf-8")
+        reason = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+                  405: "Method Not Allowed", 500: "Internal Server Error"}.get(status, "")
+        head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n")
+        writer.write(head.encode("latin-1") + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        parts = (await reader.readline()).decode("latin-1").split()
+        if len(parts) != 3:
+            raise ValueError("Malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAX_BODY:
+            raise ValueError("Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return parts[0].upper(), parts[1], body
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, str, Any]:
+        if path == "/health":
+            return 200, "application/json", {"status": "ok", "jobs": len(self.jobs)}
+        if path == "/jobs":
+            if method == "GET":
+                return 200, "application/json", [j.to_dict() for j in list(self.jobs.values())]
+            if method != "POST":
+                return 405, "application/json", {"error": "Use GET or POST"}
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict) or "path" not in request:
+                raise ValueError('Expected a JSON object with a "path"')
+            try:
+                # Hashing the workbooks and the file stat touch the disk: keep the loop free
+                job = await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: self.submit(request["path"], request.get("engine", "detector"),
+                                              request.get("options")))
+            except FileNotFoundError as e:
+                return 404, "application/json", {"error": f"File not found: {e}"}
+            return (200 if job.cached else 202), "application/json", job.to_dict()
+        match = re.fullmatch(r"/diff/([0-9a-f]+)/([0-9a-f]+)", path)
+        if match:
+            if method != "GET":
+                return 405, "application/json", {"error": "Use GET"}
+            diff = await asyncio.get_running_loop().run_in_executor(None, self.diff, *match.groups())
+            if diff is None:
+                return 404, "application/json", {"error": "Both jobs must be finished"}
+            return 200, "application/json", diff
+        match = re.fullmatch(r"/jobs/([0-9a-f]+)(/result|/report)?", path)
+        if not match:
+            return 404, "application/json", {"error": f"No route for {path}"}
+        if method != "GET":
+            return 405, "application/json", {"error": "Use GET"}
+        job_id, part = match.groups()
+        loop = asyncio.get_running_loop()
+        job = await loop.run_in_executor(None, self.find, job_id)
+        if job is None:
+            return 404, "application/json", {"error": "Unknown job"}
+        if part is None:
+            return 200, "application/json", job.to_dict()
+        if job.status == "error":
+            return 500, "application/json", job.to_dict()
+        if job.status != "done":
+            return 202, "application/json", job.to_dict()
+        if part == "/result":
+            result = await loop.run_in_executor(None, self.result, job_id)
+            if result is None:
+                return 404, "application/json", {"error": "Unknown job"}
+            return 200, "application/json", result
+        report = self.out_dir / f"{job.id}.html"
+        if not report.exists():
+            return 404, "application/json", {"error": f"No HTML report for the {job.engine} engine"}
+        return 200, "text/html", report.read_bytes()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="EVA local HTTP analysis service")
+    ap.add_argument("--host", default=DEFAULT_HOST)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--workers", type=int, default=None, help="Analysis processes (default: up to 2)")
+    ap.add_argument("--out", type=Path, default=Path("eva_service_out"), help="Results and reports directory")
+    args = ap.parse_args()
+
+    service = AnalysisService(args.out, args.workers)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()